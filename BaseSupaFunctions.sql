@@ -0,0 +1,241 @@
+-- Funções (RPC) usadas pelo bot via supabase.rpc(...) e índices que as consultas do bot assumem.
+-- Rodar no SQL Editor do Supabase. Todas são idempotentes (CREATE OR REPLACE).
+-- O bot tem fallback quando a função ainda não existe, mas com mais round-trips.
+
+-- =========================================================
+--  Centro Pokémon: cura em uma única instrução
+-- =========================================================
+
+-- Cura a party (party_position not null) de um jogador. Retorna quantos foram curados.
+CREATE OR REPLACE FUNCTION public.heal_party(p_player_id bigint)
+RETURNS integer
+LANGUAGE sql
+AS $$
+  WITH healed AS (
+    UPDATE public.player_pokemon
+       SET current_hp = COALESCE(max_hp, current_hp)
+     WHERE player_id = p_player_id
+       AND party_position IS NOT NULL
+       AND current_hp IS DISTINCT FROM COALESCE(max_hp, current_hp)
+    RETURNING 1
+  )
+  SELECT count(*)::integer FROM healed;
+$$;
+
+-- Cura party + box. p_player_id NULL = todos os jogadores (ação de admin).
+CREATE OR REPLACE FUNCTION public.heal_all_pokemon(p_player_id bigint DEFAULT NULL)
+RETURNS integer
+LANGUAGE sql
+AS $$
+  WITH healed AS (
+    UPDATE public.player_pokemon
+       SET current_hp = COALESCE(max_hp, current_hp)
+     WHERE (p_player_id IS NULL OR player_id = p_player_id)
+       AND current_hp IS DISTINCT FROM COALESCE(max_hp, current_hp)
+    RETURNING 1
+  )
+  SELECT count(*)::integer FROM healed;
+$$;
+
+-- =========================================================
+--  Inventário: consumo/concessão atômicos
+-- =========================================================
+
+-- Decrementa p_amount se houver o suficiente. Devolve a quantidade restante,
+-- ou NULL se o jogador não tinha o bastante (nada é alterado). Linha zerada é apagada.
+CREATE OR REPLACE FUNCTION public.consume_item(p_player_id bigint, p_item_id integer, p_amount integer DEFAULT 1)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_left integer;
+BEGIN
+  UPDATE public.player_inventory
+     SET quantity = quantity - p_amount
+   WHERE player_id = p_player_id
+     AND item_id = p_item_id
+     AND quantity >= p_amount
+  RETURNING quantity INTO v_left;
+
+  IF v_left IS NULL THEN
+    RETURN NULL;
+  END IF;
+  IF v_left = 0 THEN
+    DELETE FROM public.player_inventory
+     WHERE player_id = p_player_id AND item_id = p_item_id AND quantity = 0;
+  END IF;
+  RETURN v_left;
+END;
+$$;
+
+-- Aplica vários deltas de uma vez: p_changes = [{"item_id": 1, "delta": -2}, ...].
+-- Delta positivo concede, negativo consome. Tudo ou nada: se algum consumo não
+-- tiver saldo, nada é alterado e a função devolve false.
+CREATE OR REPLACE FUNCTION public.apply_inventory_changes(p_player_id bigint, p_changes jsonb)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  c record;
+  v_qty integer;
+BEGIN
+  FOR c IN
+    SELECT (e->>'item_id')::integer AS item_id, sum((e->>'delta')::integer)::integer AS delta
+      FROM jsonb_array_elements(p_changes) AS e
+     GROUP BY 1
+     ORDER BY 1
+  LOOP
+    IF c.delta < 0 THEN
+      SELECT quantity INTO v_qty
+        FROM public.player_inventory
+       WHERE player_id = p_player_id AND item_id = c.item_id
+       FOR UPDATE;
+      IF v_qty IS NULL OR v_qty < -c.delta THEN
+        RAISE EXCEPTION 'insufficient_item' USING ERRCODE = 'P0001';
+      END IF;
+    END IF;
+
+    -- consumo é UPDATE: um INSERT com quantidade negativa falharia no
+    -- CHECK (quantity >= 0) antes de o ON CONFLICT entrar em ação
+    IF c.delta < 0 THEN
+      UPDATE public.player_inventory
+         SET quantity = quantity + c.delta
+       WHERE player_id = p_player_id AND item_id = c.item_id;
+    ELSIF c.delta > 0 THEN
+      INSERT INTO public.player_inventory AS pi (player_id, item_id, quantity)
+      VALUES (p_player_id, c.item_id, c.delta)
+      ON CONFLICT (player_id, item_id)
+      DO UPDATE SET quantity = pi.quantity + EXCLUDED.quantity;
+    END IF;
+  END LOOP;
+
+  DELETE FROM public.player_inventory WHERE player_id = p_player_id AND quantity = 0;
+  RETURN true;
+EXCEPTION
+  WHEN raise_exception THEN
+    IF SQLERRM = 'insufficient_item' THEN
+      RETURN false;
+    END IF;
+    RAISE;
+END;
+$$;
+
+-- =========================================================
+--  Batalha: write-behind de HP/XP/felicidade/level num UPDATE só
+-- =========================================================
+
+-- p_updates = [{"id": "<uuid>", "fields": {"current_hp": 12, "current_xp": 340, ...}}, ...]
+-- Só as colunas abaixo são aceitas; coluna ausente em "fields" fica como está.
+-- Retorna quantas linhas foram gravadas.
+CREATE OR REPLACE FUNCTION public.apply_battle_updates(p_updates jsonb)
+RETURNS integer
+LANGUAGE sql
+AS $$
+  WITH upd AS (
+    UPDATE public.player_pokemon AS pp
+       SET current_hp      = CASE WHEN u.f ? 'current_hp'      THEN (u.f->>'current_hp')::integer      ELSE pp.current_hp END,
+           current_xp      = CASE WHEN u.f ? 'current_xp'      THEN (u.f->>'current_xp')::integer      ELSE pp.current_xp END,
+           happiness       = CASE WHEN u.f ? 'happiness'       THEN (u.f->>'happiness')::integer       ELSE pp.happiness END,
+           current_level   = CASE WHEN u.f ? 'current_level'   THEN (u.f->>'current_level')::integer   ELSE pp.current_level END,
+           max_hp          = CASE WHEN u.f ? 'max_hp'          THEN (u.f->>'max_hp')::integer          ELSE pp.max_hp END,
+           attack          = CASE WHEN u.f ? 'attack'          THEN (u.f->>'attack')::integer          ELSE pp.attack END,
+           defense         = CASE WHEN u.f ? 'defense'         THEN (u.f->>'defense')::integer         ELSE pp.defense END,
+           special_attack  = CASE WHEN u.f ? 'special_attack'  THEN (u.f->>'special_attack')::integer  ELSE pp.special_attack END,
+           special_defense = CASE WHEN u.f ? 'special_defense' THEN (u.f->>'special_defense')::integer ELSE pp.special_defense END,
+           speed           = CASE WHEN u.f ? 'speed'           THEN (u.f->>'speed')::integer           ELSE pp.speed END
+      FROM (SELECT (e->>'id')::uuid AS id, e->'fields' AS f
+              FROM jsonb_array_elements(p_updates) AS e) AS u
+     WHERE pp.id = u.id
+    RETURNING 1
+  )
+  SELECT count(*)::integer FROM upd;
+$$;
+
+-- =========================================================
+--  Party: troca/movimento de slots numa transação
+-- =========================================================
+
+-- Aplica várias mudanças de slot de uma vez:
+--   p_moves = [{"id": "<uuid>", "from": 2, "to": 5}, {"id": "...", "from": null, "to": 2}, ...]
+-- ("from"/"to" null = Box). Devolve false sem alterar nada se algum Pokémon não
+-- é do jogador ou já não está em "from" (alguém mexeu na party no meio), ou se
+-- o resultado deixaria dois Pokémon num dos slots de destino.
+CREATE OR REPLACE FUNCTION public.set_party_layout(p_player_id bigint, p_moves jsonb)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_found integer;
+BEGIN
+  -- trava a party e os Pokémon movidos (não a Box inteira): duas trocas
+  -- simultâneas não se cruzam
+  PERFORM 1 FROM public.player_pokemon
+   WHERE player_id = p_player_id
+     AND (party_position IS NOT NULL
+          OR id IN (SELECT (m->>'id')::uuid FROM jsonb_array_elements(p_moves) AS m))
+   ORDER BY id
+     FOR UPDATE;
+
+  SELECT count(*) INTO v_found
+    FROM public.player_pokemon AS pp
+    JOIN jsonb_array_elements(p_moves) AS m ON pp.id = (m->>'id')::uuid
+   WHERE pp.player_id = p_player_id
+     AND pp.party_position IS NOT DISTINCT FROM (m->>'from')::integer;
+  IF v_found <> jsonb_array_length(p_moves) THEN
+    RETURN false;
+  END IF;
+
+  -- em duas passadas (tudo para a Box, depois para o destino) para funcionar
+  -- também com UNIQUE (player_id, party_position)
+  UPDATE public.player_pokemon AS pp
+     SET party_position = NULL
+    FROM jsonb_array_elements(p_moves) AS m
+   WHERE pp.id = (m->>'id')::uuid AND pp.player_id = p_player_id;
+
+  UPDATE public.player_pokemon AS pp
+     SET party_position = (m->>'to')::integer
+    FROM jsonb_array_elements(p_moves) AS m
+   WHERE pp.id = (m->>'id')::uuid AND pp.player_id = p_player_id
+     AND m->>'to' IS NOT NULL;
+
+  -- só os slots de destino: duplicatas antigas em slots não tocados não
+  -- bloqueiam a troca (as do slot tocado já vêm no plano, indo para a Box)
+  IF EXISTS (
+    SELECT 1 FROM public.player_pokemon
+     WHERE player_id = p_player_id
+       AND party_position IN (
+         SELECT (m->>'to')::integer FROM jsonb_array_elements(p_moves) AS m
+          WHERE m->>'to' IS NOT NULL)
+     GROUP BY party_position HAVING count(*) > 1
+  ) THEN
+    RAISE EXCEPTION 'party_conflict' USING ERRCODE = 'P0001';
+  END IF;
+  RETURN true;
+EXCEPTION
+  WHEN unique_violation THEN
+    RETURN false;
+  WHEN raise_exception THEN
+    IF SQLERRM = 'party_conflict' THEN
+      RETURN false;
+    END IF;
+    RAISE;
+END;
+$$;
+
+-- =========================================================
+--  Box paginada (keyset): índices das ordenações do !box
+-- =========================================================
+
+-- ordem:especie -> (pokemon_api_name, id); ordem:nivel -> (current_level desc, id)
+CREATE INDEX IF NOT EXISTS player_pokemon_box_species_idx
+  ON public.player_pokemon (player_id, pokemon_api_name, id)
+  WHERE party_position IS NULL;
+
+CREATE INDEX IF NOT EXISTS player_pokemon_box_level_idx
+  ON public.player_pokemon (player_id, current_level DESC, id)
+  WHERE party_position IS NULL;
+
+-- party do jogador (roster, batalha)
+CREATE INDEX IF NOT EXISTS player_pokemon_party_idx
+  ON public.player_pokemon (player_id, party_position)
+  WHERE party_position IS NOT NULL;
@@ -1,35 +1,123 @@
 # MainBot.py (trecho essencial)
-import os, asyncio, discord
+import os, ast, asyncio, importlib, time, discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from supabase import create_client, Client  # pip install supabase
-
 load_dotenv()
+
+import utils.pokeapi_service as pokeapi  # depois do load_dotenv (config via env)
+from utils import db_utils
+from utils import species_utils
+from utils import item_utils
+from utils import event_utils
+from utils import warmup_utils
 TOKEN = os.getenv("DISCORD_TOKEN")
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+COGS_DIR = "./cogs"
 
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents)
 bot.remove_command("help")
 
+
+def _cog_dependencies(path: str) -> list:
+    """Módulos que o cog importa no topo (menos outros cogs), lidos via AST sem executar."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except Exception:
+        return []
+    mods = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            mods.extend(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            mods.append(node.module)
+            # `from utils import db_utils` -> utils.db_utils (nomes que não são módulo só falham)
+            mods.extend(f"{node.module}.{a.name}" for a in node.names if node.module in ("utils", "discord", "discord.ext"))
+    return [m for m in dict.fromkeys(mods) if m != "__future__" and not m.startswith("cogs")]
+
+
+def _import_all(modules: list) -> float:
+    t0 = time.perf_counter()
+    for m in modules:
+        try:
+            importlib.import_module(m)
+        except Exception:
+            pass  # o load_extension mostra o erro real
+    return (time.perf_counter() - t0) * 1000
+
+
+async def _load_cog(name: str, deps: list) -> tuple:
+    # dependências importadas numa thread (I/O de .pyc em paralelo); o módulo do cog
+    # e o setup() rodam no loop, como o discord.py exige
+    deps_ms = await asyncio.to_thread(_import_all, deps)
+    t0 = time.perf_counter()
+    try:
+        await bot.load_extension(f"cogs.{name}")
+        err = None
+    except Exception as e:
+        err = e
+    return name, deps_ms, (time.perf_counter() - t0) * 1000, err
+
+
 async def load_cogs():
-    for filename in os.listdir("./cogs"):
-        if filename.endswith(".py"):
-            try:
-                await bot.load_extension(f"cogs.{filename[:-3]}")
-                print(f"Cog {filename} carregado com sucesso.")
-            except Exception as e:
-                print(f"Falha ao carregar o cog {filename}. Erro: {e}")
+    names = sorted(f[:-3] for f in os.listdir(COGS_DIR) if f.endswith(".py"))
+    t0 = time.perf_counter()
+    results = await asyncio.gather(
+        *(_load_cog(n, _cog_dependencies(os.path.join(COGS_DIR, f"{n}.py"))) for n in names)
+    )
+    for name, deps_ms, load_ms, err in sorted(results, key=lambda r: -(r[1] + r[2])):
+        if err is None:
+            print(f"Cog {name}.py carregado: deps {deps_ms:.0f} ms • import+setup {load_ms:.0f} ms", flush=True)
+        else:
+            print(f"Falha ao carregar o cog {name}.py. Erro: {err}", flush=True)
+    print(f"[Startup] {len(names)} cogs em {(time.perf_counter() - t0) * 1000:.0f} ms", flush=True)
+
+
+async def preload_local():
+    # snapshot local (POKEAPI_PROVIDER=snapshot) e cache em disco -> memória
+    await pokeapi.init_provider()
+    await pokeapi.warm_start_from_disk()
+    await species_utils.preload()
+
+
+async def preload_db(client_task: asyncio.Future):
+    """Índices vindos do Supabase, em paralelo entre si e com o login."""
+    try:
+        await client_task
+    except Exception as e:
+        print(f"[Startup] Client Supabase indisponível: {e}", flush=True)
+        return
+    loads = {
+        "[Items] Falha ao carregar o catálogo": item_utils.preload(bot.supabase),
+        "[Routes] Falha ao carregar rotas": db_utils.run_sync(event_utils.load_route_graph, bot.supabase),
+        "[Routes] Falha ao carregar locais": db_utils.run_sync(event_utils.load_locations, bot.supabase),
+    }
+    results = await asyncio.gather(*loads.values(), return_exceptions=True)
+    for label, r in zip(loads, results):
+        if isinstance(r, Exception):  # sem o índice agora, a primeira consulta tenta de novo
+            print(f"{label}: {r}", flush=True)
+
+
+async def background_startup(client_task: asyncio.Future):
+    await preload_db(client_task)
+    # warm-up (encontros, espécies, golpes); !battle espera a parte crítica
+    await warmup_utils.run(bot.supabase)
+
 
 async def main():
+    t0 = time.perf_counter()
     async with bot:
-        # >>> injeta o client do Supabase aqui <<<
-        bot.supabase = create_client(SUPABASE_URL, SUPABASE_KEY)  # síncrono, mas ok
+        # client único do processo (pool HTTP compartilhado); os cogs usam bot.supabase.
+        # O proxy deixa injetar já; o import do supabase + criação rodam numa thread.
+        bot.supabase = db_utils.lazy_client()
+        client_task = asyncio.ensure_future(asyncio.to_thread(db_utils.get_client))
+
+        await asyncio.gather(preload_local(), load_cogs())
 
-        await load_cogs()
+        bot.warmup_task = asyncio.create_task(background_startup(client_task))
+        print(f"[Startup] Pronto para login em {(time.perf_counter() - t0) * 1000:.0f} ms", flush=True)
         await bot.start(TOKEN)
 
 if __name__ == "__main__":
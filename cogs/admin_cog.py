@@ -0,0 +1,190 @@
+# cogs/admin_cog.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import discord
+from discord.ext import commands
+
+import utils.pokeapi_service as pokeapi
+from utils import db_utils
+from utils import event_utils
+from utils import heal_utils
+from utils import item_utils
+from utils import roster_utils
+from utils import text_utils
+from utils import warmup_utils
+
+
+def _fmt_bytes(n: int) -> str:
+    size = float(n or 0)
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            break
+    return f"{size:.1f} {unit}"
+
+
+class AdminCog(commands.Cog):
+    """Comandos de diagnóstico (somente dono do bot)."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    @commands.command(name="cachestats")
+    @commands.is_owner()
+    async def cache_stats(self, ctx: commands.Context):
+        """Mostra os contadores do cache da PokeAPI."""
+        st = pokeapi.get_cache_stats()
+        max_entries = st["max_entries"] or "∞"
+        max_bytes = _fmt_bytes(st["max_bytes"]) if st["max_bytes"] else "∞"
+
+        embed = discord.Embed(title="🗄️ Cache PokeAPI", color=discord.Color.dark_teal())
+        embed.add_field(name="Entradas", value=f"{st['entries']}/{max_entries}", inline=True)
+        embed.add_field(name="Memória", value=f"{_fmt_bytes(st['bytes'])}/{max_bytes}", inline=True)
+        embed.add_field(name="Hit ratio", value=f"{st['hit_ratio']:.1%}", inline=True)
+        embed.add_field(name="Hits / Misses", value=f"{st['hits']} / {st['misses']}", inline=True)
+        embed.add_field(name="Evictions", value=str(st["evictions"]), inline=True)
+        embed.add_field(name="Expirados (TTL)", value=str(st["expirations"]), inline=True)
+        embed.add_field(name="Coalescidas", value=str(st.get("coalesced", 0)), inline=True)
+        embed.add_field(name="Em voo", value=str(st.get("inflight", 0)), inline=True)
+
+        disk = st.get("disk")
+        if disk:
+            embed.add_field(
+                name="Disco",
+                value=(
+                    f"{disk['rows']} respostas • {_fmt_bytes(disk['file_bytes'])}\n"
+                    f"hits {disk['hits']}/{disk['reads']} • gravações {disk['writes']} • erros {disk['errors']}"
+                ),
+                inline=False,
+            )
+
+        snap = st.get("snapshot")
+        if snap:
+            total = sum(snap["entries"].values())
+            embed.add_field(
+                name=f"Snapshot v{snap['version']}",
+                value=f"{total} registros • hits {snap['hits']} • misses {snap['misses']}",
+                inline=False,
+            )
+
+        ros = roster_utils.stats()
+        embed.add_field(
+            name="Rosters (party/box)",
+            value=f"{ros['players']} jogadores • hits {ros['hits']} • misses {ros['misses']}",
+            inline=False,
+        )
+        txt = text_utils.stats()
+        embed.add_field(
+            name="Textos (pt/en)",
+            value=f"{txt['species']} espécies • {txt['moves']} golpes",
+            inline=False,
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="dbstats")
+    @commands.is_owner()
+    async def db_stats(self, ctx: commands.Context, arg: str = ""):
+        """Latência das queries ao Supabase por tabela/operação. `!dbstats reset` zera."""
+        if arg.lower() == "reset":
+            db_utils.reset_db_stats()
+            await ctx.send("Métricas do banco zeradas.")
+            return
+
+        rows = db_utils.get_db_stats()
+        if not rows:
+            await ctx.send("Nenhuma query registrada ainda.")
+            return
+
+        lines = []
+        for r in rows[:15]:
+            err = f" • {r['errors']} erro(s)" if r["errors"] else ""
+            lines.append(
+                f"`{r['table']}.{r['op']}` {r['count']}x • média {r['avg_ms']:.0f} ms • "
+                f"p95 {r['p95_ms']:.0f} ms • máx {r['max_ms']:.0f} ms{err}"
+            )
+        embed = discord.Embed(
+            title="🐘 Supabase",
+            description="\n".join(lines),
+            color=discord.Color.dark_teal(),
+        )
+        embed.set_footer(
+            text=(
+                f"Pool: {db_utils.DB_MAX_WORKERS} threads • {db_utils.DB_POOL_MAX_CONNECTIONS} conexões "
+                f"• lenta >= {db_utils.DB_SLOW_QUERY_MS:.0f} ms"
+            )
+        )
+        await ctx.send(embed=embed)
+
+
+    @commands.command(name="healall")
+    @commands.is_owner()
+    async def heal_all(self, ctx: commands.Context, member: discord.User = None):
+        """Cura party + box de um jogador, ou de todos se nenhum for mencionado."""
+        supabase = getattr(self.bot, "supabase", None) or db_utils.get_client()
+        player_id = member.id if member else None
+        try:
+            healed = await heal_utils.heal_all(supabase, player_id)
+        except Exception as e:
+            await ctx.send(f"Falha ao curar: `{e}`")
+            return
+        alvo = member.mention if member else "todos os jogadores"
+        await ctx.send(f"🧑‍⚕️ {healed} Pokémon curados ({alvo}).")
+
+    @commands.command(name="reloaditems")
+    @commands.is_owner()
+    async def reload_items(self, ctx: commands.Context):
+        """Recarrega o catálogo de itens (depois de editar a tabela `items`)."""
+        supabase = getattr(self.bot, "supabase", None) or db_utils.get_client()
+        try:
+            count = await item_utils.refresh(supabase)
+        except Exception as e:
+            await ctx.send(f"Falha ao recarregar itens: `{e}`")
+            return
+        await ctx.send(f"📦 Catálogo de itens recarregado ({count} itens).")
+
+    @commands.command(name="reloadroutes")
+    @commands.is_owner()
+    async def reload_routes(self, ctx: commands.Context):
+        """Recarrega o grafo de rotas e o índice de locais (depois de editar `routes`/`locations`)."""
+        supabase = getattr(self.bot, "supabase", None) or db_utils.get_client()
+        # se a recarga falhar, o índice velho não fica valendo: a próxima consulta recarrega
+        event_utils.invalidate_route_graph()
+        event_utils.invalidate_locations()
+        try:
+            count = await db_utils.run_sync(event_utils.load_route_graph, supabase)
+            n_locs = await db_utils.run_sync(event_utils.load_locations, supabase)
+        except Exception as e:
+            await ctx.send(f"Falha ao recarregar rotas: `{e}`")
+            return
+        await ctx.send(f"🗺️ Grafo de rotas recarregado ({count} arestas, {n_locs} locais).")
+
+    @commands.command(name="warmup")
+    @commands.is_owner()
+    async def warmup_status(self, ctx: commands.Context):
+        """Progresso do aquecimento do startup, por etapa."""
+        lines = []
+        for r in warmup_utils.get_status():
+            ms = f" • {r['elapsed_ms']:.0f} ms" if r["elapsed_ms"] is not None else ""
+            err = f" • {r['errors']} erro(s)" if r["errors"] else ""
+            mark = "✅" if r["finished"] else ("⏳" if r["total"] else "…")
+            lines.append(f"{mark} `{r['stage']}` {r['done']}/{r['total']}{ms}{err}")
+        if warmup_utils.is_finished():
+            state = "concluído"
+        elif warmup_utils.is_ready():
+            state = "pronto p/ batalhas (aquecendo o resto)"
+        else:
+            state = "em andamento"
+        embed = discord.Embed(
+            title=f"🔥 Warm-up — {state}",
+            description="\n".join(lines),
+            color=discord.Color.dark_teal(),
+        )
+        await ctx.send(embed=embed)
+
+
+# -------- setup --------
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AdminCog(bot))
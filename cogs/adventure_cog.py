@@ -9,6 +9,8 @@ import discord
 from discord.ext import commands
 
 # utils do projeto (usa Supabase síncrono)
+from utils import db_utils
+from utils import heal_utils
 from utils import event_utils  # get_permitted_destinations, get_location_info, get_next_mainline_edge, next_gym_info, get_gym_order
 
 MAX_DEST_PER_PAGE = 6
@@ -148,12 +150,11 @@ class TravelViewSafe(discord.ui.View):
 
     async def _refresh_player_from_db(self, user_id: int):
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("players")
                 .select("current_region,current_location_name,badges,flags")
                 .eq("discord_id", user_id)
                 .limit(1)
-                .execute()
             )
             rows = res.data or []
             if not rows:
@@ -163,6 +164,7 @@ class TravelViewSafe(discord.ui.View):
             self.player.location_api_name = row.get("current_location_name") or self.player.location_api_name
             self.player.badges = row.get("badges", 0) or 0
             self.player.flags = row.get("flags", []) or []
+            event_utils.remember_player_location(user_id, self.player.location_api_name, self.player.region)
         except Exception as e:
             print(f"[TravelViewSafe:_refresh_player_from_db][WARN] {e}", flush=True)
 
@@ -199,9 +201,14 @@ class TravelViewSafe(discord.ui.View):
 
     async def _reload_destinations(self):
         try:
+            # grafo de rotas em memória: só a primeira carga vai ao banco
+            if not event_utils.route_graph_loaded():
+                await db_utils.run_sync(event_utils.load_route_graph, self.supabase)
             self._dest_cache = self._query_destinations_sync()
-            self._loc_info = self._query_loc_info_sync()
             self._next_edge = self._query_next_edge_sync()
+            self._loc_info = event_utils.peek_location_info(self.player.location_api_name)
+            if self._loc_info is None:
+                self._loc_info = await db_utils.run_sync(self._query_loc_info_sync)
         except Exception as e:
             print(f"[TravelViewSafe:_reload_destinations][ERROR] {e}", flush=True)
             self._dest_cache = []
@@ -228,13 +235,13 @@ class TravelViewSafe(discord.ui.View):
 
     async def _perform_travel(self, to_slug: str):
         try:
-            (
+            await db_utils.execute(
                 self.supabase.table("players")
                 .update({"current_location_name": to_slug})
                 .eq("discord_id", self.player.user_id)
-                .execute()
             )
             self.player.location_api_name = to_slug
+            event_utils.remember_player_location(self.player.user_id, to_slug, self.player.region)
             await self.message.channel.send(f"✈️ Viajando para **{slug_to_title(to_slug)}**.")
 
             await self._reload_destinations()
@@ -269,14 +276,13 @@ class TravelViewSafe(discord.ui.View):
         if new_val > 8:
             new_val = 8
         try:
-            (
+            await db_utils.execute(
                 self.supabase.table("players")
                 .update({
                     "D": new_val,
                     "wild_battles_since_badge": 0   # 🔽 reset aqui
                 })
                 .eq("discord_id", self.player.user_id)
-                .execute()
             )
             self.player.badges = new_val
         except Exception as e:
@@ -291,7 +297,7 @@ class TravelViewSafe(discord.ui.View):
 
         step_txt = ""
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("routes")
                 .select("location_from,location_to,step")
                 .eq("region", self.player.region)
@@ -299,7 +305,6 @@ class TravelViewSafe(discord.ui.View):
                 .eq("location_to", g["city"])
                 .order("step")
                 .limit(1)
-                .execute()
             )
             rows = res.data or []
             if rows and rows[0].get("step") is not None:
@@ -315,14 +320,13 @@ class TravelViewSafe(discord.ui.View):
     async def _send_all_mainline_steps(self):
         """Lista ordenada (passo -> destino) da trilha principal da região atual."""
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("routes")
                 .select("location_from,location_to,step")
                 .eq("region", self.player.region)
                 .eq("is_mainline", True)
                 .not_.is_("step", "null")
                 .order("step")
-                .execute()
             )
             rows = res.data or []
             if not rows:
@@ -418,23 +422,8 @@ class TravelViewSafe(discord.ui.View):
                 await inter.response.defer()
 
                 try:
-                    # Busca todos os Pokémon da party do jogador
-                    res = (
-                        self.supabase.table("player_pokemon")
-                        .select("id,max_hp")
-                        .eq("player_id", self.player.user_id)
-                        .not_.is_("party_position", "null")
-                        .execute()
-                    )
-                    rows = res.data or []
-
-                    # Seta current_hp = max_hp para cada um
-                    for r in rows:
-                        self.supabase.table("player_pokemon") \
-                            .update({"current_hp": r["max_hp"]}) \
-                            .eq("id", r["id"]) \
-                            .execute()
-
+                    # current_hp = max_hp na party inteira, numa instrução só
+                    await heal_utils.heal_party(self.supabase, self.player.user_id)
                     await self.message.channel.send("🧑‍⚕️ Seus Pokémon foram totalmente curados no Centro Pokémon!")
                 except Exception as e:
                     await self.message.channel.send(f"Falha ao curar: `{e}`")
@@ -679,12 +668,11 @@ class AdventureCog(commands.Cog):
     # ===== Helper: carrega player do BD, aplica spawn se necessário =====
     def _load_player_from_db(self, user_id: int) -> Optional[PlayerAdapter]:
         try:
-            res = (
+            res = db_utils.execute_sync(
                 self.supabase.table("players")
                 .select("current_region,current_location_name,badges,flags")
                 .eq("discord_id", user_id)
                 .limit(1)
-                .execute()
             )
             rows = res.data or []
             if not rows:
@@ -698,6 +686,7 @@ class AdventureCog(commands.Cog):
             if not location:
                 location = event_utils.ensure_player_spawn(self.supabase, user_id, region) or event_utils.get_region_spawn(region)
 
+            event_utils.remember_player_location(user_id, location, region)
             player = PlayerAdapter(user_id=user_id, region=region, location_api_name=location)
             player.badges = row.get("badges", 0) or 0
             player.flags = row.get("flags", []) or []
@@ -712,7 +701,7 @@ class AdventureCog(commands.Cog):
         Abre o menu de viagem. SEM fallback para Pallet:
         busca o player no BD e, se não tiver location, aplica o spawn da região.
         """
-        player = self._load_player_from_db(ctx.author.id)
+        player = await db_utils.run_sync(self._load_player_from_db, ctx.author.id)
         if player is None:
             await ctx.send("Você ainda não tem perfil criado. Use `!setregion <Região>` para começar.")
             return
@@ -727,12 +716,11 @@ class AdventureCog(commands.Cog):
 
     def _fetch_flags(self, user_id: int) -> List[str]:
         try:
-            res = (
+            res = db_utils.execute_sync(
                 self.supabase.table("players")
                 .select("flags")
                 .eq("discord_id", user_id)
                 .limit(1)
-                .execute()
             )
             rows = res.data or []
             flags = (rows[0] or {}).get("flags", []) if rows else []
@@ -743,14 +731,14 @@ class AdventureCog(commands.Cog):
     def _save_flags(self, user_id: int, flags: List[str]) -> None:
         # salva único e ordenado (estético)
         unique = sorted(set(flags))
-        self.supabase.table("players").update({"flags": unique}).eq("discord_id", user_id).execute()
+        db_utils.execute_sync(self.supabase.table("players").update({"flags": unique}).eq("discord_id", user_id))
 
     @commands.command(name="givebadges")
     async def give_badges(self, ctx: commands.Context, n: int):
         """Define o número de insígnias (0–8)."""
         n = max(0, min(8, int(n)))
         try:
-            self.supabase.table("players").update({"badges": n}).eq("discord_id", ctx.author.id).execute()
+            await db_utils.execute(self.supabase.table("players").update({"badges": n}).eq("discord_id", ctx.author.id))
             await ctx.send(f"🏅 Badges agora: **{n}/8**")
         except Exception as e:
             await ctx.send(f"Erro ao definir badges: `{e}`")
@@ -761,12 +749,12 @@ class AdventureCog(commands.Cog):
         flag = (flag or "").strip().lower()
         if not flag:
             return await ctx.send("Informe a flag. Ex.: `!giveflag hm_surf`")
-        flags = self._fetch_flags(ctx.author.id)
+        flags = await db_utils.run_sync(self._fetch_flags, ctx.author.id)
         if flag in flags:
             return await ctx.send(f"Flag **{flag}** já está setada.")
         flags.append(flag)
         try:
-            self._save_flags(ctx.author.id, flags)
+            await db_utils.run_sync(self._save_flags, ctx.author.id, flags)
             await ctx.send(f"✅ Flag **{flag}** concedida.")
         except Exception as e:
             await ctx.send(f"Erro ao salvar flag: `{e}`")
@@ -775,12 +763,12 @@ class AdventureCog(commands.Cog):
     async def del_flag(self, ctx: commands.Context, *, flag: str):
         """Remove uma flag do jogador."""
         flag = (flag or "").strip().lower()
-        flags = self._fetch_flags(ctx.author.id)
+        flags = await db_utils.run_sync(self._fetch_flags, ctx.author.id)
         if flag not in flags:
             return await ctx.send(f"Flag **{flag}** não estava setada.")
         flags = [f for f in flags if f != flag]
         try:
-            self._save_flags(ctx.author.id, flags)
+            await db_utils.run_sync(self._save_flags, ctx.author.id, flags)
             await ctx.send(f"🗑️ Flag **{flag}** removida.")
         except Exception as e:
             await ctx.send(f"Erro ao salvar flag: `{e}`")
@@ -817,19 +805,17 @@ class AdventureCog(commands.Cog):
         - hm_surf, hm_dive, hm_strength, hm_rock_climb, hm_waterfall, flash, tea_event, clear_snorlax
         """
         want = {"hm_surf", "hm_dive", "hm_strength", "hm_rock_climb", "hm_waterfall", "flash", "tea_event", "clear_snorlax"}
-        flags = set(self._fetch_flags(ctx.author.id))
+        flags = set(await db_utils.run_sync(self._fetch_flags, ctx.author.id))
         if want.issubset(flags):
             return await ctx.send("Você já tem todas as flags do kit.")
         flags |= want
         try:
-            self._save_flags(ctx.author.id, list(flags))
+            await db_utils.run_sync(self._save_flags, ctx.author.id, list(flags))
             await ctx.send("🎁 Kit de flags dos gates concedido com sucesso.")
         except Exception as e:
             await ctx.send(f"Erro ao salvar flags: `{e}`")
 
 
 async def setup(bot: commands.Bot):
-    supabase = getattr(bot, "supabase", None)
-    if supabase is None:
-        raise RuntimeError("AdventureCog: defina bot.supabase antes de carregar a extensão.")
+    supabase = getattr(bot, "supabase", None) or db_utils.get_client()
     await bot.add_cog(AdventureCog(bot, supabase))
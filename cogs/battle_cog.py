@@ -2,20 +2,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import os
+import asyncio
 import math
 import random
-from typing import Optional, List, Dict, Any, Tuple, Callable
+from typing import Optional, List, Dict, Any, Tuple, Callable, TYPE_CHECKING
 
 import discord
 from discord.ext import commands
-from supabase import create_client, Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 
 # Utils do projeto
-import utils.pokeapi_service as pokeapi  # ...
+from utils import db_utils
 from utils import battle_utils  # ...
-from utils.inventory_utils import get_item_qty, consume_item, POKEBALL_NAME
+from utils import battle_store
+from utils import growth_utils
+from utils import move_utils
+from utils import roster_utils
+from utils import species_utils
+from utils.inventory_utils import take_item, POKEBALL_NAME
 from utils import wild_utils  # novo: lógica de escolha de Pokémon selvagem
+from utils import warmup_utils
 
 
 # Se tiver helper de captura persistida:
@@ -28,9 +36,8 @@ except Exception:
 # Supabase helper
 # =========================
 def get_supabase_client() -> Client:
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    return create_client(url, key)
+    """Client compartilhado do processo (pool único, ver db_utils)."""
+    return db_utils.get_client()
 
 # =========================
 # Config
@@ -39,6 +46,9 @@ LEVEL_CAP = 100
 HAPPINESS_GAIN_ON_WIN = 2
 HAPPINESS_CAP = 255
 DEFAULT_WILD = "pidgey"  # oponente selvagem de teste
+AI_MOVE_CANDIDATES = ("gust", "quick-attack", "tackle")
+# quanto o !battle espera o warm-up do startup antes de pedir para tentar depois
+WARMUP_GATE_WAIT_S = float(os.getenv("WARMUP_GATE_WAIT_S", "8"))
 
 # =========================
 # Estado de batalha
@@ -72,60 +82,35 @@ class BattleState:
 # =========================
 # Helpers BD
 # =========================
-def fetch_active_party_mon(supabase: Client, player_id: int) -> Optional[dict]:
+async def fetch_active_party_mon(supabase: Client, player_id: int) -> Optional[dict]:
     """Pega o primeiro Pokémon da party (menor party_position)."""
     try:
-        res = (
-            supabase.table("player_pokemon")
-            .select("*")
-            .eq("player_id", player_id)
-            .filter("party_position", "not.is", "null")
-            .order("party_position")
-            .limit(1)
-            .execute()
-        )
-        rows = res.data or []
-        return dict(rows[0]) if rows else None
+        return (await roster_utils.get_roster(supabase, player_id)).active()
     except Exception as e:
         print(f"[Battle] erro party: {e}", flush=True)
         return None
 
 
-def fetch_party_list(supabase: Client, player_id: int) -> List[dict]:
+async def fetch_party_list(supabase: Client, player_id: int) -> List[dict]:
     """Lista completa da party (1..6), ordenada, com campos úteis."""
     try:
-        res = (
-            supabase.table("player_pokemon")
-            .select("*")
-            .eq("player_id", player_id)
-            .filter("party_position", "not.is", "null")
-            .order("party_position", desc=False)
-            .execute()
-        )
-        return res.data or []
+        return await roster_utils.get_party(supabase, player_id)
     except Exception as e:
         print(f"[Battle] erro listar party: {e}", flush=True)
         return []
 
 
-def update_player_mon_hp(supabase: Client, mon_id: str, new_hp: int):
-    try:
-        supabase.table("player_pokemon") \
-            .update({"current_hp": max(0, int(new_hp))}) \
-            .eq("id", mon_id) \
-            .execute()
-    except Exception as e:
-        print(f"[Battle] falha update HP: {e}", flush=True)
-
-
 # =========================
 # Cog
 # =========================
 class BattleCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.supabase = get_supabase_client()
+        self.supabase = getattr(bot, "supabase", None) or get_supabase_client()
         self.active_battles: Dict[int, BattleState] = {}  # uma por jogador
+        # HP/XP/felicidade da batalha ficam aqui até o fim/troca/checkpoint
+        self.pending = battle_store.BattleWriteBuffer()
+        self._checkpoint_task: Optional[asyncio.Task] = None
 
     # ---------- util ----------
     async def _send_log(self, ctx_or_inter, text: str):
@@ -139,10 +124,13 @@ class BattleCog(commands.Cog):
             pass
 
     async def _load_player_active_mon(self, user_id: int) -> Optional[dict]:
-        return fetch_active_party_mon(self.supabase, user_id)
+        mon = await fetch_active_party_mon(self.supabase, user_id)
+        return self.pending.overlay([mon])[0] if mon else None
 
     async def _get_party(self, user_id: int) -> List[dict]:
-        return fetch_party_list(self.supabase, user_id)
+        rows = await fetch_party_list(self.supabase, user_id)
+        # HP/XP ainda não gravados (write-behind) valem mais que o banco
+        return self.pending.overlay(rows)
 
     async def _can_start_wild_battle(self, user_id: int, limit: int = 10) -> tuple[bool, int]:
         """
@@ -152,12 +140,11 @@ class BattleCog(commands.Cog):
         Se der erro de BD, não bloqueia a batalha (falha "aberta").
         """
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("players")
                 .select("wild_battles_since_badge,badges")
                 .eq("discord_id", user_id)
                 .limit(1)
-                .execute()
             )
             rows = res.data or []
             if not rows:
@@ -171,11 +158,10 @@ class BattleCog(commands.Cog):
                 return False, current
 
             new_val = current + 1
-            (
+            await db_utils.execute(
                 self.supabase.table("players")
                 .update({"wild_battles_since_badge": new_val})
                 .eq("discord_id", user_id)
-                .execute()
             )
             return True, new_val
         except Exception as e:
@@ -184,44 +170,37 @@ class BattleCog(commands.Cog):
             return True, 0
 
     # ---------- dados de movimentos / estado inicial ----------
-    async def _load_move_info(self, move_name: str) -> Dict[str, Any]:
-        try:
-            url = f"https://pokeapi.co/api/v2/move/{str(move_name).lower()}"
-            data = await pokeapi.get_data_from_url(url)
-            if not data:
-                return {
-                    "name": move_name,
-                    "type": "normal",
-                    "power": 40,
-                    "damage_class": {"name": "physical"},
-                }
-            return {
-                "name": data.get("name", move_name),
-                "type": (data.get("type") or {}).get("name", "normal"),
-                "power": data.get("power") or 40,
-                "damage_class": data.get("damage_class") or {"name": "physical"},
-            }
-        except Exception:
-            return {
-                "name": move_name,
-                "type": "normal",
-                "power": 40,
-                "damage_class": {"name": "physical"},
-            }
-
-    async def _inflate_player_moves(self, mon_row: dict) -> List[Dict[str, Any]]:
-        moves = mon_row.get("moves") or []
-        result: List[Dict[str, Any]] = []
-        for m in moves[:4]:
-            if not m:
-                continue
-            info = await self._load_move_info(m)
-            result.append({
-                "name": info["name"],
-                "type": info["type"],
-                "power": int(info["power"] or 0),
-                "category": (info["damage_class"] or {}).get("name", "physical"),
-            })
+    async def cog_load(self):
+        # catálogo de golpes pronto antes da primeira batalha
+        await move_utils.preload(extra=AI_MOVE_CANDIDATES)
+
+        # batalhas interrompidas por queda do bot: regrava o que ficou no journal
+        recovered = self.pending.recover()
+        if recovered:
+            written = await self.pending.flush_all(self.supabase)
+            print(f"[Battle] Journal: {written}/{recovered} Pokémon recuperados e gravados.", flush=True)
+        self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
+
+    async def cog_unload(self):
+        if self._checkpoint_task:
+            self._checkpoint_task.cancel()
+        await self.pending.flush_all(self.supabase)
+        self.pending.close()
+
+    async def _checkpoint_loop(self):
+        """Grava periodicamente o que está pendente há mais de CHECKPOINT_SECONDS."""
+        while True:
+            await asyncio.sleep(battle_store.CHECKPOINT_SECONDS)
+            try:
+                await self.pending.flush_all(
+                    self.supabase,
+                    older_than=battle_store.CHECKPOINT_SECONDS,
+                )
+            except Exception as e:
+                print(f"[Battle] erro no checkpoint: {e}", flush=True)
+
+    def _inflate_player_moves(self, mon_row: dict) -> List[Dict[str, Any]]:
+        result = move_utils.battle_moves(mon_row.get("moves") or [])
         if not result:
             result = [{
                 "name": "tackle",
@@ -232,15 +211,8 @@ class BattleCog(commands.Cog):
         return result
 
     async def _get_sprite_url(self, name: str, shiny: bool = False) -> Optional[str]:
-        data = await pokeapi.get_pokemon_data(name)
-        if not data:
-            return None
-        sprites = data.get("sprites", {}) or {}
-        other = sprites.get("other", {}) or {}
-        art = other.get("official-artwork", {}) or {}
-        if shiny:
-            return sprites.get("front_shiny") or art.get("front_shiny")
-        return sprites.get("front_default") or art.get("front_default")
+        info = await species_utils.ensure_species(name)
+        return info.sprite(shiny) if info else None
 
     async def _build_state(self, ctx_or_inter) -> Optional[BattleState]:
         """
@@ -275,13 +247,11 @@ class BattleCog(commands.Cog):
         st.player_mon = dict(mon)
         mon_name = mon["pokemon_api_name"]
 
-        mon_data = await pokeapi.get_pokemon_data(mon_name)
-        st.player_types = [
-            t["type"]["name"]
-            for t in (mon_data or {}).get("types", [])
-        ]
+        mon_info = await species_utils.ensure_species(mon_name)
+        st.player_types = list(mon_info.types) if mon_info else []
 
-        st.player_moves = await self._inflate_player_moves(mon)
+        await move_utils.ensure_moves(mon.get("moves") or [])
+        st.player_moves = self._inflate_player_moves(mon)
         st.player_sprite_url = await self._get_sprite_url(
             mon_name,
             shiny=bool(mon.get("is_shiny")),
@@ -302,29 +272,14 @@ class BattleCog(commands.Cog):
         st.opp_name = wild_info["pokemon_api_name"]
         st.opp_level = int(wild_info["level"])
 
-        # Dados do oponente a partir da PokeAPI
-        opp_data = await pokeapi.get_pokemon_data(st.opp_name)
-        opp_species = await pokeapi.get_pokemon_species_data(
-            (opp_data or {}).get("species", {}).get("name", st.opp_name)
-        )
-
-        st.opp_types = [
-            t["type"]["name"]
-            for t in (opp_data or {}).get("types", [])
-        ] if opp_data else []
-
-        st.opp_sprite_url = (
-            (opp_data or {}).get("sprites", {}).get("other", {})
-            .get("official-artwork", {})
-            .get("front_default")
-            or (opp_data or {}).get("sprites", {}).get("front_default")
-        )
-
-        st.opp_base_exp = int((opp_data or {}).get("base_experience") or 50)
-        st.opp_capture_rate = int((opp_species or {}).get("capture_rate") or 255)
-
-        base_stats = (opp_data or {}).get("stats", [])
-        st.opp_stats = pokeapi.calculate_stats_for_level(base_stats, st.opp_level)
+        # Dados do oponente (índice de espécies)
+        opp_info = await species_utils.ensure_species(st.opp_name)
+        if opp_info:
+            st.opp_types = list(opp_info.types)
+            st.opp_sprite_url = opp_info.artwork()
+            st.opp_base_exp = opp_info.base_experience
+            st.opp_capture_rate = opp_info.capture_rate
+            st.opp_stats = opp_info.stats_for_level(st.opp_level)
         st.opp_hp = int(st.opp_stats.get("max_hp", 10))
 
         return st
@@ -345,23 +300,20 @@ class BattleCog(commands.Cog):
         level = int(st.player_mon["current_level"])
         reward_xp = max(1, math.floor((st.opp_base_exp * max(1, level)) / 7))
 
-        species = await pokeapi.get_pokemon_species_data(st.player_mon["pokemon_api_name"])
-        growth_url = (species or {}).get("growth_rate", {}).get("url")
+        mon_info = await species_utils.ensure_species(st.player_mon["pokemon_api_name"])
         current_xp = int(st.player_mon.get("current_xp") or 0)
         new_total_xp = current_xp + reward_xp
 
         current_level = int(st.player_mon.get("current_level") or 1)
         target_level = current_level
 
-        if growth_url:
-            for lv in range(current_level + 1, LEVEL_CAP + 1):
-                need = await pokeapi.get_total_xp_for_level(growth_url, lv)
-                if need == float("inf"):
-                    break
-                if new_total_xp >= int(need):
-                    target_level = lv
-                else:
-                    break
+        if mon_info:
+            table = mon_info.growth_table()
+            if table:
+                target_level = max(
+                    current_level,
+                    growth_utils.level_for_xp(table, new_total_xp, cap=LEVEL_CAP),
+                )
 
         update_payload: Dict[str, Any] = {
             "current_xp": new_total_xp,
@@ -372,11 +324,7 @@ class BattleCog(commands.Cog):
         }
 
         if target_level > current_level:
-            pkmn_data = await pokeapi.get_pokemon_data(st.player_mon["pokemon_api_name"])
-            new_stats = pokeapi.calculate_stats_for_level(
-                (pkmn_data or {}).get("stats", []),
-                target_level,
-            )
+            new_stats = mon_info.stats_for_level(target_level)
             delta_hp = int(new_stats.get("max_hp", st.player_mon["max_hp"])) - int(
                 st.player_mon["max_hp"]
             )
@@ -401,10 +349,7 @@ class BattleCog(commands.Cog):
                 ),
             })
 
-        self.supabase.table("player_pokemon") \
-            .update(update_payload) \
-            .eq("id", st.player_mon["id"]) \
-            .execute()
+        self.pending.stage(st.user_id, st.player_mon["id"], update_payload)
         st.player_mon.update(update_payload)
         return reward_xp, new_total_xp
 
@@ -678,6 +623,7 @@ class BattleCog(commands.Cog):
             return
         st.ended = True
         self.active_battles.pop(st.user_id, None)
+        await self.pending.flush(self.supabase, st.user_id)
 
         # remove view da mensagem
         try:
@@ -719,6 +665,7 @@ class BattleCog(commands.Cog):
             return
         st.ended = True
         self.active_battles.pop(st.user_id, None)
+        await self.pending.flush(self.supabase, st.user_id)
 
         try:
             if message:
@@ -840,16 +787,18 @@ class BattleCog(commands.Cog):
         except Exception:
             pass
 
+        # o Pokémon que sai tem o HP gravado agora
+        if st.player_mon.get("id") is not None:
+            await self.pending.flush(self.supabase, st.user_id, st.player_mon["id"])
+
         # Atualiza snapshot do mon ativo
         st.player_mon = new_mon
 
         mon_name = new_mon["pokemon_api_name"]
-        mon_data = await pokeapi.get_pokemon_data(mon_name)
-        st.player_types = [
-            t["type"]["name"]
-            for t in (mon_data or {}).get("types", [])
-        ]
-        st.player_moves = await self._inflate_player_moves(new_mon)
+        mon_info = await species_utils.ensure_species(mon_name)
+        st.player_types = list(mon_info.types) if mon_info else []
+        await move_utils.ensure_moves(new_mon.get("moves") or [])
+        st.player_moves = self._inflate_player_moves(new_mon)
         st.player_sprite_url = await self._get_sprite_url(
             mon_name,
             shiny=new_mon.get("is_shiny", False),
@@ -858,7 +807,7 @@ class BattleCog(commands.Cog):
         # Se troca voluntária → oponente ataca depois da troca
         if not forced:
             # Escolhe um golpe simples da IA
-            opp_move = await self._choose_ai_move(st)
+            opp_move = self._choose_ai_move(st)
             await self._resolve_attack(
                 attacker="opp",
                 st=st,
@@ -958,7 +907,7 @@ class BattleCog(commands.Cog):
         )
         new_hp = max(0, int(st.player_mon["current_hp"]) - dmg)
         st.player_mon["current_hp"] = new_hp
-        update_player_mon_hp(self.supabase, st.player_mon["id"], new_hp)
+        self.pending.stage(st.user_id, st.player_mon["id"], {"current_hp": new_hp})
         eff_txt = battle_utils.describe_effectiveness(eff)
         line = f"O {st.opp_name.capitalize()} usou **{move['name'].capitalize()}**!"
         if eff_txt:
@@ -967,17 +916,12 @@ class BattleCog(commands.Cog):
         await self._send_log(ctx_or_inter, line)
         return dmg, eff_txt
 
-    async def _choose_ai_move(self, st: BattleState) -> Dict[str, Any]:
-        # tenta moves "gust", "quick-attack", "tackle" (se existirem na API)
-        for cand in ["gust", "quick-attack", "tackle"]:
-            info = await self._load_move_info(cand)
-            if info and info.get("power"):
-                return {
-                    "name": info["name"],
-                    "type": info["type"],
-                    "power": info["power"],
-                    "category": info["damage_class"]["name"],
-                }
+    def _choose_ai_move(self, st: BattleState) -> Dict[str, Any]:
+        # tenta moves "gust", "quick-attack", "tackle" (se existirem no catálogo)
+        for cand in AI_MOVE_CANDIDATES:
+            info = move_utils.MOVES.get(cand)
+            if info and info.power:
+                return info.as_battle_move()
         return {
             "name": "tackle",
             "type": "normal",
@@ -1010,7 +954,7 @@ class BattleCog(commands.Cog):
 
         # Opp responde se vivo
         if st.opp_hp > 0:
-            opp_move = await self._choose_ai_move(st)
+            opp_move = self._choose_ai_move(st)
             await self._resolve_attack(
                 attacker="opp",
                 st=st,
@@ -1086,39 +1030,9 @@ class BattleCog(commands.Cog):
                     "Esta batalha não está mais ativa.",
                 )
 
-            # inventário
+            # inventário: decrementa só se houver saldo (uma chamada, atômica)
             try:
-                qty = await get_item_qty(
-                    self.supabase,
-                    st.user_id,
-                    POKEBALL_NAME,
-                )
-            except Exception as inv_e:
-                return await self._send_log(
-                    interaction,
-                    f"❌ Erro ao checar inventário: `{inv_e}`",
-                )
-
-            if qty <= 0:
-                await self._send_log(
-                    interaction,
-                    "❌ Você não tem Pokébolas suficientes.",
-                )
-                emb = self._build_embed(st)
-                view = BattleCog.BattleView(self, st)
-                view.message = interaction.message
-                try:
-                    await interaction.followup.edit_message(
-                        message_id=interaction.message.id,
-                        embed=emb,
-                        view=view,
-                    )
-                except Exception:
-                    pass
-                return
-
-            try:
-                ok_consume = await consume_item(
+                left = await take_item(
                     self.supabase,
                     st.user_id,
                     POKEBALL_NAME,
@@ -1129,10 +1043,11 @@ class BattleCog(commands.Cog):
                     interaction,
                     f"❌ Erro ao consumir item: `{inv_e}`",
                 )
-            if not ok_consume:
+
+            if left is None:
                 await self._send_log(
                     interaction,
-                    "❌ Falha ao consumir a Pokébola.",
+                    "❌ Você não tem Pokébolas suficientes.",
                 )
                 emb = self._build_embed(st)
                 view = BattleCog.BattleView(self, st)
@@ -1149,7 +1064,7 @@ class BattleCog(commands.Cog):
 
             await self._send_log(
                 interaction,
-                f"🎯 Você arremessou uma **{POKEBALL_NAME}**. ({qty-1} restantes)",
+                f"🎯 Você arremessou uma **{POKEBALL_NAME}**. ({left} restantes)",
             )
 
             # captura
@@ -1213,7 +1128,7 @@ class BattleCog(commands.Cog):
                 interaction,
                 "😓 O Pokémon escapou!",
             )
-            opp_move = await self._choose_ai_move(st)
+            opp_move = self._choose_ai_move(st)
             await self._resolve_attack(
                 attacker="opp",
                 st=st,
@@ -1340,6 +1255,13 @@ class BattleCog(commands.Cog):
     # =========================
     @commands.command(name="battle")
     async def battle_cmd(self, ctx: commands.Context):
+        if not await warmup_utils.wait_ready(WARMUP_GATE_WAIT_S):
+            await ctx.send(
+                "⏳ O bot ainda está carregando os dados de batalha. Tente de novo em instantes.\n"
+                f"`{warmup_utils.progress_text()}`"
+            )
+            return
+
         if ctx.author.id in self.active_battles:
             await ctx.send(
                 "Você já está em uma batalha ativa. Termine-a antes de começar outra."
@@ -1,13 +1,14 @@
 # cogs/black_shop_cog.py
 # -*- coding: utf-8 -*-
 
+from __future__ import annotations
 import discord
 from discord.ext import commands
-import os
 import random
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-from supabase import create_client, Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 from utils.static_pokemon_utils import (
     StaticPokemon,
@@ -15,6 +16,7 @@ from utils.static_pokemon_utils import (
     get_black_slots_pool,
     get_black_shop_basic_pool,
 )
+from utils import db_utils, roster_utils, species_utils, stats_utils
 
 from cogs.player_cog import add_pokemon_to_player
 
@@ -24,9 +26,8 @@ from cogs.player_cog import add_pokemon_to_player
 # -------------------------------------------------------------------
 
 def get_supabase_client() -> Client:
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    return create_client(url, key)
+    """Client compartilhado do processo (pool único, ver db_utils)."""
+    return db_utils.get_client()
 
 # -------------------------------------------------------------------
 # Config do Cassino / Mercado Negro
@@ -80,19 +81,18 @@ class BlackShopCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.supabase: Client = get_supabase_client()
+        self.supabase: Client = getattr(bot, "supabase", None) or get_supabase_client()
 
     # ---------------------- helpers de dinheiro ----------------------
 
     async def get_player_money(self, player_id: int) -> int:
         """Busca o dinheiro atual do jogador (tabela players.money)."""
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("players")
                 .select("money")
                 .eq("discord_id", player_id)
                 .limit(1)
-                .execute()
             )
             data = res.data[0] if res.data else None
             if not data:
@@ -104,9 +104,11 @@ class BlackShopCog(commands.Cog):
 
     async def update_player_money(self, player_id: int, new_amount: int) -> bool:
         try:
-            self.supabase.table("players").update(
-                {"money": new_amount}
-            ).eq("discord_id", player_id).execute()
+            await db_utils.execute(
+                self.supabase.table("players").update(
+                    {"money": new_amount}
+                ).eq("discord_id", player_id)
+            )
             return True
         except Exception as e:
             print(f"[BlackShop][update_player_money] erro: {e}")
@@ -190,9 +192,12 @@ class BlackShopCog(commands.Cog):
 
         if random.random() < extra_chance:
             try:
-                self.supabase.table("player_pokemon").update(
-                    {"is_shiny": True}
-                ).eq("id", pokemon_row["id"]).execute()
+                await db_utils.execute(
+                    self.supabase.table("player_pokemon").update(
+                        {"is_shiny": True}
+                    ).eq("id", pokemon_row["id"])
+                )
+                roster_utils.invalidate(pokemon_row["player_id"])
                 pokemon_row["is_shiny"] = True
             except Exception as e:
                 print(f"[BlackShop][_maybe_boost_shiny] erro ao atualizar shiny: {e}")
@@ -204,6 +209,8 @@ class BlackShopCog(commands.Cog):
         player_id: int,
         pokemon_def: StaticPokemon,
         bet_amount: Optional[int] = None,
+        level: Optional[int] = None,
+        stats: Optional[dict] = None,
     ) -> dict:
         """
         Usa add_pokemon_to_player para realmente criar o Pokémon no banco.
@@ -213,12 +220,15 @@ class BlackShopCog(commands.Cog):
 
         - api_name: se existir é usado direto pra PokeAPI
         - senão: name.lower() (funciona pra maioria dos casos simples)
+
+        level/stats podem vir pré-calculados (compra em lote).
         """
         pokedex_id = pokemon_def["id"]
         display_name = pokemon_def["name"]
         api_name = pokemon_def.get("api_name") or display_name.lower()
 
-        level = random.randint(5, 15)
+        if level is None:
+            level = random.randint(5, 15)
 
         result = await add_pokemon_to_player(
             player_id=player_id,
@@ -226,6 +236,7 @@ class BlackShopCog(commands.Cog):
             level=level,
             captured_at="Cassino Mercado Negro",
             assign_to_party_if_space=True,
+            stats=stats,
         )
         if not result.get("success"):
             return {
@@ -485,13 +496,22 @@ class BlackShopCog(commands.Cog):
 
         # Escolhe pokémons aleatórios do pool (filtrado ou não por região)
         bought_pokemon = []
-        for _ in range(quantity):
-            pool = get_black_shop_basic_pool(region=region)
-            base_def = random.choice(pool)
+        pool = get_black_shop_basic_pool(region=region)
+        picks = [random.choice(pool) for _ in range(quantity)]
+        levels = [random.randint(5, 15) for _ in picks]
+
+        # espécies + stats do lote inteiro de uma vez
+        api_names = [d.get("api_name") or d["name"].lower() for d in picks]
+        infos = await species_utils.ensure_many(api_names)
+        batch_stats = stats_utils.stats_for_species([infos.get(n.lower()) for n in api_names], levels)
+
+        for base_def, level, stats in zip(picks, levels, batch_stats):
             reward = await self._grant_pokemon_to_player(
                 player_id=ctx.author.id,
                 pokemon_def=base_def,
                 bet_amount=None,  # sem bônus extra de shiny aqui (se quiser, passa um valor)
+                level=level,
+                stats=stats or None,
             )
             bought_pokemon.append(reward)
 
@@ -555,13 +575,12 @@ class BlackShopCog(commands.Cog):
           - current_level (int) -> usado para calcular o valor
         """
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("player_pokemon")
                 .select("*")
                 .eq("id", pokemon_id)
                 .eq("player_id", ctx.author.id)
                 .limit(1)
-                .execute()
             )
             data = res.data[0] if res.data else None
         except Exception as e:
@@ -584,9 +603,12 @@ class BlackShopCog(commands.Cog):
 
         # Apaga o Pokémon do jogador
         try:
-            self.supabase.table("player_pokemon").delete().eq(
-                "id", pokemon_id
-            ).eq("player_id", ctx.author.id).execute()
+            await db_utils.execute(
+                self.supabase.table("player_pokemon").delete().eq(
+                    "id", pokemon_id
+                ).eq("player_id", ctx.author.id)
+            )
+            roster_utils.invalidate(ctx.author.id)
         except Exception as e:
             print(f"[BlackShop][blacksell] erro ao deletar pokemon: {e}")
             await ctx.send("Erro ao remover o Pokémon do banco. Venda cancelada.")
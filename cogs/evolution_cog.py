@@ -1,16 +1,20 @@
 # cogs/evolution_cog.py
 
+from __future__ import annotations
 import discord
-import os
-from typing import Tuple
+from typing import Tuple, TYPE_CHECKING
 from discord.ext import commands
 from discord import ui
-from supabase import create_client, Client
-import asyncio # Importado para o helper de contexto
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Importa os utilitários corretos
-import utils.pokeapi_service as pokeapi
 import utils.evolution_utils as evolution_utils
+from utils import db_utils
+from utils import growth_utils
+from utils import roster_utils
+from utils import species_utils
+from utils import learnset_utils
 
 # --- CLASSES DE UI (MoveReplaceView) ---
 # (O código MoveReplaceView permanece o mesmo...)
@@ -43,20 +47,19 @@ class EvolutionCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        url: str = os.environ.get("SUPABASE_URL")
-        key: str = os.environ.get("SUPABASE_KEY")
-        self.supabase: Client = create_client(url, key)
+        self.supabase: Client = getattr(bot, "supabase", None) or db_utils.get_client()
         print("EvolutionCog carregado e conectado ao Supabase.")
 
     # --- FUNÇÕES DE LÓGICA INTERNA ---
 
     async def _update_pokemon_moves(self, pokemon_id: str, new_move: str, slot: int):
         try:
-            response = self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single().execute()
+            response = await db_utils.execute(self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single())
             if not response.data: return
             current_moves = response.data['moves']
             current_moves[slot] = new_move
-            self.supabase.table('player_pokemon').update({'moves': current_moves}).eq('id', pokemon_id).execute()
+            await db_utils.execute(self.supabase.table('player_pokemon').update({'moves': current_moves}).eq('id', pokemon_id))
+            roster_utils.invalidate_mon(pokemon_id)
         except Exception as e:
             print(f"Erro ao atualizar ataques no DB: {e}")
 
@@ -65,22 +68,11 @@ class EvolutionCog(commands.Cog):
     # =================================================================
 
     async def _get_new_moves_for_level(self, pokemon_api_name: str, new_level: int) -> list:
-        """(Helper) Apenas busca na API os novos movimentos para um nível, sem atualizar o DB."""
-        pokemon_api_data = await pokeapi.get_pokemon_data(pokemon_api_name)
-        if not pokemon_api_data: 
+        """(Helper) Apenas busca os novos movimentos para um nível (learnset), sem atualizar o DB."""
+        learnset = await learnset_utils.get_learnset(pokemon_api_name)
+        if not learnset:
             return []
-
-        newly_learned_moves = []
-        for move_info in pokemon_api_data['moves']:
-            move_name = move_info['move']['name']
-            for version_details in move_info['version_group_details']:
-                if (version_details['move_learn_method']['name'] == 'level-up' and
-                    version_details['level_learned_at'] == new_level and
-                    move_name not in newly_learned_moves):
-                    
-                    newly_learned_moves.append(move_name)
-                    break 
-        return newly_learned_moves
+        return learnset.moves_at(new_level)
 
     async def learn_moves_silently(self, pokemon_id: str, nickname: str, new_moves: list, channel) -> Tuple[list, list]:
         """
@@ -88,7 +80,7 @@ class EvolutionCog(commands.Cog):
         Não bloqueia. Retorna os movimentos que precisam de substituição.
         """
         try:
-            response = self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single().execute()
+            response = await db_utils.execute(self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single())
             if not response.data: 
                 return new_moves # Retorna todos como 'não aprendidos'
             
@@ -124,7 +116,7 @@ class EvolutionCog(commands.Cog):
 
         # Garante que 'current_moves' esteja atualizado se não foi pego na Etapa 1
         if not current_moves:
-             response = self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single().execute()
+             response = await db_utils.execute(self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single())
              if not response.data: return
              current_moves = response.data['moves']
 
@@ -136,7 +128,7 @@ class EvolutionCog(commands.Cog):
             )
             # Precisamos buscar os movimentos atualizados do DB *a cada loop*
             # pois o 'current_moves' local pode estar desatualizado após a primeira substituição
-            db_response = self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single().execute()
+            db_response = await db_utils.execute(self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single())
             if not db_response.data: continue
             updated_moves = db_response.data['moves']
 
@@ -167,27 +159,26 @@ class EvolutionCog(commands.Cog):
         try:
             # 1. Busca localização E HORA do jogador
             # Isso lê a coluna 'game_time_of_day' da tabela 'players'
-            player_res = self.supabase.table('players').select('current_location_name, game_time_of_day').eq('discord_id', player_id).single().execute()
+            player_res = await db_utils.execute(self.supabase.table('players').select('current_location_name, game_time_of_day').eq('discord_id', player_id).single())
             
             if player_res.data:
                 location_name = player_res.data.get('current_location_name')
                 time_of_day = player_res.data.get('game_time_of_day', 'day') # Usa o dado do DB
 
             # 2. Busca o restante da party
-            party_res = self.supabase.table('player_pokemon') \
-                .select('pokemon_api_name') \
-                .eq('player_id', player_id) \
-                .neq('id', pokemon_to_exclude_id) \
-                .execute()
+            party_res = await db_utils.execute(
+                self.supabase.table('player_pokemon')
+                .select('pokemon_api_name')
+                .eq('player_id', player_id)
+                .neq('id', pokemon_to_exclude_id)
+            )
 
             # 3. Coleta os tipos
             if party_res.data:
-                api_tasks = [pokeapi.get_pokemon_data(pkmn['pokemon_api_name']) for pkmn in party_res.data]
-                results = await asyncio.gather(*api_tasks)
-                for api_data in results:
-                    if api_data and 'types' in api_data:
-                        for type_info in api_data['types']:
-                            party_types.add(type_info['type']['name'])
+                infos = await species_utils.ensure_many(pkmn['pokemon_api_name'] for pkmn in party_res.data)
+                for info in infos.values():
+                    if info:
+                        party_types.update(info.types)
         except Exception as e:
             print(f"Erro ao montar contexto de evolução: {e}")
             
@@ -203,12 +194,12 @@ class EvolutionCog(commands.Cog):
     # =================================================================
     async def check_for_level_up(self, pokemon: dict, channel):
         """Verifica se um Pokémon tem XP suficiente para subir de nível e atualiza stats."""
-        species_data = await pokeapi.get_pokemon_species_data(pokemon['pokemon_api_name'])
-        if not species_data: return
+        info = await species_utils.ensure_species(pokemon['pokemon_api_name'])
+        if not info: return
 
-        growth_rate_url = species_data['growth_rate']['url']
+        growth_table = info.growth_table()
         next_level = pokemon['current_level'] + 1
-        xp_needed = await pokeapi.get_total_xp_for_level(growth_rate_url, next_level)
+        xp_needed = growth_utils.xp_for_level(growth_table, next_level)
         if xp_needed == float('inf'):
              return 
 
@@ -216,14 +207,15 @@ class EvolutionCog(commands.Cog):
             new_level = pokemon['current_level'] + 1
             try:
                 # 1. ATUALIZA NÍVEL E STATS NO DB
-                pokemon_api_data = await pokeapi.get_pokemon_data(pokemon['pokemon_api_name'])
-                if not pokemon_api_data: break
-                recalculated_stats = pokeapi.calculate_stats_for_level(pokemon_api_data['stats'], new_level)
+                info = await species_utils.ensure_species(pokemon['pokemon_api_name'])
+                if not info: break
+                recalculated_stats = info.stats_for_level(new_level)
                 update_payload = {'current_level': new_level, **recalculated_stats}
                 if 'max_hp' in recalculated_stats:
                     update_payload['current_hp'] = recalculated_stats['max_hp']
 
-                response = self.supabase.table('player_pokemon').update(update_payload).eq('id', pokemon['id']).execute()
+                response = await db_utils.execute(self.supabase.table('player_pokemon').update(update_payload).eq('id', pokemon['id']))
+                roster_utils.invalidate(pokemon['player_id'])
                 if not response.data: break 
                 
                 await channel.send(f"✨ **{pokemon['nickname']}** subiu para o **nível {new_level}**! Seus stats aumentaram!")
@@ -285,7 +277,7 @@ class EvolutionCog(commands.Cog):
                 # ====================================================
 
                 # Se não evoluiu, pega a XP para o próximo loop
-                xp_needed = await pokeapi.get_total_xp_for_level(growth_rate_url, new_level + 1)
+                xp_needed = growth_utils.xp_for_level(growth_table, new_level + 1)
                 if xp_needed == float('inf'):
                     break 
 
@@ -297,16 +289,16 @@ class EvolutionCog(commands.Cog):
     # (permanece o mesmo)
     async def evolve_pokemon(self, discord_id: int, pokemon_db_id: str, new_pokemon_api_name: str, channel):
         try:
-            response = self.supabase.table('player_pokemon').select('current_level, nickname, pokemon_api_name').eq('id', pokemon_db_id).single().execute()
+            response = await db_utils.execute(self.supabase.table('player_pokemon').select('current_level, nickname, pokemon_api_name').eq('id', pokemon_db_id).single())
             if not response.data: return
             level = response.data['current_level']
             old_name = response.data['pokemon_api_name']
             nickname = response.data['nickname']
             await channel.send(f"O que? **{nickname}** está evoluindo!")
-            new_pokemon_api_data = await pokeapi.get_pokemon_data(new_pokemon_api_name)
-            if not new_pokemon_api_data: return
-            new_api_id = new_pokemon_api_data['id'] 
-            recalculated_stats = pokeapi.calculate_stats_for_level(new_pokemon_api_data['stats'], level)
+            new_info = await species_utils.ensure_species(new_pokemon_api_name)
+            if not new_info: return
+            new_api_id = new_info.id
+            recalculated_stats = new_info.stats_for_level(level)
             update_payload = {
                 'pokemon_api_name': new_pokemon_api_name,
                 'pokemon_pokedex_id': new_api_id,
@@ -316,7 +308,8 @@ class EvolutionCog(commands.Cog):
                 update_payload['current_hp'] = recalculated_stats['max_hp']
             if nickname.lower() == old_name.lower():
                 update_payload['nickname'] = new_pokemon_api_name.capitalize()
-            self.supabase.table('player_pokemon').update(update_payload).eq('id', pokemon_db_id).execute()
+            await db_utils.execute(self.supabase.table('player_pokemon').update(update_payload).eq('id', pokemon_db_id))
+            roster_utils.invalidate(discord_id)
             await channel.send(f"🎉 <@{discord_id}>, seu **{nickname}** evoluiu para **{new_pokemon_api_name.capitalize()}**! 🎉")
         except Exception as e:
             print(f"Erro ao evoluir Pokémon: {e}")
@@ -326,7 +319,7 @@ class EvolutionCog(commands.Cog):
     @commands.is_owner()
     async def give_xp(self, ctx: commands.Context, amount: int, *, pokemon_nickname: str):
         try:
-            response = self.supabase.table('player_pokemon').select('*').eq('player_id', ctx.author.id).ilike('nickname', pokemon_nickname.strip()).execute()
+            response = await db_utils.execute(self.supabase.table('player_pokemon').select('*').eq('player_id', ctx.author.id).ilike('nickname', pokemon_nickname.strip()))
             if not response.data:
                 await ctx.send(f"Não encontrei nenhum Pokémon com o nome `{pokemon_nickname}`.")
                 return
@@ -335,7 +328,8 @@ class EvolutionCog(commands.Cog):
                 return
             pokemon = response.data[0]
             new_xp = pokemon['current_xp'] + amount
-            self.supabase.table('player_pokemon').update({'current_xp': new_xp}).eq('id', pokemon['id']).execute()
+            await db_utils.execute(self.supabase.table('player_pokemon').update({'current_xp': new_xp}).eq('id', pokemon['id']))
+            roster_utils.invalidate(ctx.author.id)
             await ctx.send(f"Você deu {amount} XP para **{pokemon['nickname']}**. XP Total agora: {new_xp}.")
             pokemon['current_xp'] = new_xp
             await self.check_for_level_up(pokemon, ctx.channel)
@@ -347,7 +341,7 @@ class EvolutionCog(commands.Cog):
     @commands.is_owner()
     async def give_happiness(self, ctx: commands.Context, amount: int, *, pokemon_nickname: str):
         try:
-            response = self.supabase.table('player_pokemon').select('id, nickname, happiness').eq('player_id', ctx.author.id).ilike('nickname', pokemon_nickname.strip()).execute()
+            response = await db_utils.execute(self.supabase.table('player_pokemon').select('id, nickname, happiness').eq('player_id', ctx.author.id).ilike('nickname', pokemon_nickname.strip()))
             if not response.data:
                 await ctx.send(f"Não encontrei nenhum Pokémon com o nome `{pokemon_nickname}`.")
                 return
@@ -358,7 +352,8 @@ class EvolutionCog(commands.Cog):
             current_happiness = pokemon.get('happiness', 70)
             new_happiness = current_happiness + amount
             new_happiness = max(0, min(255, new_happiness)) 
-            self.supabase.table('player_pokemon').update({'happiness': new_happiness}).eq('id', pokemon['id']).execute()
+            await db_utils.execute(self.supabase.table('player_pokemon').update({'happiness': new_happiness}).eq('id', pokemon['id']))
+            roster_utils.invalidate(ctx.author.id)
             await ctx.send(f"Você alterou a felicidade de **{pokemon['nickname']}** em {amount}. Felicidade Total agora: **{new_happiness}/255**.")
         except Exception as e:
             await ctx.send(f"Ocorreu um erro inesperado ao dar felicidade.")
@@ -1,28 +1,26 @@
 # cogs/move_relearner_cog.py
 
+from __future__ import annotations
 import discord
 from discord.ext import commands
 from discord import ui
-import os
-import aiohttp
-from supabase import create_client, Client
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import Client
+
+from utils import box_utils
+from utils import db_utils
+from utils import inventory_utils
+from utils import learnset_utils
+from utils import roster_utils
+
+HEART_SCALE_NAME = "Heart Scale"
 
 # --- Funções Auxiliares (Copiadas para modularidade) ---
 
 def get_supabase_client():
-    """Cria e retorna um cliente Supabase."""
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    return create_client(url, key)
-
-async def fetch_pokemon_data(pokemon_name: str):
-    """Busca dados de um Pokémon da PokeAPI."""
-    url = f"https://pokeapi.co/api/v2/pokemon/{pokemon_name.lower()}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return await response.json()
-            return None
+    """Retorna o client Supabase compartilhado do processo (ver db_utils)."""
+    return db_utils.get_client()
 
 # --- Classes de UI ---
 
@@ -204,7 +202,7 @@ class TeamSelectView(ui.View):
 class MoveRelearnerCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.supabase: Client = get_supabase_client()
+        self.supabase: Client = getattr(bot, "supabase", None) or get_supabase_client()
         self.heart_scale_id = None # Cache do ID da Heart Scale
 
     async def get_heart_scale_id(self) -> int | None:
@@ -213,11 +211,8 @@ class MoveRelearnerCog(commands.Cog):
             return self.heart_scale_id
         
         try:
-            res = self.supabase.table('items').select('id').ilike('name', 'Heart Scale').single().execute()
-            if res.data:
-                self.heart_scale_id = res.data['id']
-                return self.heart_scale_id
-            return None
+            self.heart_scale_id = await inventory_utils.get_item_id(self.supabase, HEART_SCALE_NAME)
+            return self.heart_scale_id
         except Exception as e:
             print(f"Erro ao buscar ID da Heart Scale: {e}")
             return None
@@ -231,58 +226,20 @@ class MoveRelearnerCog(commands.Cog):
             return False
             
         try:
-            # 1. Verificar se tem o item
-            res = self.supabase.table('player_inventory') \
-                .select('quantity') \
-                .eq('player_id', player_id) \
-                .eq('item_id', item_id) \
-                .single().execute()
-            
-            if not res.data or res.data['quantity'] <= 0:
-                return False # Não tem o item
-            
-            return True # Tem o item!
+            return await inventory_utils.get_item_qty(self.supabase, player_id, item_id) > 0
         except Exception as e:
             print(f"Erro ao checar Heart Scale: {e}")
             return False
 
     async def check_and_consume_heart_scale(self, player_id: int) -> bool:
-        """Verifica se o jogador tem uma Heart Scale e a consome."""
+        """Consome uma Heart Scale se o jogador tiver (tudo ou nada, uma chamada)."""
         item_id = await self.get_heart_scale_id()
         if not item_id:
             print("Erro Crítico: ID da Heart Scale não encontrado no DB.")
             return False
             
         try:
-            # 1. Verificar se tem o item
-            res = self.supabase.table('player_inventory') \
-                .select('quantity') \
-                .eq('player_id', player_id) \
-                .eq('item_id', item_id) \
-                .single().execute()
-            
-            if not res.data or res.data['quantity'] <= 0:
-                return False # Não tem o item
-
-            new_quantity = res.data['quantity'] - 1
-            
-            # 2. Consumir o item
-            if new_quantity == 0:
-                # Deleta o registro se acabou
-                self.supabase.table('player_inventory') \
-                    .delete() \
-                    .eq('player_id', player_id) \
-                    .eq('item_id', item_id) \
-                    .execute()
-            else:
-                # Apenas atualiza a quantidade
-                self.supabase.table('player_inventory') \
-                    .update({'quantity': new_quantity}) \
-                    .eq('player_id', player_id) \
-                    .eq('item_id', item_id) \
-                    .execute()
-            
-            return True # Consumido com sucesso
+            return await inventory_utils.apply_item_changes(self.supabase, player_id, {item_id: -1})
         except Exception as e:
             print(f"Erro ao consumir Heart Scale: {e}")
             return False
@@ -290,31 +247,23 @@ class MoveRelearnerCog(commands.Cog):
     async def _update_pokemon_moves(self, pokemon_id: str, new_move: str, slot: int):
         """(Copiado do evolution_cog.py) Atualiza a lista de ataques no DB."""
         try:
-            response = self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single().execute()
+            response = await db_utils.execute(self.supabase.table('player_pokemon').select('moves').eq('id', pokemon_id).single())
             if not response.data: return
             
             current_moves = response.data['moves']
             current_moves[slot] = new_move
             
-            self.supabase.table('player_pokemon').update({'moves': current_moves}).eq('id', pokemon_id).execute()
+            await db_utils.execute(self.supabase.table('player_pokemon').update({'moves': current_moves}).eq('id', pokemon_id))
+            roster_utils.invalidate_mon(pokemon_id)
         except Exception as e:
             print(f"Erro ao atualizar ataques no DB (MoveRelearner): {e}")
 
     async def get_all_learnable_moves(self, pokemon_api_name: str) -> list:
-        """Busca na PokeAPI todos os movimentos que um Pokémon aprende por 'level-up'."""
-        api_data = await fetch_pokemon_data(pokemon_api_name)
-        if not api_data:
+        """Todos os movimentos que um Pokémon aprende por 'level-up' (ordem alfabética)."""
+        learnset = await learnset_utils.get_learnset(pokemon_api_name)
+        if not learnset:
             return []
-            
-        learnable_moves = set()
-        for move_info in api_data['moves']:
-            for version_details in move_info['version_group_details']:
-                if version_details['move_learn_method']['name'] == 'level-up':
-                    learnable_moves.add(move_info['move']['name'])
-                    break # Só precisa checar uma vez por movimento
-        
-        # Ordena alfabeticamente
-        return sorted(list(learnable_moves))
+        return list(learnset.level_up_moves())
 
     # --- Lógica do Comando !relearn (dividida em etapas) ---
 
@@ -329,21 +278,20 @@ class MoveRelearnerCog(commands.Cog):
             await ctx.send(f"Você precisa de uma **Heart Scale** para usar este serviço. Você pode comprá-la na `!shop`.")
             return
         
-        # 2. Busca o time do jogador
+        # 2. Busca o time do jogador (party do cache de roster + começo da Box; o Select aceita 25)
         try:
-            team_res = self.supabase.table('player_pokemon') \
-                .select('id, nickname, current_level') \
-                .eq('player_id', ctx.author.id) \
-                .order('party_position') \
-                .execute()
+            team = await roster_utils.get_party(self.supabase, ctx.author.id)
+            if len(team) < 25:
+                page = await box_utils.fetch_page(self.supabase, ctx.author.id, limit=25 - len(team))
+                team += page.rows
             
-            if not team_res.data:
+            if not team:
                 await ctx.send("Você não tem Pokémon para ensinar.")
                 # --- ALTERADO: Não precisa devolver o item, pois não foi pego ---
                 return
 
             # 3. Mostra a View para escolher o Pokémon
-            view = TeamSelectView(ctx.author.id, team_res.data, self)
+            view = TeamSelectView(ctx.author.id, team, self)
             # --- ALTERADO: Mensagem não diz mais que o item foi entregue ---
             msg = await ctx.send("Qual Pokémon deve reaprender um movimento? (Requer 1x Heart Scale)", view=view)
             view.message = msg
@@ -357,13 +305,11 @@ class MoveRelearnerCog(commands.Cog):
         """Etapa 2: O Pokémon foi escolhido, agora mostra os movimentos."""
         try:
             # Busca o Pokémon completo
-            pkmn_res = self.supabase.table('player_pokemon').select('*').eq('id', pokemon_db_id).single().execute()
-            if not pkmn_res.data:
+            pokemon = await roster_utils.get_mon(self.supabase, interaction.user.id, pokemon_db_id)
+            if not pokemon:
                 await interaction.edit_original_response(content="Erro: Pokémon não encontrado.", view=None)
                 return
             
-            pokemon = pkmn_res.data
-            
             # Busca todos os movimentos de level-up da API
             all_moves = await self.get_all_learnable_moves(pokemon['pokemon_api_name'])
             
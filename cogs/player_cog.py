@@ -1,27 +1,33 @@
 # cogs/player_cog.py
 
-import os
+from __future__ import annotations
 import random
 import asyncio
 import discord
 from discord.ext import commands
 from discord import ui
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-from supabase import create_client, Client
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Utils do projeto (mantidos)
-import utils.pokeapi_service as pokeapi
+from utils import db_utils
+from utils import event_utils
 import utils.evolution_utils as evolution_utils  # (mantido para futuras evoluções)
+from utils import growth_utils
+from utils import species_utils
+from utils import learnset_utils
+from utils import roster_utils
+from utils import static_pokemon_utils
 
 # ===============================================
 # Supabase helper
 # ===============================================
 
 def get_supabase_client() -> Client:
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    return create_client(url, key)
+    """Client compartilhado do processo (pool único, ver db_utils)."""
+    return db_utils.get_client()
 
 # Helper de busca segura (evita .single() -> PGRST116)
 def supabase_fetch_one(supabase: Client, table: str, **filters) -> dict | None:
@@ -29,7 +35,7 @@ def supabase_fetch_one(supabase: Client, table: str, **filters) -> dict | None:
         q = supabase.table(table).select("*")
         for k, v in filters.items():
             q = q.eq(k, v)
-        res = q.limit(1).execute()
+        res = db_utils.execute_sync(q.limit(1))
         rows = res.data or []
         return rows[0] if rows else None
     except Exception as e:
@@ -67,11 +73,13 @@ async def add_pokemon_to_player(
     level: int = 5,
     captured_at: str = "Início da Jornada",
     assign_to_party_if_space: bool = True,
+    stats: Optional[dict] = None,
 ) -> dict:
     """
     Adiciona Pokémon ao jogador.
     Por padrão tenta alocar na PARTY (slot livre 1–6). Em caso de conflito (unique/23505),
     faz fallback automático para a BOX (party_position = None).
+    `stats` permite passar os stats já calculados em lote (stats_utils).
     """
     supabase = get_supabase_client()
 
@@ -79,13 +87,7 @@ async def add_pokemon_to_player(
     preferred_slot = None
     if assign_to_party_if_space:
         try:
-            occ = (
-                supabase.table("player_pokemon")
-                .select("party_position")
-                .eq("player_id", player_id)
-                .filter("party_position", "not.is", "null")
-                .execute()
-            ).data or []
+            occ = await roster_utils.get_party(supabase, player_id)
             occupied = {int(r["party_position"]) for r in occ if r.get("party_position") is not None}
             # primeiro slot livre de 1..6
             for s in range(1, 7):
@@ -96,27 +98,23 @@ async def add_pokemon_to_player(
             # Se falhar a leitura, não impede o insert; apenas não vamos usar slot preferido.
             preferred_slot = None
 
-    # 2) Dados da PokeAPI
-    poke_data = await pokeapi.get_pokemon_data(pokemon_api_name)
-    if not poke_data:
+    # 2) Dados da PokeAPI (índices de espécie e learnset)
+    info = await species_utils.ensure_species(pokemon_api_name)
+    learnset = await learnset_utils.get_learnset(pokemon_api_name)
+    if not info or not learnset:
         return {"success": False, "error": f"Pokémon '{pokemon_api_name}' não encontrado na API."}
 
     is_shiny = (random.randint(1, 4096) == 1)
-    calculated_stats = pokeapi.calculate_stats_for_level(poke_data["stats"], level)
-    initial_moves = pokeapi.get_initial_moves(poke_data, level)
+    calculated_stats = stats or info.stats_for_level(level)
+    initial_moves = learnset.initial_moves(level)
 
-    # 3) Espécie / XP inicial / Gênero
-    gender_ratio = -1
+    # 3) XP inicial / Gênero (índice de espécies)
+    gender_ratio = info.gender_rate
     starting_xp = 0
-    base_species_name = poke_data.get("species", {}).get("name") or pokemon_api_name
-    species_data = await pokeapi.get_pokemon_species_data(base_species_name)
-    if species_data:
-        gender_ratio = species_data.get("gender_rate", -1)
-        if "growth_rate" in species_data and level > 1:
-            growth_rate_url = species_data["growth_rate"]["url"]
-            xp_for_level = await pokeapi.get_total_xp_for_level(growth_rate_url, level)
-            if xp_for_level != float("inf"):
-                starting_xp = xp_for_level
+    if level > 1:
+        xp_for_level = growth_utils.xp_for_level(info.growth_table(), level)
+        if xp_for_level != float("inf"):
+            starting_xp = xp_for_level
 
     gender = "genderless"
     if gender_ratio != -1:
@@ -127,7 +125,7 @@ async def add_pokemon_to_player(
         return {
             "player_id": player_id,
             "pokemon_api_name": pokemon_api_name,
-            "pokemon_pokedex_id": poke_data["id"],
+            "pokemon_pokedex_id": info.id,
             "nickname": pokemon_api_name.capitalize(),
             "captured_at_location": captured_at,
             "is_shiny": is_shiny,
@@ -144,7 +142,7 @@ async def add_pokemon_to_player(
     # 5) Tentar inserir (priorizando PARTY se preferred_slot existir)
     first_try_slot = preferred_slot  # None = Box direto
     try:
-        insert_resp = supabase.table("player_pokemon").insert(payload(first_try_slot)).execute()
+        insert_resp = await db_utils.execute(supabase.table("player_pokemon").insert(payload(first_try_slot)))
         if insert_resp.data:
             if first_try_slot is None:
                 msg = "Pokémon adicionado com sucesso e enviado para a Box!"
@@ -158,7 +156,7 @@ async def add_pokemon_to_player(
         is_unique_conflict = ("23505" in err_txt) or ("duplicate key value violates unique constraint" in err_txt) or ("unique_party_position" in err_txt)
         if first_try_slot is not None and is_unique_conflict:
             try:
-                insert_resp = supabase.table("player_pokemon").insert(payload(None)).execute()
+                insert_resp = await db_utils.execute(supabase.table("player_pokemon").insert(payload(None)))
                 if insert_resp.data:
                     return {
                         "success": True,
@@ -170,6 +168,8 @@ async def add_pokemon_to_player(
                 return {"success": False, "error": f"Erro no banco ao tentar fallback para Box: {e2}"}
         # Outro erro qualquer
         return {"success": False, "error": f"Erro no banco de dados: {e}"}
+    finally:
+        roster_utils.invalidate(player_id)  # depois da escrita (sucesso ou não)
 
 # ===============================================
 # UI / Fluxo de criação (mantido e consolidado)
@@ -215,17 +215,7 @@ class StarterSelectView(ui.View):
     def __init__(self, region: str):
         super().__init__(timeout=180)
         self.region = region
-        self._starters_by_region: dict[str, list[str]] = {
-            "Kanto": ["bulbasaur", "charmander", "squirtle"],
-            "Johto": ["chikorita", "cyndaquil", "totodile"],
-            "Hoenn": ["treecko", "torchic", "mudkip"],
-            "Sinnoh": ["turtwig", "chimchar", "piplup"],
-            "Unova": ["snivy", "tepig", "oshawott"],
-            "Kalos": ["chespin", "fennekin", "froakie"],
-            "Alola": ["rowlet", "litten", "popplio"],
-            "Galar": ["grookey", "scorbunny", "sobble"],
-            "Paldea": ["sprigatito", "fuecoco", "quaxly"],
-        }
+        self._starters_by_region: dict[str, list[str]] = static_pokemon_utils.STARTERS_BY_REGION
 
         for starter in self._starters_by_region.get(self.region, []):
             button = ui.Button(
@@ -263,19 +253,9 @@ class StarterSelectView(ui.View):
             )
 
             # thumbnail do Pokémon (mantido)
-            poke_api_data = await pokeapi.get_pokemon_data(starter_name)
-            if poke_api_data:
-                sprite_url = (
-                    poke_api_data["sprites"]["other"]["official-artwork"]["front_shiny"]
-                    if is_shiny
-                    else poke_api_data["sprites"]["other"]["official-artwork"]["front_default"]
-                )
-                if not sprite_url:
-                    sprite_url = (
-                        poke_api_data["sprites"]["front_shiny"]
-                        if is_shiny
-                        else poke_api_data["sprites"]["front_default"]
-                    )
+            starter_info = await species_utils.ensure_species(starter_name)
+            if starter_info:
+                sprite_url = starter_info.artwork(is_shiny)
                 if sprite_url:
                     public_embed.set_thumbnail(url=sprite_url)
 
@@ -313,17 +293,19 @@ class RegionSelectView(ui.View):
         }
 
         try:
-            existing = (
+            existing = await db_utils.execute(
                 self.supabase.table("players")
                 .select("discord_id")
                 .eq("discord_id", discord_id)
                 .limit(1)
-                .execute()
             )
             if not (existing.data or []):
-                self.supabase.table("players").insert(player_data).execute()
+                await db_utils.execute(self.supabase.table("players").insert(player_data))
             else:
-                self.supabase.table("players").update(player_data).eq("discord_id", discord_id).execute()
+                await db_utils.execute(self.supabase.table("players").update(player_data).eq("discord_id", discord_id))
+            event_utils.remember_player_location(
+                discord_id, player_data["current_location_name"], region
+            )
 
             starter_embed = discord.Embed(
                 title=f"Bem-vindo(a) a {region}!",
@@ -395,7 +377,7 @@ class ConfirmDeleteView(ui.View):
             return
         try:
             # Apaga player e (opcional) cascatas, ajuste conforme constraints do seu schema
-            self.supabase.table("players").delete().eq("discord_id", self.discord_id).execute()
+            await db_utils.execute(self.supabase.table("players").delete().eq("discord_id", self.discord_id))
             # Se for necessário, apagar os Pokémon do jogador:
             # self.supabase.table("player_pokemon").delete().eq("player_id", self.discord_id).execute()
             await interaction.response.edit_message(
@@ -420,12 +402,12 @@ class ConfirmDeleteView(ui.View):
 class PlayerCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.supabase = get_supabase_client()
+        self.supabase = getattr(bot, "supabase", None) or get_supabase_client()
 
     # ------- helpers (mantidos) -------
     async def player_exists(self, discord_id: int) -> bool:
         try:
-            res = self.supabase.table("players").select("discord_id").eq("discord_id", discord_id).limit(1).execute()
+            res = await db_utils.execute(self.supabase.table("players").select("discord_id").eq("discord_id", discord_id).limit(1))
             return bool(res.data)
         except Exception:
             return False
@@ -455,7 +437,7 @@ class PlayerCog(commands.Cog):
         Mostra o perfil do jogador (safe fetch; avatar None-safe).
         """
         try:
-            player = supabase_fetch_one(self.supabase, "players", discord_id=ctx.author.id)
+            player = await db_utils.run_sync(supabase_fetch_one, self.supabase, "players", discord_id=ctx.author.id)
             if not player:
                 await ctx.send(f"Você ainda não começou sua jornada, {ctx.author.mention}. Use `!start` para iniciar!")
                 return
@@ -543,26 +525,24 @@ async def cmd_setregion(self, ctx: commands.Context, *, region: str):
     spawn = _spawn_for_region(region)
     try:
         # 1) Verifica se já existe jogador
-        res = (
+        res = await db_utils.execute(
             self.supabase.table("players")
             .select("discord_id,trainer_name")
             .eq("discord_id", ctx.author.id)
             .limit(1)
-            .execute()
         )
         rows = res.data or []
 
         if rows:
             # 2a) Só atualiza
-            (
+            await db_utils.execute(
                 self.supabase.table("players")
                 .update({"current_region": region, "current_location_name": spawn})
                 .eq("discord_id", ctx.author.id)
-                .execute()
             )
         else:
             # 2b) Cria já com trainer_name para não violar NOT NULL
-            (
+            await db_utils.execute(
                 self.supabase.table("players")
                 .insert({
                     "discord_id": ctx.author.id,
@@ -570,9 +550,9 @@ async def cmd_setregion(self, ctx: commands.Context, *, region: str):
                     "current_region": region,
                     "current_location_name": spawn,
                 })
-                .execute()
             )
 
+        event_utils.remember_player_location(ctx.author.id, spawn, region)
         await ctx.send(f"Região definida para **{region}**. Spawn em **{spawn.replace('-', ' ').title()}**.")
     except Exception as e:
         await ctx.send(f"Falha ao definir região: `{e}`")
@@ -583,12 +563,11 @@ async def cmd_setregion(self, ctx: commands.Context, *, region: str):
     async def cmd_whereami(self, ctx: commands.Context):
         """Mostra região e local atual do jogador (debug rápido)."""
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("players")
                 .select("current_region,current_location_name,badges")
                 .eq("discord_id", ctx.author.id)
                 .limit(1)
-                .execute()
             )
             rows = res.data or []
             if not rows:
@@ -1,28 +1,29 @@
 # cogs/shop_cog.py
 
+from __future__ import annotations
 import discord
 from discord.ext import commands
 from discord import ui
-import os
-import aiohttp
 import asyncio
 import random
-from supabase import create_client, Client
-from postgrest import APIResponse
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import Client
 
 import utils.evolution_utils as evolution_utils
+from utils import db_utils
+from utils import inventory_utils
+from utils import item_utils
 
 def get_supabase_client():
-    """Cria e retorna um cliente Supabase."""
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    return create_client(url, key)
+    """Retorna o client Supabase compartilhado do processo (ver db_utils)."""
+    return db_utils.get_client()
 
 
 class ShopCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.supabase: Client = get_supabase_client()
+        self.supabase: Client = getattr(bot, "supabase", None) or get_supabase_client()
         # Armazena a função de evoluir (do evolution_cog) para o !buy
         self.evolve_pokemon_func = None
 
@@ -35,12 +36,11 @@ class ShopCog(commands.Cog):
     async def get_player_money(self, player_id: int) -> int:
         """Busca o dinheiro do jogador (safe, sem .single())."""
         try:
-            res = (
+            res = await db_utils.execute(
                 self.supabase.table("players")
                 .select("money")
                 .eq("discord_id", player_id)
                 .limit(1)
-                .execute()
             )
             data = res.data[0] if res.data else None
             return int(data.get("money", 0)) if data else 0
@@ -51,9 +51,11 @@ class ShopCog(commands.Cog):
     async def update_player_money(self, player_id: int, new_amount: int) -> bool:
         """Atualiza o dinheiro do jogador."""
         try:
-            self.supabase.table("players").update({"money": new_amount}).eq(
-                "discord_id", player_id
-            ).execute()
+            await db_utils.execute(
+                self.supabase.table("players").update({"money": new_amount}).eq(
+                    "discord_id", player_id
+                )
+            )
             return True
         except Exception as e:
             print(f"[DB][Shop][update_player_money] erro: {e}")
@@ -62,42 +64,14 @@ class ShopCog(commands.Cog):
     async def add_item_to_inventory(
         self, player_id: int, item_id: int, quantity: int = 1
     ) -> bool:
-        """Adiciona um item ao inventário do jogador (upsert) em quantidade."""
+        """Adiciona um item ao inventário do jogador (upsert atômico) em quantidade."""
         if quantity <= 0:
             return True
 
         try:
-            current_response = (
-                self.supabase.table("player_inventory")
-                .select("quantity")
-                .eq("player_id", player_id)
-                .eq("item_id", item_id)
-                .execute()
+            return await inventory_utils.grant_item(
+                self.supabase, player_id, item_id, quantity
             )
-
-            if current_response.data:
-                current_quantity = current_response.data[0]["quantity"]
-                new_quantity = current_quantity + quantity
-                (
-                    self.supabase.table("player_inventory")
-                    .update({"quantity": new_quantity})
-                    .eq("player_id", player_id)
-                    .eq("item_id", item_id)
-                    .execute()
-                )
-            else:
-                (
-                    self.supabase.table("player_inventory")
-                    .insert(
-                        {
-                            "player_id": player_id,
-                            "item_id": item_id,
-                            "quantity": quantity,
-                        }
-                    )
-                    .execute()
-                )
-            return True
         except Exception as e:
             print(f"[DB][Shop][add_item_to_inventory] erro: {e}")
             return False
@@ -191,18 +165,12 @@ class ShopCog(commands.Cog):
             await ctx.send(embed=embed)
             return
 
-        # Se a categoria é válida, busca os itens
+        # Se a categoria é válida, lista do catálogo em memória (já agrupado/ordenado)
         try:
-            response = (
-                self.supabase.table("items")
-                .select("*")
-                .eq("type", db_filter_type)
-                .lte("required_badges", 99)
-                .order("name", desc=False)
-                .execute()
-            )
+            await item_utils.ensure_loaded(self.supabase)
+            items = item_utils.items_by_type(db_filter_type, max_badges=99)
 
-            if not response.data:
+            if not items:
                 await ctx.send(
                     f"A categoria '{db_filter_type}' está vazia no momento ou você ainda não tem insígnias suficientes."
                 )
@@ -218,24 +186,22 @@ class ShopCog(commands.Cog):
                 "• Itens de evolução: `!buy \"Nome do Item\" <Apelido do Pokémon>`"
             )
 
-            for item in response.data:
+            for item in items:
                 price_str = "Preço Indefinido"
-                effect_tag = item.get("effect_tag")
-                if effect_tag:
-                    try:
-                        price = int(effect_tag.split(":")[-1])
-                        price_str = f"${price:,}"
-                    except (ValueError, TypeError, IndexError):
+                if item.effect_tag:
+                    if item.price is not None:
+                        price_str = f"${item.price:,}"
+                    else:
                         price_str = "Preço Mal Formado"
 
-                badge_req = item.get("required_badges", 0)
+                badge_req = item.required_badges
                 badge_str = (
                     f" (Requer {badge_req} Insígnias)" if badge_req > 0 else ""
                 )
 
                 embed.add_field(
-                    name=f"{item['name']} - {price_str}{badge_str}",
-                    value=item["description"],
+                    name=f"{item.name} - {price_str}{badge_str}",
+                    value=item.description,
                     inline=False,
                 )
 
@@ -250,17 +216,21 @@ class ShopCog(commands.Cog):
     async def bag(self, ctx: commands.Context):
         """Exibe o inventário do jogador, organizado por novas categorias."""
         try:
-            response = (
+            response = await db_utils.execute(
                 self.supabase.table("player_inventory")
-                .select("quantity, items(name, description, type)")
+                .select("item_id, quantity")
                 .eq("player_id", ctx.author.id)
-                .execute()
             )
 
             if not response.data:
                 await ctx.send("Seu inventário está vazio.")
                 return
 
+            # nome/tipo vêm do catálogo; item novo no banco -> recarrega uma vez
+            await item_utils.ensure_loaded(self.supabase)
+            if any(item_utils.get_item(int(r["item_id"])) is None for r in response.data):
+                await item_utils.refresh(self.supabase)
+
             embed = discord.Embed(
                 title=f"🎒 Inventário de {ctx.author.display_name}",
                 color=discord.Color.orange(),
@@ -276,14 +246,14 @@ class ShopCog(commands.Cog):
             }
 
             for item_entry in response.data:
-                item = item_entry["items"]
+                item = item_utils.get_item(int(item_entry["item_id"]))
                 if not item:
                     continue
 
                 quantity = item_entry["quantity"]
-                item_type = item.get("type", "other")
+                item_type = item.type
 
-                item_str = f"**{item['name']}** (x{quantity})\n"
+                item_str = f"**{item.name}** (x{quantity})\n"
                 bag_items.get(item_type, bag_items["other"]).append(item_str)
 
             if bag_items["common"]:
@@ -401,22 +371,16 @@ class ShopCog(commands.Cog):
                 )
                 return
 
-            # Busca o item (sem .single())
-            item_res = (
-                self.supabase.table("items")
-                .select("*, api_name")
-                .ilike("name", item_name)
-                .limit(1)
-                .execute()
-            )
+            # Busca o item no catálogo em memória (nome, sem maiúsculas ou apelido)
+            item_info = await item_utils.find_item(self.supabase, item_name)
 
-            if not item_res.data:
+            if not item_info:
                 await ctx.send(
                     f"O item `{item_name}` não existe na loja. Verifique o nome e use aspas se necessário."
                 )
                 return
 
-            item = item_res.data[0]
+            item = item_info.as_row()
             item_id = item["id"]
 
             # =================================================================
@@ -430,11 +394,10 @@ class ShopCog(commands.Cog):
                 )
                 return
 
-            try:
-                tag_parts = effect_tag.split(":")
-                item_type_tag = tag_parts[0]
-                item_price = int(tag_parts[1])
-            except (ValueError, IndexError):
+            # tipo e preço já vêm do catálogo (item_utils._parse_effect_tag)
+            item_type_tag = item_info.kind
+            item_price = item_info.price
+            if item_type_tag is None or item_price is None:
                 await ctx.send(
                     f"Erro de Jogo: O item `{item['name']}` tem um `effect_tag` mal formatado (`{effect_tag}`). "
                     "O formato esperado é 'TIPO:PREÇO' (ex: 'STORABLE:5000')."
@@ -466,13 +429,12 @@ class ShopCog(commands.Cog):
                     return
 
                 # Busca o Pokémon do jogador (sem .single())
-                pokemon_res = (
+                pokemon_res = await db_utils.execute(
                     self.supabase.table("player_pokemon")
                     .select("id")
                     .eq("player_id", ctx.author.id)
                     .ilike("nickname", pokemon_name.strip())
                     .limit(1)
-                    .execute()
                 )
                 if not pokemon_res.data:
                     await ctx.send(
@@ -649,14 +611,16 @@ class ShopCog(commands.Cog):
 
         # Tenta registrar log (se a tabela existir)
         try:
-            self.supabase.table("player_gambling_logs").insert(
-                {
-                    "player_id": ctx.author.id,
-                    "game_type": "coinflip",
-                    "bet_amount": amount,
-                    "result_amount": delta,
-                }
-            ).execute()
+            await db_utils.execute(
+                self.supabase.table("player_gambling_logs").insert(
+                    {
+                        "player_id": ctx.author.id,
+                        "game_type": "coinflip",
+                        "bet_amount": amount,
+                        "result_amount": delta,
+                    }
+                )
+            )
         except Exception as e:
             # Tabela pode não existir ainda – logamos só no console.
             print(f"[Cassino][coinflip] falha ao registrar log (ok ignorar): {e}")
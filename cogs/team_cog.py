@@ -3,24 +3,33 @@
 from __future__ import annotations
 import os
 import json
-from typing import List, Optional, Dict, Any
+import asyncio
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 
 import discord
 from discord.ext import commands
 from discord import ui
-from supabase import create_client, Client
+if TYPE_CHECKING:
+    from supabase import Client
 
-# Usa helpers da sua PokeAPI
-import utils.pokeapi_service as pokeapi
+from utils import box_utils
+from utils import db_utils
+from utils import growth_utils
+from utils import party_utils
+from utils import roster_utils
+from utils import species_utils
+from utils import text_utils
+
+
+TEAM_RENDER_CONCURRENCY = int(os.getenv("TEAM_RENDER_CONCURRENCY", "3"))
 
 
 # =========================
 # Supabase helper
 # =========================
 def get_supabase_client() -> Client:
-    url: str = os.environ.get("SUPABASE_URL")
-    key: str = os.environ.get("SUPABASE_KEY")
-    return create_client(url, key)
+    """Client compartilhado do processo (pool único, ver db_utils)."""
+    return db_utils.get_client()
 
 
 # =========================
@@ -41,42 +50,133 @@ def _create_progress_bar(
     return f"[{emojis[0] * filled}{emojis[1] * (bar_length - filled)}]\n{current}/{total} ({ratio:.0%})"
 
 
+# =========================
+# Cache de render do !team
+# =========================
+class TeamRenderCache:
+    """
+    Embeds do !team de uma party, um por slot, montados uma vez só: o slot pedido
+    primeiro, depois os vizinhos, com no máximo TEAM_RENDER_CONCURRENCY ao mesmo
+    tempo. Navegar só troca o embed pronto.
+    """
+
+    def __init__(self, cog: "TeamCog", team: list):
+        self.cog = cog
+        self.team = team
+        self._sem = asyncio.Semaphore(max(1, TEAM_RENDER_CONCURRENCY))
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def _render(self, slot: int) -> Optional[discord.Embed]:
+        async with self._sem:
+            try:
+                details = await self.cog._get_focused_pokemon_details(self.team[slot - 1])
+                if not details:
+                    return None
+                return await self.cog._build_team_embed(details, self.team, slot)
+            except Exception as e:
+                print(f"Erro ao montar embed do slot {slot}: {e}")
+                return None
+
+    def _task(self, slot: int) -> asyncio.Task:
+        task = self._tasks.get(slot)
+        if task is None:
+            task = self._tasks[slot] = asyncio.ensure_future(self._render(slot))
+            task.add_done_callback(lambda t, s=slot: self._forget_failed(s, t))
+        return task
+
+    def _forget_failed(self, slot: int, task: asyncio.Task) -> None:
+        """Render que falhou (ex.: erro passageiro da PokeAPI) não fica em cache: o próximo clique tenta de novo."""
+        if task.cancelled() or task.result() is not None:
+            return
+        if self._tasks.get(slot) is task:
+            del self._tasks[slot]
+
+    def prefetch(self, first: int = 1) -> None:
+        for slot in sorted(range(1, len(self.team) + 1), key=lambda s: (abs(s - first), s)):
+            self._task(slot)
+
+    def ready(self, slot: int) -> Optional[discord.Embed]:
+        """Embed já montado (sem esperar), ou None."""
+        task = self._tasks.get(slot)
+        return task.result() if task is not None and task.done() and not task.cancelled() else None
+
+    async def get(self, slot: int) -> Optional[discord.Embed]:
+        return await self._task(slot)
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+
+
 # =========================
 # View de navegação do time (!team)
 # =========================
 class TeamNavigationView(ui.View):
-    def __init__(self, cog: "TeamCog", player_id: int, current_slot: int, max_slot: int, full_team_data_db: list):
+    def __init__(self, cog: "TeamCog", player_id: int, current_slot: int, max_slot: int,
+                 full_team_data_db: list, renders: Optional[TeamRenderCache] = None):
         super().__init__(timeout=600)
         self.cog = cog
         self.player_id = player_id
         self.current_slot = current_slot
         self.max_slot = max_slot
         self.full_team_data_db = full_team_data_db
-        self.supabase: Client = get_supabase_client()
+        self.roster_version = roster_utils.version(player_id)
+        self.renders = renders or TeamRenderCache(cog, full_team_data_db)
+        self.renders.prefetch(current_slot)
+        self.supabase: Client = cog.supabase
         self._update_buttons()
 
     def _update_buttons(self):
         self.previous_pokemon.disabled = self.current_slot == 1
         self.next_pokemon.disabled = self.current_slot == self.max_slot
 
+    async def on_timeout(self):
+        self.renders.close()
+
     async def _send_updated_team_embed(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=False)
         try:
-            self.full_team_data_db = self.cog._get_player_team_sync(self.player_id)
-            focused_db_data = self.full_team_data_db[self.current_slot - 1]
-            focused_pokemon = await self.cog._get_focused_pokemon_details(focused_db_data)
-
-            if not focused_pokemon:
-                await interaction.followup.send("Erro ao buscar dados do Pokémon principal da PokeAPI.", ephemeral=True)
+            # party mudou desde o render (troca, cura, batalha): monta tudo de novo
+            if roster_utils.version(self.player_id) != self.roster_version:
+                self.roster_version = roster_utils.version(self.player_id)
+                self.full_team_data_db = await self.cog._get_player_team(self.player_id)
+                self.max_slot = len(self.full_team_data_db)
+                self.current_slot = max(1, min(self.current_slot, self.max_slot))
+                self.renders.close()
+                self.renders = TeamRenderCache(self.cog, self.full_team_data_db)
+                self.renders.prefetch(self.current_slot)
+            if not self.full_team_data_db:
+                await interaction.response.send_message("Seu time está vazio.", ephemeral=True)
                 return
 
-            embed = await self.cog._build_team_embed(focused_pokemon, self.full_team_data_db, self.current_slot)
             self._update_buttons()
+            embed = self.renders.ready(self.current_slot)
+            if embed is not None:  # caso comum: só troca o embed
+                await interaction.response.edit_message(content=None, embed=embed, view=self)
+                return
+
+            await interaction.response.defer(ephemeral=False)
+            embed = await self._await_render()
+            if embed is None:
+                await interaction.followup.send("Erro ao buscar dados do Pokémon principal da PokeAPI.", ephemeral=True)
+                return
             await interaction.message.edit(content=None, embed=embed, view=self)
         except Exception as e:
             print(f"Erro ao atualizar embed do time: {e}")
-            if not interaction.is_done():
-                await interaction.followup.send("Erro ao atualizar o time.", ephemeral=True)
+            if not interaction.response.is_done():
+                await interaction.response.send_message("Erro ao atualizar o time.", ephemeral=True)
+
+    async def _await_render(self) -> Optional[discord.Embed]:
+        """
+        Espera o embed do slot atual. Se outro clique trocou o cache no meio
+        (party mudou), o render esperado é cancelado: tenta no cache novo.
+        """
+        while True:
+            renders = self.renders
+            try:
+                return await renders.get(self.current_slot)
+            except asyncio.CancelledError:
+                if renders is self.renders:  # cancelamento de verdade (view encerrada)
+                    raise
 
     @ui.button(label="<", style=discord.ButtonStyle.primary, row=0)
     async def previous_pokemon(self, interaction: discord.Interaction, button: ui.Button):
@@ -95,6 +195,111 @@ class TeamNavigationView(ui.View):
             await interaction.response.defer()
 
 
+# =========================
+# View da Box paginada (!box)
+# =========================
+class BoxView(ui.View):
+    """Uma página da Box por vez (keyset); Select da página + slot para mover Box -> Party."""
+
+    def __init__(self, cog: "TeamCog", owner_id: int, layout: party_utils.PartyLayout, query: box_utils.BoxQuery):
+        super().__init__(timeout=180)
+        self.cog = cog
+        self.owner_id = owner_id
+        self.layout = layout
+        self.query = query
+        self.cursors: List[box_utils.Cursor] = [None]  # início de cada página já visitada
+        self.page_no = 0
+        self.page: Optional[box_utils.BoxPage] = None
+        self.mon_id: Optional[str] = None
+        self.slot: Optional[int] = None
+        self.message: Optional[discord.Message] = None
+
+        self.pick_mon = ui.Select(placeholder="Escolha um Pokémon da Box…", min_values=1, max_values=1, row=0,
+                                  options=[discord.SelectOption(label="—", value="-")])
+        self.pick_mon.callback = self._on_pick_mon
+        self.pick_slot = ui.Select(placeholder="Mover para o slot…", min_values=1, max_values=1, row=1,
+                                   options=[discord.SelectOption(label=f"Slot {i}", value=str(i))
+                                            for i in range(1, party_utils.PARTY_SIZE + 1)])
+        self.pick_slot.callback = self._on_pick_slot
+        self.add_item(self.pick_mon)
+        self.add_item(self.pick_slot)
+
+    async def load(self) -> None:
+        """Busca a página atual (ou pega do cache) e remonta os controles."""
+        self.page = await box_utils.fetch_page(
+            self.cog.supabase, self.owner_id, self.query, self.cursors[self.page_no]
+        )
+        self.layout.remember(self.page.rows)
+        if self.page.has_more and len(self.cursors) == self.page_no + 1:
+            self.cursors.append(self.page.next_cursor)
+
+        self.mon_id = None
+        self.pick_mon.options = [
+            discord.SelectOption(
+                label=f"{party_utils.display_name(r)} (Lv.{r.get('current_level', 1)})"[:100],
+                value=str(r["id"]),
+            )
+            for r in self.page.rows
+        ] or [discord.SelectOption(label="—", value="-")]
+        self.pick_mon.disabled = not self.page.rows
+        self.pick_slot.disabled = not self.page.rows
+        self.move.disabled = not self.page.rows
+        self.previous_page.disabled = self.page_no == 0
+        self.next_page.disabled = not self.page.has_more
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("Não é sua interface.", ephemeral=True)
+            return False
+        return True
+
+    async def _on_pick_mon(self, interaction: discord.Interaction):
+        self.mon_id = self.pick_mon.values[0]
+        await interaction.response.defer()
+
+    async def _on_pick_slot(self, interaction: discord.Interaction):
+        self.slot = int(self.pick_slot.values[0])
+        await interaction.response.defer()
+
+    async def _show(self, interaction: discord.Interaction, content: Optional[str] = None):
+        # página vem do banco e os sprites da PokeAPI: responde antes (janela de 3 s)
+        if not interaction.response.is_done():
+            await interaction.response.defer()
+        await self.load()
+        emb = await self.cog._render_box_page_embed(self.page, self.query, self.page_no)
+        await interaction.message.edit(content=content, embed=emb, view=self)
+
+    @ui.button(label="<", style=discord.ButtonStyle.primary, row=2)
+    async def previous_page(self, interaction: discord.Interaction, button: ui.Button):
+        self.page_no = max(0, self.page_no - 1)
+        await self._show(interaction)
+
+    @ui.button(label=">", style=discord.ButtonStyle.primary, row=2)
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button):
+        if self.page_no + 1 < len(self.cursors):
+            self.page_no += 1
+        await self._show(interaction)
+
+    @ui.button(label="Mover da Box → Party", style=discord.ButtonStyle.success, row=2)
+    async def move(self, interaction: discord.Interaction, button: ui.Button):
+        if not self.mon_id or not self.slot:
+            return await interaction.response.send_message("Escolha o Pokémon e o slot de destino.", ephemeral=True)
+        await interaction.response.defer()
+        try:
+            msg_txt = await party_utils.move_from_box(self.cog.supabase, self.layout, self.mon_id, self.slot)
+            emb_party = await self.cog._render_party_embed(self.layout, "👥 Party atualizada", msg_txt)
+            # a Box mudou (versão nova): a mesma página é relida
+            await self._show(interaction, content=msg_txt)
+            await interaction.followup.send(embed=emb_party)
+        except Exception as e:
+            await interaction.message.edit(content=f"Falha ao mover: `{e}`", view=None)
+
+    @ui.button(label="Fechar", style=discord.ButtonStyle.secondary, row=2)
+    async def close(self, interaction: discord.Interaction, button: ui.Button):
+        await interaction.response.edit_message(view=None)
+        self.stop()
+
+
 # =========================
 # Team Cog (Tudo em um)
 # =========================
@@ -102,159 +307,33 @@ class TeamCog(commands.Cog):
     """
     Tudo do seu gerenciador de time:
     - !team: visualização detalhada com navegação
-    - !box: Party + Box em Embed com sprites
-    - !SelectTeam / !MoveParty: UI de mover com SWAP (NULL temporário) + Embeds
+    - !box: Box paginada (filtros/ordem no servidor) em Embed com sprites
+    - !SelectTeam / !MoveParty: UI de mover com SWAP (party_utils, um round-trip) + Embeds
     - !partyset: atalho textual para mover/swap
     - debugteam: utilitário de diagnóstico
     """
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.supabase: Client = get_supabase_client()
+        self.supabase: Client = getattr(bot, "supabase", None) or get_supabase_client()
 
     # ---------- Helpers de BD ----------
-    def _get_player_team_sync(self, player_id: int) -> list:
-        """Retorna a party (party_position NOT NULL), ordenada por slot."""
+    async def _get_player_team(self, player_id: int) -> list:
+        """Retorna a party (party_position NOT NULL), ordenada por slot (cache de roster)."""
         try:
-            response = (
-                self.supabase.table("player_pokemon")
-                .select("*")
-                .eq("player_id", player_id)
-                .filter("party_position", "not.is", "null")
-                .order("party_position", desc=False)
-                .execute()
-            )
-            return response.data or []
+            return await roster_utils.get_party(self.supabase, player_id)
         except Exception as e:
-            print(f"Erro ao buscar time no Supabase (Sync): {e}")
+            print(f"Erro ao buscar time no Supabase: {e}")
             return []
 
-    def _fetch_all_mons(self, user_id: int) -> List[dict]:
-        """
-        Retorna todos os Pokémon do jogador (party e box), com campos mínimos para listagem.
-        Ordena por party_position asc (NULLs ao final).
-        """
-        res = (
-            self.supabase.table("player_pokemon")
-            .select("id,pokemon_api_name,nickname,party_position,current_hp,max_hp,current_level,is_shiny")
-            .eq("player_id", user_id)
-            .order("party_position", desc=False)
-            .execute()
-        )
-        return res.data or []
-
-    def _swap_or_move(self, user_id: int, src_id: str, dest_slot: int) -> str:
-        """
-        MOVE/SWAP seguro entre posições da PARTY (1..6):
-        • Se destino estiver ocupado → SWAP real (source <-> destino) usando NULL temporário.
-        • Se destino estiver vazio → MOVE simples.
-        Observação importante: buscamos o ocupante do destino ANTES de qualquer limpeza,
-        para não mandar o ocupante pra Box por engano.
-        """
-        # 1) slot atual do source
-        src_row = (
-            self.supabase.table("player_pokemon")
-            .select("id,party_position")
-            .eq("id", src_id)
-            .eq("player_id", user_id)
-            .limit(1)
-            .execute()
-        ).data or []
-        if not src_row:
-            return "Pokémon selecionado não encontrado."
-        src_slot = src_row[0]["party_position"]
-        if src_slot is None:
-            return "O Pokémon selecionado não está na party."
-        src_slot = int(src_slot)
-        if src_slot == dest_slot:
-            return "Esse Pokémon já está nesse slot."
-
-        # 2) BUSCA primeiro o ocupante do destino (se houver) — sem limpar nada ainda
-        dst_row = (
-            self.supabase.table("player_pokemon")
-            .select("id,party_position")
-            .eq("player_id", user_id)
-            .eq("party_position", dest_slot)
-            .limit(1)
-            .execute()
-        ).data or []
-
-        if dst_row:
-            # ---- SWAP clássico usando NULL temporário ----
-            dst_id = dst_row[0]["id"]
-
-            # a) source -> NULL (Box temporária)
-            self.supabase.table("player_pokemon").update({"party_position": None}).eq("id", src_id).execute()
-
-            # b) destino -> slot original do source
-            self.supabase.table("player_pokemon").update({"party_position": src_slot}).eq("id", dst_id).execute()
-
-            # c) source (que está em NULL) -> slot destino
-            self.supabase.table("player_pokemon").update({"party_position": dest_slot}).eq("id", src_id).execute()
-
-            # d) limpeza defensiva de duplicatas residuais nos dois slots (se houver dados "sujos")
-            self.supabase.table("player_pokemon").update({"party_position": None}) \
-                .eq("player_id", user_id).eq("party_position", dest_slot).neq("id", src_id).execute()
-            self.supabase.table("player_pokemon").update({"party_position": None}) \
-                .eq("player_id", user_id).eq("party_position", src_slot).neq("id", dst_id).execute()
-
-            return f"✅ Slots trocados: #{src_slot} ↔ #{dest_slot}."
-        else:
-            # ---- MOVE simples: destino vazio ----
-            self.supabase.table("player_pokemon").update({"party_position": dest_slot}).eq("id", src_id).execute()
-
-            # limpeza defensiva de duplicatas no slot destino (exclui o próprio src_id)
-            self.supabase.table("player_pokemon").update({"party_position": None}) \
-                .eq("player_id", user_id).eq("party_position", dest_slot).neq("id", src_id).execute()
-
-            return f"✅ Pokémon movido para o slot #{dest_slot}."
-
-        
-    def _move_from_box_to_party(self, user_id: int, box_mon_id: str, dest_slot: int) -> str:
-        """
-        Move um Pokémon da BOX (party_position NULL) para a Party no slot desejado.
-        Se o slot estiver ocupado, o ocupante vai para a BOX (NULL) — efeito de SWAP.
-        Também limpa duplicatas do slot destino.
-        """
-        # validar que o mon está na BOX
-        row = (
-            self.supabase.table("player_pokemon")
-            .select("id,party_position")
-            .eq("id", box_mon_id)
-            .eq("player_id", user_id)
-            .limit(1)
-            .execute()
-        ).data or []
-        if not row:
-            return "Pokémon não encontrado."
-        if row[0]["party_position"] is not None:
-            return "Esse Pokémon já está na party."
-
-        # limpa quaisquer duplicatas no destino
-        self.supabase.table("player_pokemon").update({"party_position": None}) \
-            .eq("player_id", user_id) \
-            .eq("party_position", dest_slot) \
-            .execute()
-
-        # se tinha um ocupante legítimo, já está NULL (Box). agora coloca o mon da Box no slot
-        self.supabase.table("player_pokemon").update({"party_position": dest_slot}).eq("id", box_mon_id).execute()
-        return f"✅ Pokémon movido da Box para o slot #{dest_slot}."
-
     # ---------- Helpers PokeAPI / Embeds ----------
     async def _get_sprite_url(self, api_name: str, shiny: bool = False) -> Optional[str]:
         """
         Busca sprite estável (prioriza official-artwork; fallback front_default).
         """
         try:
-            data = await pokeapi.get_pokemon_data(api_name)
-            if not data:
-                return None
-            sprites = data.get("sprites") or {}
-            other = sprites.get("other") or {}
-            art = other.get("official-artwork") or {}
-            if shiny:
-                return art.get("front_shiny") or sprites.get("front_shiny")
-            return art.get("front_default") or sprites.get("front_default")
+            info = await species_utils.ensure_species(api_name)
+            return info.artwork(shiny) if info else None
         except Exception:
             return None
 
@@ -263,34 +342,30 @@ class TeamCog(commands.Cog):
         Busca dados do Pokémon na API + species para flavor/XP e resolve sprite (shiny/normal).
         (Usado no !team)
         """
-        api_data = await pokeapi.get_pokemon_data(p_mon_db['pokemon_api_name'])
-        if not api_data:
+        info = await species_utils.ensure_species(p_mon_db['pokemon_api_name'])
+        if not info:
             return None
 
-        base_species_name = api_data.get('species', {}).get('name') or p_mon_db['pokemon_api_name']
-        species_data = await pokeapi.get_pokemon_species_data(base_species_name)
-        flavor_text = pokeapi.get_portuguese_flavor_text(species_data) if species_data else "Descrição não encontrada."
+        # índice de textos: lookup direto; só busca /pokemon-species se a espécie não foi indexada
+        flavor_text = text_utils.species_flavor(info.species_name, "pt") or await text_utils.get_species_flavor(info.species_name, "pt")
 
         # sprite
         is_shiny = p_mon_db.get('is_shiny', False)
-        artwork = api_data.get('sprites', {}).get('other', {}).get('official-artwork', {})
-        sprite_url = artwork.get('front_shiny') if is_shiny else artwork.get('front_default')
-        if not sprite_url:
-            sprite_url = api_data.get('sprites', {}).get('front_shiny' if is_shiny else 'front_default', '')
+        sprite_url = info.artwork(is_shiny) or ''
 
         # XP thresholds
         xp_for_next_level = float('inf')
         xp_for_current_level = 0
-        if species_data and 'growth_rate' in species_data:
-            growth_rate_url = species_data['growth_rate']['url']
+        growth_table = info.growth_table()
+        if growth_table:
             current_level = p_mon_db['current_level']
-            xp_for_next_level = await pokeapi.get_total_xp_for_level(growth_rate_url, current_level + 1)
+            xp_for_next_level = growth_utils.xp_for_level(growth_table, current_level + 1)
             if current_level > 1:
-                xp_for_current_level = await pokeapi.get_total_xp_for_level(growth_rate_url, current_level)
+                xp_for_current_level = growth_utils.xp_for_level(growth_table, current_level)
 
         return {
             "db_data": p_mon_db,
-            "api_data": api_data,
+            "species_info": info,
             "flavor_text": flavor_text,
             "sprite_url": sprite_url,
             "xp_for_next_level": xp_for_next_level,
@@ -303,7 +378,7 @@ class TeamCog(commands.Cog):
         Monta o Embed detalhado do !team (HP/XP/Moves, etc.)
         """
         db_data = focused_pokemon_details['db_data']
-        api_data = focused_pokemon_details['api_data']
+        info = focused_pokemon_details['species_info']
 
         nickname = (db_data['nickname'] or db_data['pokemon_api_name']).capitalize()
         level = db_data['current_level']
@@ -345,62 +420,44 @@ class TeamCog(commands.Cog):
         if db_data.get('moves'):
             for move_name in db_data['moves']:
                 if move_name:
-                    moves_list.append(f"• {str(move_name).replace('-', ' ').capitalize()}")
+                    label = text_utils.move_name(move_name, "pt") or str(move_name).replace('-', ' ').capitalize()
+                    moves_list.append(f"• {label}")
         if not moves_list:
             moves_list.append("Nenhum movimento aprendido.")
         embed.add_field(name="GOLPES", value="\n".join(moves_list), inline=False)
 
-        species_name = api_data['name'].capitalize()
-        pokedex_id = api_data['id']
+        species_name = info.name.capitalize()
+        pokedex_id = info.id
         embed.set_footer(text=f"Slot {focused_slot}/{len(full_team_db)} | {species_name} (Pokedex Nº {pokedex_id})")
         return embed
 
-    async def _render_box_only_embed(self, user_id: int) -> discord.Embed:
-        rows = (
-            self.supabase.table("player_pokemon")
-            .select("id,pokemon_api_name,nickname,current_level,is_shiny")
-            .eq("player_id", user_id)
-            .is_("party_position", None)
-            .order("pokemon_api_name")
-            .execute()
-        ).data or []
-
-        emb = discord.Embed(title="📦 Box", description="Pokémon disponíveis na sua Box.", color=discord.Color.blurple())
-        if not rows:
-            emb.description = "Sua Box está vazia."
+    async def _render_box_page_embed(self, page: box_utils.BoxPage, query: box_utils.BoxQuery, page_no: int) -> discord.Embed:
+        """Embed de UMA página da Box (as demais são buscadas ao navegar)."""
+        emb = discord.Embed(title=f"📦 Box — página {page_no + 1}", description=query.describe(), color=discord.Color.blurple())
+        if not page.rows:
+            emb.description = "Sua Box está vazia." if page_no == 0 else "Nada nesta página."
             return emb
 
-        shown = 0
-        for r in rows:
-            if shown >= 18:  # limita para caber bem
-                break
-            name = (r.get("nickname") or r.get("pokemon_api_name") or "").capitalize()
+        for r in page.rows:
+            name = party_utils.display_name(r) + (" ✨" if r.get("is_shiny") else "")
             lvl = r.get("current_level", 1)
             sprite = await self._get_sprite_url(r["pokemon_api_name"], bool(r.get("is_shiny")))
             val = f"Lv.{lvl}"
             if sprite:
                 val += f" — [sprite]({sprite})"
             emb.add_field(name=name, value=val, inline=True)
-            shown += 1
-
-        if len(rows) > shown:
-            emb.add_field(name="…", value=f"+{len(rows)-shown} na Box", inline=False)
 
+        emb.set_footer(text="Filtros: !box <espécie> shiny lv:10-30 loc:<local> ordem:nivel")
         return emb
 
-
-    async def _render_party_embed(self, user_id: int, title: str, desc: str) -> discord.Embed:
+    async def _render_party_embed(self, layout: party_utils.PartyLayout, title: str, desc: str) -> discord.Embed:
         """
         Embed só com a PARTY atual (slots 1..6), para início e fim do SelectTeam.
         """
-        party_rows = [r for r in self._fetch_all_mons(user_id) if r.get("party_position") is not None]
-        party_rows.sort(key=lambda x: x["party_position"])
-
         emb = discord.Embed(title=title, description=desc, color=discord.Color.blue())
-        pass
 
-        for r in party_rows:
-            name = (r.get("nickname") or r.get("pokemon_api_name") or "").capitalize()
+        for r in layout.party():
+            name = party_utils.display_name(r)
             lvl = r["current_level"]
             hp = f"{r['current_hp']}/{r['max_hp']} HP"
             sprite = await self._get_sprite_url(r["pokemon_api_name"], bool(r.get("is_shiny")))
@@ -418,7 +475,7 @@ class TeamCog(commands.Cog):
         player_id = ctx.author.id
         msg = await ctx.send(f"Buscando seu time, {ctx.author.display_name}... 🔍")
         try:
-            full_team_data_db = self._get_player_team_sync(player_id)
+            full_team_data_db = await self._get_player_team(player_id)
             if not full_team_data_db:
                 await msg.edit(content="Você ainda não tem um time Pokémon! Use `!start` para começar sua jornada.")
                 return
@@ -428,14 +485,14 @@ class TeamCog(commands.Cog):
             focused_db_data = full_team_data_db[focused_slot - 1]
             await msg.edit(content=f"Buscando dados de **{(focused_db_data['nickname'] or focused_db_data['pokemon_api_name']).capitalize()}**...")
 
-            focused_pokemon = await self._get_focused_pokemon_details(focused_db_data)
-            if not focused_pokemon:
+            # monta os embeds da party inteira (o slot pedido primeiro)
+            view = TeamNavigationView(self, player_id, focused_slot, max_slot, full_team_data_db)
+            embed = await view.renders.get(focused_slot)
+            if embed is None:
+                view.renders.close()
                 await msg.edit(content="Erro ao buscar dados do Pokémon principal da PokeAPI.")
                 return
 
-            embed = await self._build_team_embed(focused_pokemon, full_team_data_db, focused_slot)
-            view = TeamNavigationView(self, player_id, focused_slot, max_slot, full_team_data_db)
-
             await msg.edit(content=None, embed=embed, view=view)
             view.message = msg
         except Exception as e:
@@ -449,93 +506,19 @@ class TeamCog(commands.Cog):
         else:
             await ctx.send(f"Ocorreu um erro: {error}")
 
-    # ---------------- Comando !box (Embed com sprites) ----------------
+    # ---------------- Comando !box (Embed com sprites, paginado) ----------------
     @commands.command(name="box")
-    async def cmd_box(self, ctx: commands.Context):
-        user_id = ctx.author.id
-
-        # 1) Embed só com a Box
-        emb = await self._render_box_only_embed(user_id)
-        await ctx.send(embed=emb)
-
-        # 2) Monta UI (Box -> Party)
-        # carrega BOX
-        box_rows = (
-            self.supabase.table("player_pokemon")
-            .select("id,pokemon_api_name,nickname,current_level,is_shiny")
-            .eq("player_id", user_id)
-            .is_("party_position", None)
-            .order("pokemon_api_name")
-            .execute()
-        ).data or []
-
-        if not box_rows:
-            return  # nada para mover
-
-        # Select de Pokémon da Box
-        options_mon: List[discord.SelectOption] = []
-        for r in box_rows:
-            name = (r.get("nickname") or r.get("pokemon_api_name") or "").capitalize()
-            lvl = r.get("current_level", 1)
-            options_mon.append(discord.SelectOption(label=f"{name} (Lv.{lvl})", value=str(r["id"])))
-
-        class PickMon(discord.ui.Select):
-            def __init__(self, opts, owner_id: int):
-                super().__init__(placeholder="Escolha um Pokémon da Box…", min_values=1, max_values=1, options=opts)
-                self.value_id: Optional[str] = None
-                self.owner_id = owner_id
-            async def callback(self, inter: discord.Interaction):
-                if inter.user.id != self.owner_id:
-                    return await inter.response.send_message("Não é sua interface.", ephemeral=True)
-                self.value_id = self.values[0]
-                await inter.response.defer()
-
-        # Select de slot destino (na Party)
-        options_slot = [discord.SelectOption(label=f"Slot {i}", value=str(i)) for i in range(1, 7)]
-        class PickSlot(discord.ui.Select):
-            def __init__(self, opts, owner_id: int):
-                super().__init__(placeholder="Mover para o slot…", min_values=1, max_values=1, options=opts)
-                self.slot_val: Optional[str] = None
-                self.owner_id = owner_id
-            async def callback(self, inter: discord.Interaction):
-                if inter.user.id != self.owner_id:
-                    return await inter.response.send_message("Não é sua interface.", ephemeral=True)
-                self.slot_val = self.values[0]
-                await inter.response.defer()
-
-        sel_mon = PickMon(options_mon, ctx.author.id)
-        sel_slot = PickSlot(options_slot, ctx.author.id)
-        btn_confirm = discord.ui.Button(label="Mover da Box → Party", style=discord.ButtonStyle.success)
-        btn_cancel = discord.ui.Button(label="Cancelar", style=discord.ButtonStyle.secondary)
-
-        view = discord.ui.View(timeout=120)
-        view.add_item(sel_mon); view.add_item(sel_slot); view.add_item(btn_confirm); view.add_item(btn_cancel)
-
-        async def on_confirm(inter: discord.Interaction):
-            if inter.user.id != ctx.author.id:
-                return await inter.response.send_message("Não é sua interface.", ephemeral=True)
-            if not sel_mon.value_id or not sel_slot.slot_val:
-                return await inter.response.send_message("Escolha o Pokémon e o slot de destino.", ephemeral=True)
-            try:
-                dest_slot = int(sel_slot.slot_val)
-                msg_txt = self._move_from_box_to_party(user_id, sel_mon.value_id, dest_slot)
-                # renderiza embeds atualizados (box e party)
-                emb_party = await self._render_party_embed(user_id, "👥 Party atualizada", msg_txt)
-                emb_box = await self._render_box_only_embed(user_id)
-                await inter.response.edit_message(content=None, embed=emb_party, view=None)
-                await ctx.send(embed=emb_box)  # mostra a box após a mudança
-            except Exception as e:
-                await inter.response.edit_message(content=f"Falha ao mover: `{e}`", view=None)
-
-        async def on_cancel(inter: discord.Interaction):
-            if inter.user.id != ctx.author.id:
-                return await inter.response.send_message("Não é sua interface.", ephemeral=True)
-            await inter.response.edit_message(content="Operação cancelada.", view=None)
-
-        btn_confirm.callback = on_confirm
-        btn_cancel.callback = on_cancel
-
-        await ctx.send("Mover da **Box** para a **Party**:", view=view)
+    async def cmd_box(self, ctx: commands.Context, *, filtros: str = ""):
+        """
+        Uso: !box [espécie] [shiny] [lv:10-30] [loc:<local>] [ordem:especie|nivel]
+        Mostra a Box uma página por vez; dá para mover da Box para a Party.
+        """
+        query = box_utils.parse_query(filtros)
+        layout = await party_utils.load_layout(self.supabase, ctx.author.id)
+        view = BoxView(self, ctx.author.id, layout, query)
+        await view.load()
+        emb = await self._render_box_page_embed(view.page, query, view.page_no)
+        view.message = await ctx.send(embed=emb, view=view)
 
     # ---------------- Comando textual opcional: !partyset ----------------
     @commands.command(name="partyset")
@@ -553,23 +536,16 @@ class TeamCog(commands.Cog):
         except Exception:
             return await ctx.send("Uso: `!partyset <nome|apelido> <slot>`")
 
-        rows = self._fetch_all_mons(ctx.author.id)
-        party = [r for r in rows if r.get("party_position") is not None]
-
-        cand = None
-        for r in party:
-            nm = (r.get("nickname") or r.get("pokemon_api_name") or "").lower()
-            if nm == target_name:
-                cand = r
-                break
+        layout = await party_utils.load_layout(self.supabase, ctx.author.id)
+        cand = layout.find_in_party(target_name)
         if not cand:
             return await ctx.send("Pokémon não encontrado na party pelo nome/apelido.")
 
-        msg_txt = self._swap_or_move(ctx.author.id, cand["id"], slot)
-        emb = await self._render_party_embed(ctx.author.id, "👥 Party atualizada", msg_txt)
+        msg_txt = await party_utils.move_in_party(self.supabase, layout, cand["id"], slot)
+        emb = await self._render_party_embed(layout, "👥 Party atualizada", msg_txt)
         await ctx.send(embed=emb)
 
-    # ---------------- UI SelectTeam / MoveParty (swap com NULL) ----------------
+    # ---------------- UI SelectTeam / MoveParty (swap transacional) ----------------
     @commands.command(name="SelectTeam", aliases=["selectteam", "MoveParty", "moveparty"])
     async def select_team(self, ctx: commands.Context):
         """
@@ -580,21 +556,22 @@ class TeamCog(commands.Cog):
         """
         user_id = ctx.author.id
 
+        # Carrega party (um select) — embeds e selects saem do mesmo layout
+        layout = await party_utils.load_layout(self.supabase, user_id)
+
         # Embed inicial com a party
-        emb_start = await self._render_party_embed(user_id, "👥 Gerenciador de Party", "Escolha o Pokémon e o slot de destino.")
+        emb_start = await self._render_party_embed(layout, "👥 Gerenciador de Party", "Escolha o Pokémon e o slot de destino.")
         await ctx.send(embed=emb_start)
 
-        # Carrega party para montar selects
-        rows = self._fetch_all_mons(user_id)
-        party = [r for r in rows if r.get("party_position") is not None]
+        party = layout.party()
         if not party:
             return
 
         # Select de Pokémon
         options_mon: List[discord.SelectOption] = []
-        for r in sorted(party, key=lambda x: x["party_position"]):
+        for r in party:
             pos = r.get("party_position")
-            name = (r.get("nickname") or r.get("pokemon_api_name") or "").capitalize()
+            name = party_utils.display_name(r)
             lvl = r.get("current_level", 1)
             hp = r.get("current_hp", 0)
             mhp = r.get("max_hp", 1)
@@ -640,8 +617,8 @@ class TeamCog(commands.Cog):
                 return await inter.response.send_message("Escolha o Pokémon e o slot de destino.", ephemeral=True)
             try:
                 dest_slot = int(sel_slot.slot_val)
-                msg_txt = self._swap_or_move(user_id, sel_mon.value_id, dest_slot)
-                new_emb = await self._render_party_embed(user_id, "👥 Party atualizada", msg_txt)
+                msg_txt = await party_utils.move_in_party(self.supabase, layout, sel_mon.value_id, dest_slot)
+                new_emb = await self._render_party_embed(layout, "👥 Party atualizada", msg_txt)
                 await inter.response.edit_message(embed=new_emb, view=None)
             except Exception as e:
                 await inter.response.edit_message(content=f"Falha ao mover: `{e}`", view=None)
@@ -664,21 +641,19 @@ class TeamCog(commands.Cog):
         await ctx.send(f"--- 🔎 Iniciando Debug do Time para Player ID: `{player_id}` ---")
         try:
             await ctx.send(f"**TESTE 1:** Party (party_position NOT NULL)...")
-            response_with_not_null = (
+            response_with_not_null = await db_utils.execute(
                 self.supabase.table("player_pokemon")
                 .select("*")
                 .eq("player_id", player_id)
                 .filter("party_position", "not.is", "null")
-                .execute()
             )
             await ctx.send(f"**Resultado (Teste 1):**\n> Total: {len(response_with_not_null.data)}\n> ```json\n{json.dumps(response_with_not_null.data, indent=2)}\n```")
 
             await ctx.send(f"\n**TESTE 2:** Todos os Pokémon...")
-            response_all = (
+            response_all = await db_utils.execute(
                 self.supabase.table("player_pokemon")
                 .select("*")
                 .eq("player_id", player_id)
-                .execute()
             )
             await ctx.send(f"**Resultado (Teste 2):**\n> Total: {len(response_all.data)}\n> ```json\n{json.dumps(response_all.data, indent=2)}\n```")
 
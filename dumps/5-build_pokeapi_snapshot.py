@@ -0,0 +1,154 @@
+# build_pokeapi_snapshot.py
+"""
+Baixa da PokeAPI só o subconjunto que o bot usa e grava um snapshot
+compacto e versionado (JSON gzip) para o provider local do pokeapi_service.
+
+Uso:
+  python dumps/5-build_pokeapi_snapshot.py --max-dex 493 --out data/pokeapi_snapshot.json.gz
+
+Depois, no bot:
+  POKEAPI_PROVIDER=snapshot
+  POKEAPI_SNAPSHOT_PATH=data/pokeapi_snapshot.json.gz
+  POKEAPI_SNAPSHOT_STRICT=1   # opcional: nada vai para a rede
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+# garante que a pasta raiz (onde está utils) esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from utils.pokeapi_snapshot import SNAPSHOT_FORMAT, parse_api_url, trim_payload
+
+BASE = "https://pokeapi.co/api/v2"
+
+_http = requests.Session()
+_http.headers.update({"User-Agent": "PokeAdventure-snapshot/1.0", "Accept": "application/json"})
+
+
+def fetch_json(url: str, retries: int = 3):
+    for attempt in range(1, retries + 1):
+        try:
+            resp = _http.get(url, timeout=30)
+            if resp.status_code == 404:
+                return None
+            resp.raise_for_status()
+            return resp.json()
+        except requests.RequestException as e:
+            if attempt == retries:
+                print(f"[SNAPSHOT] Falha em {url}: {e}")
+                return None
+            time.sleep(1.5 * attempt)
+
+
+def fetch_many(urls, workers: int):
+    """Baixa várias URLs em paralelo; retorna {url: json}."""
+    urls = sorted(set(urls))
+    out = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, (url, data) in enumerate(zip(urls, pool.map(fetch_json, urls)), start=1):
+            if data is not None:
+                out[url] = data
+            if i % 200 == 0:
+                print(f"[SNAPSHOT]   {i}/{len(urls)}")
+    return out
+
+
+class SnapshotBuilder:
+    def __init__(self):
+        self.endpoints = {}
+        self.aliases = {}
+
+    def add(self, url: str, data: dict):
+        endpoint, key = parse_api_url(url)
+        name = str(data.get("name") or key).lower()
+        self.endpoints.setdefault(endpoint, {})[name] = trim_payload(endpoint, data)
+        if data.get("id") is not None and str(data["id"]) != name:
+            self.aliases.setdefault(endpoint, {})[str(data["id"])] = name
+
+    def add_all(self, fetched: dict):
+        for url, data in fetched.items():
+            self.add(url, data)
+
+    def payload(self) -> dict:
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "version": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "source": BASE,
+            "endpoints": self.endpoints,
+            "aliases": self.aliases,
+        }
+
+
+def build(max_dex: int, workers: int, with_locations: bool) -> dict:
+    b = SnapshotBuilder()
+
+    print(f"[SNAPSHOT] pokemon-species 1..{max_dex}")
+    species = fetch_many([f"{BASE}/pokemon-species/{i}/" for i in range(1, max_dex + 1)], workers)
+    b.add_all(species)
+
+    pokemon_urls, chain_urls, growth_urls = [], [], []
+    for sp in species.values():
+        for var in sp.get("varieties") or []:
+            pokemon_urls.append(f"{BASE}/pokemon/{var['pokemon']['name']}/")
+        if sp.get("evolution_chain"):
+            chain_urls.append(sp["evolution_chain"]["url"])
+        if sp.get("growth_rate"):
+            growth_urls.append(sp["growth_rate"]["url"])
+
+    print(f"[SNAPSHOT] pokemon ({len(set(pokemon_urls))})")
+    pokemon = fetch_many(pokemon_urls, workers)
+    b.add_all(pokemon)
+
+    move_urls = [m["move"]["url"] for p in pokemon.values() for m in (p.get("moves") or [])]
+    print(f"[SNAPSHOT] move ({len(set(move_urls))})")
+    b.add_all(fetch_many(move_urls, workers))
+
+    print(f"[SNAPSHOT] growth-rate ({len(set(growth_urls))})")
+    b.add_all(fetch_many(growth_urls, workers))
+
+    print(f"[SNAPSHOT] evolution-chain ({len(set(chain_urls))})")
+    for url, data in fetch_many(chain_urls, workers).items():
+        # evolution-chain não tem "name": a chave é o id
+        endpoint, key = parse_api_url(url)
+        b.endpoints.setdefault(endpoint, {})[key] = trim_payload(endpoint, data)
+
+    if with_locations:
+        listing = fetch_json(f"{BASE}/location-area/?limit=100000") or {}
+        area_urls = [r["url"] for r in listing.get("results", [])]
+        print(f"[SNAPSHOT] location-area ({len(area_urls)})")
+        b.add_all(fetch_many(area_urls, workers))
+
+    return b.payload()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera snapshot offline da PokeAPI para o bot.")
+    parser.add_argument("--max-dex", type=int, default=1025, help="última espécie (nº da dex nacional)")
+    parser.add_argument("--out", default=str(Path("data") / "pokeapi_snapshot.json.gz"))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--no-locations", action="store_true", help="não baixa location-areas")
+    args = parser.parse_args()
+
+    snap = build(args.max_dex, args.workers, not args.no_locations)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(out, "wt", encoding="utf-8") as f:
+        json.dump(snap, f, separators=(",", ":"), ensure_ascii=False)
+
+    counts = {ep: len(rows) for ep, rows in snap["endpoints"].items()}
+    print(f"[SNAPSHOT] v{snap['version']} salvo em {out} ({out.stat().st_size / 1024 / 1024:.1f} MB)")
+    print(f"[SNAPSHOT] registros: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# recalculate_player_pokemon_stats.py
+"""
+Recalcula os stats (max_hp, attack, ...) de TODOS os player_pokemon a partir
+dos stats base da espécie e do nível atual, em lote (utils.stats_utils).
+
+Uso:
+  python dumps/6-recalculate_player_pokemon_stats.py            # aplica
+  python dumps/6-recalculate_player_pokemon_stats.py --dry-run  # só mostra o diff
+
+current_hp é limitado ao novo max_hp.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# garante que a pasta raiz (onde está utils) esteja no path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from supabase import create_client, Client
+from utils import pokeapi_service as pokeapi
+from utils import species_utils, stats_utils
+
+SUPABASE_URL = os.environ["SUPABASE_URL"]
+SUPABASE_KEY = os.environ["SUPABASE_KEY"]
+
+PAGE_SIZE = 1000
+UPSERT_CHUNK = 500
+
+
+def get_supabase_client() -> Client:
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+def fetch_all_rows(supabase: Client) -> list:
+    rows, start = [], 0
+    while True:
+        page = (
+            supabase.table("player_pokemon")
+            .select("*")
+            .order("id")
+            .range(start, start + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+async def main(dry_run: bool):
+    supabase = get_supabase_client()
+    t0 = time.perf_counter()
+
+    rows = fetch_all_rows(supabase)
+    print(f"[STATS] {len(rows)} Pokémon carregados.")
+
+    await species_utils.preload()
+    names = sorted({r["pokemon_api_name"] for r in rows})
+    infos = await species_utils.ensure_many(names)
+    missing = [n for n, info in infos.items() if info is None]
+    if missing:
+        print(f"[STATS] Espécies sem dados (ignoradas): {missing}")
+    await (await pokeapi.get_session()).close()  # PokeAPI não é mais usada daqui pra frente
+
+    t1 = time.perf_counter()
+    batch = stats_utils.stats_for_species(
+        [infos.get(r["pokemon_api_name"].lower()) for r in rows],
+        [int(r.get("current_level") or 1) for r in rows],
+    )
+    print(
+        f"[STATS] {len(rows)} linhas calculadas em {time.perf_counter() - t1:.3f}s "
+        f"({'numpy' if stats_utils.HAS_NUMPY else 'python puro'})."
+    )
+
+    changed = []
+    for row, stats in zip(rows, batch):
+        if not stats or all(row.get(k) == v for k, v in stats.items()):
+            continue
+        new_row = {**row, **stats}
+        new_row["current_hp"] = min(int(row.get("current_hp") or 0), stats["max_hp"])
+        changed.append(new_row)
+
+    print(f"[STATS] {len(changed)} linhas com stats diferentes.")
+    if dry_run:
+        for r in changed[:20]:
+            print(f"  {r['id']} {r['pokemon_api_name']} Lv{r['current_level']}")
+        return
+
+    for i in range(0, len(changed), UPSERT_CHUNK):
+        chunk = changed[i:i + UPSERT_CHUNK]
+        supabase.table("player_pokemon").upsert(chunk, on_conflict="id").execute()
+        print(f"[STATS]   {min(i + UPSERT_CHUNK, len(changed))}/{len(changed)} gravadas")
+
+    print(f"[STATS] Concluído em {time.perf_counter() - t0:.1f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recalcula stats de player_pokemon em lote.")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
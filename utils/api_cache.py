@@ -0,0 +1,162 @@
+# utils/api_cache.py
+# -*- coding: utf-8 -*-
+"""
+Cache LRU com limite de entradas/bytes e TTL por endpoint.
+
+Usado pelo `pokeapi_service` no lugar do antigo dict global `api_cache`,
+que crescia para sempre no worker. Mantém a interface básica de dict
+(`in`, `[]`, `len`) para não quebrar quem já usava o cache direto.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import json
+import time
+
+
+def endpoint_of(url: str) -> str:
+    """
+    Extrai o endpoint da URL da PokeAPI.
+    Ex.: 'https://pokeapi.co/api/v2/pokemon-species/25/' -> 'pokemon-species'
+    """
+    path = (url or "").split("://", 1)[-1]
+    marker = "/api/v2/"
+    if marker in path:
+        path = path.split(marker, 1)[1]
+    else:
+        path = path.split("/", 1)[-1]
+    return path.strip("/").split("/", 1)[0] or "unknown"
+
+
+def estimate_size(value: Any) -> int:
+    """Tamanho aproximado (bytes) de um payload JSON já decodificado."""
+    try:
+        return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+    except Exception:
+        return 0
+
+
+class ApiCache:
+    """
+    Cache LRU:
+      - max_entries: limite de entradas (0 = sem limite)
+      - max_bytes:   limite de bytes somando o tamanho dos payloads (0 = sem limite)
+      - ttl_by_endpoint: TTL em segundos por endpoint (None = nunca expira)
+      - default_ttl: TTL de endpoints que não estão no mapa
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        ttl_by_endpoint: Optional[Dict[str, Optional[float]]] = None,
+        default_ttl: Optional[float] = None,
+    ):
+        self.max_entries = max(0, int(max_entries or 0))
+        self.max_bytes = max(0, int(max_bytes or 0))
+        self.ttl_by_endpoint: Dict[str, Optional[float]] = dict(ttl_by_endpoint or {})
+        self.default_ttl = default_ttl
+
+        # url -> (valor, tamanho_em_bytes, expira_em | None)
+        self._data: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self.total_bytes = 0
+
+        # contadores
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ---------- API principal ----------
+    def get(self, url: str, default: Any = None) -> Any:
+        entry = self._data.get(url)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, _size, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(url)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(url)
+        self.hits += 1
+        return value
+
+    def set(self, url: str, value: Any, size: Optional[int] = None) -> None:
+        if size is None:
+            size = estimate_size(value)
+        size = max(0, int(size))
+
+        # payload maior que o orçamento inteiro: não vale a pena guardar
+        if self.max_bytes and size > self.max_bytes:
+            self._remove(url)
+            return
+
+        if url in self._data:
+            self._remove(url)
+
+        ttl = self.ttl_by_endpoint.get(endpoint_of(url), self.default_ttl)
+        expires_at = (time.monotonic() + ttl) if ttl is not None else None
+        self._data[url] = (value, size, expires_at)
+        self.total_bytes += size
+        self._evict()
+
+    def pop(self, url: str, default: Any = None) -> Any:
+        entry = self._data.get(url)
+        if entry is None:
+            return default
+        self._remove(url)
+        return entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    # ---------- compat com dict ----------
+    def __contains__(self, url: object) -> bool:
+        entry = self._data.get(url)  # type: ignore[arg-type]
+        if entry is None:
+            return False
+        expires_at = entry[2]
+        return expires_at is None or expires_at > time.monotonic()
+
+    def __getitem__(self, url: str) -> Any:
+        if url not in self:
+            raise KeyError(url)
+        return self.get(url)
+
+    def __setitem__(self, url: str, value: Any) -> None:
+        self.set(url, value)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ---------- internos ----------
+    def _remove(self, url: str) -> None:
+        entry = self._data.pop(url, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries and len(self._data) > self.max_entries)
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            _url, (_value, size, _exp) = self._data.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
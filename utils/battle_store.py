@@ -0,0 +1,323 @@
+# utils/battle_store.py
+# -*- coding: utf-8 -*-
+"""
+Write-behind das alterações de player_pokemon durante uma batalha.
+
+Cada golpe recebido mudava current_hp com um UPDATE no Supabase. Agora a
+batalha só "encena" os valores (HP, XP, felicidade, level/stats) em memória,
+por jogador e por Pokémon, e o BattleCog descarrega tudo de uma vez (RPC
+`apply_battle_updates`, um UPDATE só para o lote; sem a RPC, um UPDATE por
+Pokémon):
+  - no fim da batalha,
+  - ao trocar o Pokémon ativo (o que sai é gravado),
+  - num checkpoint periódico (batalhas abandonadas / bot caindo).
+
+Os valores são ABSOLUTOS (não deltas) e cada staging vai para um journal
+JSONL. A escrita em disco roda numa thread própria (uma só, para manter a
+ordem), fora do event loop. Depois de cada flush que gravou algo o journal é
+reescrito só com o que continua pendente, então não cresce durante sessões
+longas. Se o processo cair no meio da batalha, `recover()` relê o journal e
+regrava o que está lá; regravar o mesmo valor absoluto é idempotente, então
+nada é perdido nem aplicado duas vezes. O que é gravado também vai para o
+cache de roster.
+
+Como os valores são absolutos, quem grava HP fora da batalha (cura) chama
+`discard_pending` antes: senão um checkpoint posterior desfaria a cura.
+
+Formato do journal (uma linha por evento):
+  {"op": "stage",  "seq": 12, "user": 1, "mon": "uuid", "fields": {...}}
+  {"op": "commit", "seq": 12, "user": 1, "mon": "uuid"}   (journals antigos)
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import os
+import time
+import weakref
+
+from utils import db_utils
+from utils import roster_utils
+
+JOURNAL_PATH = os.getenv("BATTLE_JOURNAL_PATH", os.path.join(".cache", "battle_journal.jsonl"))
+JOURNAL_FSYNC = os.getenv("BATTLE_JOURNAL_FSYNC", "0") == "1"
+CHECKPOINT_SECONDS = float(os.getenv("BATTLE_CHECKPOINT_SECONDS", "60"))
+
+TABLE = "player_pokemon"
+
+# buffers vivos (um por BattleCog carregado), para `discard_pending`
+_buffers: "weakref.WeakSet[BattleWriteBuffer]" = weakref.WeakSet()
+
+
+class _Pending:
+    __slots__ = ("user_id", "fields", "seq", "since")
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.fields: Dict[str, Any] = {}
+        self.seq = 0
+        self.since = time.time()
+
+
+class BattleWriteBuffer:
+    def __init__(self, journal_path: Optional[str] = JOURNAL_PATH):
+        self.journal_path = journal_path
+        self._pending: Dict[str, _Pending] = {}  # mon_id -> alterações pendentes
+        self._seq = 0
+        self._fh = None  # só usado pela thread do journal
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="battle-journal")
+        self._lock = asyncio.Lock()
+
+        self.staged = 0
+        self.flushed_rows = 0
+        self.flush_calls = 0
+        self.errors = 0
+        self.recovered = 0
+        _buffers.add(self)
+
+    # ---------- journal (thread do journal) ----------
+    def _open_journal(self):
+        if self._fh is None and self.journal_path:
+            folder = os.path.dirname(self.journal_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+        return self._fh
+
+    def _append_lines(self, lines: List[str]) -> None:
+        try:
+            fh = self._open_journal()
+            if fh is None:
+                return
+            fh.write("".join(lines))
+            fh.flush()
+            if JOURNAL_FSYNC:
+                os.fsync(fh.fileno())
+        except Exception as e:
+            print(f"[BattleStore] falha ao escrever journal: {e}", flush=True)
+
+    def _rewrite_journal(self, lines: List[str]) -> None:
+        """Troca o journal pelo conteúdo dado (arquivo temporário + rename)."""
+        try:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if not lines:
+                if os.path.exists(self.journal_path):
+                    open(self.journal_path, "w", encoding="utf-8").close()
+                return
+            tmp = self.journal_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write("".join(lines))
+                fh.flush()
+                if JOURNAL_FSYNC:
+                    os.fsync(fh.fileno())
+            os.replace(tmp, self.journal_path)
+        except Exception as e:
+            print(f"[BattleStore] falha ao compactar journal: {e}", flush=True)
+
+    # ---------- journal (event loop) ----------
+    @staticmethod
+    def _line(record: Dict[str, Any]) -> str:
+        return json.dumps(record, separators=(",", ":"), default=str) + "\n"
+
+    def _journal(self, record: Dict[str, Any]) -> None:
+        if self.journal_path:
+            self._io.submit(self._append_lines, [self._line(record)])
+
+    def _compact_journal(self) -> None:
+        """Reescreve o journal só com o pendente (uma linha "stage" por Pokémon)."""
+        if not self.journal_path:
+            return
+        lines = [
+            self._line({"op": "stage", "seq": p.seq, "user": p.user_id, "mon": key, "fields": p.fields})
+            for key, p in self._pending.items()
+        ]
+        self._io.submit(self._rewrite_journal, lines)
+
+    # ---------- staging ----------
+    def stage(self, user_id: int, mon_id: Any, fields: Dict[str, Any]) -> None:
+        """Guarda valores absolutos de colunas de player_pokemon (não grava no banco)."""
+        if not fields or mon_id is None:
+            return
+        key = str(mon_id)
+        p = self._pending.get(key)
+        if p is None:
+            p = self._pending[key] = _Pending(int(user_id))
+        self._seq += 1
+        p.fields.update(fields)
+        p.seq = self._seq
+        self.staged += 1
+        self._journal({"op": "stage", "seq": self._seq, "user": int(user_id), "mon": key, "fields": fields})
+
+    def pending_for(self, mon_id: Any) -> Dict[str, Any]:
+        p = self._pending.get(str(mon_id))
+        return dict(p.fields) if p else {}
+
+    def overlay(self, rows: Iterable[dict]) -> List[dict]:
+        """Aplica o que está pendente sobre linhas lidas do banco (ex.: party na troca)."""
+        out = []
+        for row in rows:
+            p = self._pending.get(str(row.get("id")))
+            out.append({**row, **p.fields} if p else row)
+        return out
+
+    def has_pending(self, user_id: Optional[int] = None) -> bool:
+        if user_id is None:
+            return bool(self._pending)
+        return any(p.user_id == user_id for p in self._pending.values())
+
+    async def discard(self, user_id: Optional[int], fields: Iterable[str]) -> int:
+        """
+        Descarta colunas pendentes de um jogador (None = todos), esperando um
+        flush em andamento. Devolve quantos Pokémon foram afetados.
+        """
+        fields = tuple(fields)
+        async with self._lock:
+            touched = 0
+            for key, p in list(self._pending.items()):
+                if user_id is not None and p.user_id != user_id:
+                    continue
+                if not any(f in p.fields for f in fields):
+                    continue
+                touched += 1
+                for f in fields:
+                    p.fields.pop(f, None)
+                if not p.fields:
+                    del self._pending[key]
+            if touched:
+                self._compact_journal()
+            return touched
+
+    # ---------- flush ----------
+    async def _write_batch(self, supabase, batch: List[Tuple[str, _Pending]]) -> List[bool]:
+        """Lote inteiro num UPDATE (RPC); sem a RPC, um UPDATE por Pokémon."""
+        payload = [{"id": k, "fields": p.fields} for k, p in batch]
+        try:
+            found, _ = await db_utils.call_rpc(supabase, "apply_battle_updates", {"p_updates": payload})
+        except Exception as e:
+            self.errors += 1
+            print(f"[BattleStore] falha ao gravar lote de {len(batch)}: {e}", flush=True)
+            return [False] * len(batch)
+        if found:
+            return [True] * len(batch)
+        return list(await asyncio.gather(*(self._write(supabase, k, p.fields) for k, p in batch)))
+
+    async def _write(self, supabase, mon_id: str, fields: Dict[str, Any]) -> bool:
+        try:
+            await db_utils.execute(supabase.table(TABLE).update(fields).eq("id", mon_id))
+            return True
+        except Exception as e:
+            self.errors += 1
+            print(f"[BattleStore] falha ao gravar {mon_id}: {e}", flush=True)
+            return False
+
+    async def _flush_keys(self, supabase, keys: List[str]) -> int:
+        async with self._lock:
+            batch: List[Tuple[str, _Pending]] = [(k, self._pending.pop(k)) for k in keys if k in self._pending]
+            if not batch:
+                return 0
+            self.flush_calls += 1
+            results = await self._write_batch(supabase, batch)
+
+            written = 0
+            for (key, p), ok in zip(batch, results):
+                if ok:
+                    written += 1
+                    roster_utils.patch(p.user_id, {key: p.fields})
+                    continue
+                # falhou: devolve, sem sobrescrever o que foi encenado durante o gather
+                cur = self._pending.get(key)
+                if cur is None:
+                    self._pending[key] = p
+                else:
+                    cur.fields = {**p.fields, **cur.fields}
+            self.flushed_rows += written
+            if written:
+                self._compact_journal()
+            return written
+
+    async def flush(self, supabase, user_id: int, mon_id: Any = None) -> int:
+        """Grava o pendente de um jogador (ou só de um Pokémon dele). Devolve linhas gravadas."""
+        if mon_id is not None:
+            keys = [str(mon_id)]
+        else:
+            keys = [k for k, p in self._pending.items() if p.user_id == user_id]
+        return await self._flush_keys(supabase, keys)
+
+    async def flush_all(self, supabase, older_than: float = 0.0) -> int:
+        """Checkpoint: grava tudo (ou só o que está pendente há mais de `older_than` s)."""
+        limit = time.time() - older_than
+        keys = [k for k, p in self._pending.items() if p.since <= limit]
+        return await self._flush_keys(supabase, keys)
+
+    # ---------- recuperação ----------
+    def recover(self) -> int:
+        """
+        Relê o journal e recoloca em memória o que não tem commit. Devolve nº de
+        Pokémon. Chamado na subida, antes de qualquer escrita no journal.
+        """
+        if not self.journal_path or not os.path.exists(self.journal_path):
+            return 0
+        pending: Dict[str, _Pending] = {}
+        max_seq = 0
+        with open(self.journal_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # linha truncada pela queda
+                seq = int(rec.get("seq") or 0)
+                max_seq = max(max_seq, seq)
+                key = str(rec.get("mon"))
+                if rec.get("op") == "stage":
+                    p = pending.get(key)
+                    if p is None:
+                        p = pending[key] = _Pending(int(rec.get("user") or 0))
+                    p.fields.update(rec.get("fields") or {})
+                    p.seq = seq
+                elif rec.get("op") == "commit":
+                    p = pending.get(key)
+                    if p is not None and p.seq <= seq:
+                        del pending[key]
+
+        for key, p in pending.items():
+            cur = self._pending.get(key)
+            if cur is None:
+                self._pending[key] = p
+            else:
+                cur.fields = {**p.fields, **cur.fields}
+        self._seq = max(self._seq, max_seq)
+        self.recovered += len(pending)
+        self._compact_journal()
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_mons": len(self._pending),
+            "pending_players": len({p.user_id for p in self._pending.values()}),
+            "staged": self.staged,
+            "flush_calls": self.flush_calls,
+            "flushed_rows": self.flushed_rows,
+            "errors": self.errors,
+            "recovered": self.recovered,
+        }
+
+    def close(self) -> None:
+        """Espera as escritas pendentes do journal e fecha o arquivo."""
+        _buffers.discard(self)
+        self._io.shutdown(wait=True)
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            finally:
+                self._fh = None
+
+
+async def discard_pending(user_id: Optional[int] = None, fields: Iterable[str] = ("current_hp",)) -> int:
+    """Descarta colunas pendentes em todos os buffers (chamar antes de gravar HP fora da batalha)."""
+    total = 0
+    for buf in list(_buffers):
+        total += await buf.discard(user_id, fields)
+    return total
@@ -0,0 +1,202 @@
+# utils/box_utils.py
+# -*- coding: utf-8 -*-
+"""
+Box paginada (player_pokemon com party_position NULL).
+
+O !box lia a Box inteira a cada abertura; com o !blackbuy há jogador com
+milhares de Pokémon. Aqui cada página é um select com:
+  - só as colunas da listagem (BOX_COLUMNS);
+  - filtros no servidor (espécie, nível, shiny, local de captura);
+  - ordenação no servidor com desempate por id e paginação por keyset
+    (WHERE (chave, id) > (última chave, último id) LIMIT n): a página 200
+    custa o mesmo que a primeira, sem OFFSET.
+
+Páginas ficam num LRU pequeno, chaveado pela versão do roster do jogador
+(utils.roster_utils): qualquer escrita em player_pokemon que invalida o
+roster também torna velhas as páginas da Box.
+
+Índices sugeridos em BaseSupaFunctions.sql.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+import os
+import re
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+from utils import db_utils
+from utils import roster_utils
+
+TABLE = "player_pokemon"
+BOX_PAGE_SIZE = int(os.getenv("BOX_PAGE_SIZE", "15"))  # <= 25 (limite do Select do Discord)
+BOX_PAGES_MAX = int(os.getenv("BOX_PAGES_MAX", "256"))
+BOX_COLUMNS = "id,pokemon_api_name,nickname,current_level,is_shiny,captured_at_location"
+
+# nome -> (coluna, decrescente?)
+SORTS: Dict[str, Tuple[str, bool]] = {
+    "especie": ("pokemon_api_name", False),
+    "nivel": ("current_level", True),
+}
+SORT_ALIASES = {"species": "especie", "espécie": "especie", "level": "nivel", "nível": "nivel", "lv": "nivel"}
+
+# (valor da chave de ordenação, id) da última linha da página anterior
+Cursor = Optional[Tuple[Any, str]]
+
+
+class BoxQuery:
+    """Filtros + ordenação de uma listagem da Box (imutável, serve de chave de cache)."""
+    __slots__ = ("species", "min_level", "max_level", "shiny", "location", "sort")
+
+    def __init__(
+        self,
+        species: Optional[str] = None,
+        min_level: Optional[int] = None,
+        max_level: Optional[int] = None,
+        shiny: Optional[bool] = None,
+        location: Optional[str] = None,
+        sort: str = "especie",
+    ):
+        self.species = species.strip().lower() if species else None
+        self.min_level = min_level
+        self.max_level = max_level
+        self.shiny = shiny
+        self.location = location.strip() if location else None
+        self.sort = sort if sort in SORTS else "especie"
+
+    def key(self) -> tuple:
+        return (self.species, self.min_level, self.max_level, self.shiny, self.location, self.sort)
+
+    def describe(self) -> str:
+        parts = []
+        if self.species:
+            parts.append(f"espécie: {self.species}*")
+        if self.min_level is not None or self.max_level is not None:
+            lo = self.min_level if self.min_level is not None else 1
+            hi = self.max_level if self.max_level is not None else 100
+            parts.append(f"nível {lo}–{hi}")
+        if self.shiny:
+            parts.append("shiny")
+        if self.location:
+            parts.append(f"local: {self.location}")
+        parts.append(f"ordem: {self.sort}")
+        return " • ".join(parts)
+
+
+_LEVEL_RE = re.compile(r"^(?:lv|nivel|nível|level):?(\d+)?(?:-(\d+))?$")
+
+
+def parse_query(args: str) -> BoxQuery:
+    """
+    Texto do !box -> BoxQuery. Ex.: `!box pika shiny lv:20-40 loc:route ordem:nivel`.
+    Palavra solta = prefixo da espécie.
+    """
+    species = location = None
+    min_level = max_level = None
+    shiny = None
+    sort = "especie"
+    for tok in (args or "").split():
+        low = tok.lower()
+        m = _LEVEL_RE.match(low)
+        if low == "shiny":
+            shiny = True
+        elif m and (m.group(1) or m.group(2)):
+            min_level = int(m.group(1)) if m.group(1) else None
+            max_level = int(m.group(2)) if m.group(2) else None
+        elif low.startswith(("loc:", "local:")):
+            location = tok.split(":", 1)[1] or None
+        elif low.startswith(("ordem:", "sort:")):
+            name = low.split(":", 1)[1]
+            sort = SORT_ALIASES.get(name, name)
+        else:
+            species = low
+    return BoxQuery(species, min_level, max_level, shiny, location, sort)
+
+
+class BoxPage:
+    __slots__ = ("rows", "next_cursor")
+
+    def __init__(self, rows: List[dict], next_cursor: Cursor):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _quote(value: Any) -> str:
+    """Valor dentro de um filtro `or=(...)` do PostgREST."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _like(value: str) -> str:
+    return value.replace("%", r"\%").replace("_", r"\_")
+
+
+def _build(supabase: Client, player_id: int, q: BoxQuery, cursor: Cursor, limit: int):
+    col, desc = SORTS[q.sort]
+    query = (
+        supabase.table(TABLE)
+        .select(BOX_COLUMNS)
+        .eq("player_id", player_id)
+        .is_("party_position", "null")
+    )
+    if q.species:
+        query = query.ilike("pokemon_api_name", f"{_like(q.species)}%")
+    if q.min_level is not None:
+        query = query.gte("current_level", q.min_level)
+    if q.max_level is not None:
+        query = query.lte("current_level", q.max_level)
+    if q.shiny is not None:
+        query = query.eq("is_shiny", q.shiny)
+    if q.location:
+        query = query.ilike("captured_at_location", f"%{_like(q.location)}%")
+    if cursor is not None:
+        value, last_id = cursor
+        op = "lt" if desc else "gt"
+        query = query.or_(
+            f"{col}.{op}.{_quote(value)},and({col}.eq.{_quote(value)},id.gt.{_quote(last_id)})"
+        )
+    return query.order(col, desc=desc).order("id").limit(limit + 1)
+
+
+# (player_id, versão do roster, filtros, cursor) -> página
+_pages: "OrderedDict[tuple, BoxPage]" = OrderedDict()
+
+
+async def fetch_page(
+    supabase: Client,
+    player_id: int,
+    query: Optional[BoxQuery] = None,
+    cursor: Cursor = None,
+    limit: int = BOX_PAGE_SIZE,
+) -> BoxPage:
+    """Uma página da Box a partir de `cursor` (None = início)."""
+    query = query or BoxQuery()
+    player_id = int(player_id)
+    key = (player_id, roster_utils.version(player_id), query.key(), cursor, limit)
+    page = _pages.get(key)
+    if page is not None:
+        _pages.move_to_end(key)
+        return page
+
+    res = await db_utils.execute(_build(supabase, player_id, query, cursor, limit))
+    rows = res.data or []
+    next_cursor: Cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = (last[SORTS[query.sort][0]], str(last["id"]))
+    page = BoxPage(rows, next_cursor)
+
+    if key[1] == roster_utils.version(player_id):  # nenhuma escrita durante a leitura
+        _pages[key] = page
+        while len(_pages) > BOX_PAGES_MAX:
+            _pages.popitem(last=False)
+    return page
@@ -0,0 +1,300 @@
+# utils/db_utils.py
+# -*- coding: utf-8 -*-
+"""
+Camada de acesso ao Supabase que não trava o event loop.
+
+O client do supabase-py usado pelo bot é síncrono: cada `.execute()` dentro
+de um handler async parava o discord.py inteiro até o Postgres responder.
+Aqui as queries rodam num ThreadPoolExecutor limitado (DB_MAX_WORKERS) e cada
+execução é cronometrada por (tabela, operação).
+
+Uso nos cogs:
+    res = await db_utils.execute(
+        supabase.table("players").select("*").eq("discord_id", uid)
+    )
+
+Helpers síncronos (que já rodam numa thread do pool) usam `execute_sync`, e
+quem precisa chamar um helper síncrono inteiro usa `await run_sync(fn, ...)`.
+
+O processo tem UM client do Supabase (`get_client()`), criado uma vez e
+injetado em bot.supabase / cogs / utils (via `lazy_client()`, que só cria o
+client no primeiro uso). O httpx.Client do PostgREST dele é
+trocado por um com pool dimensionado para o ThreadPoolExecutor e keep-alive
+configurável, em vez de um pool (e uma sessão TLS) por cog.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import functools
+import os
+import threading
+import time
+
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "8"))
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))
+
+# pool HTTP do client compartilhado (uma conexão por thread do executor + folga)
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", str(DB_MAX_WORKERS * 2)))
+DB_POOL_KEEPALIVE = int(os.getenv("DB_POOL_KEEPALIVE", str(DB_MAX_WORKERS)))
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "60"))
+DB_HTTP_TIMEOUT = float(os.getenv("DB_HTTP_TIMEOUT", "20"))
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="supabase")
+
+_client = None
+_client_lock = threading.Lock()
+
+_HTTP_OPS = {
+    "GET": "select",
+    "HEAD": "count",
+    "POST": "insert",
+    "PATCH": "update",
+    "PUT": "upsert",
+    "DELETE": "delete",
+}
+
+
+# ---------- métricas ----------
+class _OpStats:
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples: deque = deque(maxlen=256)
+
+    def add(self, ms: float, ok: bool) -> None:
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples.append(ms)
+
+    def percentile(self, p: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+_metrics: Dict[Tuple[str, str], _OpStats] = {}
+
+
+def _record(table: str, op: str, ms: float, ok: bool) -> None:
+    st = _metrics.get((table, op))
+    if st is None:
+        st = _metrics[(table, op)] = _OpStats()
+    st.add(ms, ok)
+    if ms >= DB_SLOW_QUERY_MS:
+        print(f"[DB] Query lenta: {table}.{op} levou {ms:.0f} ms", flush=True)
+
+
+def describe(query: Any) -> Tuple[str, str]:
+    """
+    Descobre (tabela, operação) de um request builder do postgrest.
+    Funciona com versões que guardam path/http_method no builder ou em `.request`.
+    """
+    req = getattr(query, "request", None) or query
+    path = str(getattr(req, "path", "") or "")
+    method = str(getattr(req, "http_method", "") or "").upper()
+
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    if len(parts) >= 2 and parts[-2] == "rpc":
+        return f"rpc:{parts[-1]}", "call"
+    table = parts[-1] if parts else "unknown"
+
+    op = _HTTP_OPS.get(method, method.lower() or "unknown")
+    if method == "POST":
+        headers = getattr(req, "headers", None) or {}
+        try:
+            prefer = str(headers.get("Prefer", "") or headers.get("prefer", ""))
+        except Exception:
+            prefer = ""
+        if "resolution=" in prefer:
+            op = "upsert"
+    return table, op
+
+
+def get_db_stats() -> List[Dict[str, Any]]:
+    """Métricas por (tabela, operação), ordenadas pelo tempo total."""
+    out = []
+    for (table, op), st in _metrics.items():
+        out.append({
+            "table": table,
+            "op": op,
+            "count": st.count,
+            "errors": st.errors,
+            "avg_ms": (st.total_ms / st.count) if st.count else 0.0,
+            "p95_ms": st.percentile(0.95),
+            "max_ms": st.max_ms,
+            "total_ms": st.total_ms,
+        })
+    out.sort(key=lambda r: r["total_ms"], reverse=True)
+    return out
+
+
+def reset_db_stats() -> None:
+    _metrics.clear()
+
+
+# ---------- client compartilhado ----------
+def _pool_postgrest(client) -> bool:
+    """
+    Troca a sessão httpx do PostgREST por uma com limites de pool/keep-alive.
+    Mantém base_url e headers (apikey/Authorization) da sessão original.
+    """
+    try:
+        import httpx
+        old = client.postgrest.session
+        pooled = httpx.Client(
+            base_url=old.base_url,
+            headers=old.headers,
+            timeout=httpx.Timeout(DB_HTTP_TIMEOUT),
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=DB_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=DB_POOL_KEEPALIVE,
+                keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+            ),
+        )
+        client.postgrest.session = pooled
+        old.close()
+        return True
+    except Exception as e:  # versão do supabase-py sem esses atributos: segue com o padrão
+        print(f"[DB] Pool customizado indisponível ({e}); usando o padrão do supabase-py.", flush=True)
+        return False
+
+
+def create_pooled_client(url: Optional[str] = None, key: Optional[str] = None):
+    """Cria um client do Supabase com o pool HTTP configurado (não registra como global)."""
+    from supabase import create_client
+
+    url = url or os.getenv("SUPABASE_URL")
+    key = key or os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        raise RuntimeError("SUPABASE_URL/SUPABASE_KEY não configurados.")
+    client = create_client(url, key)
+    _pool_postgrest(client)
+    return client
+
+
+def get_client():
+    """O client do Supabase do processo (criado na primeira chamada)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                t0 = time.perf_counter()
+                _client = create_pooled_client()
+                print(
+                    f"[DB] Client Supabase compartilhado criado em {(time.perf_counter() - t0) * 1000:.0f} ms "
+                    f"(pool={DB_POOL_MAX_CONNECTIONS}, keep-alive={DB_POOL_KEEPALIVE}/{DB_KEEPALIVE_EXPIRY:.0f}s)",
+                    flush=True,
+                )
+    return _client
+
+
+class LazyClient:
+    """
+    Procurador do client compartilhado: só importa o supabase e cria o client
+    no primeiro uso (`.table`, `.rpc`, ...). Permite injetar bot.supabase nos
+    cogs antes de a conexão existir.
+    """
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(get_client(), name)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        state = "criado" if _client is not None else "pendente"
+        return f"<LazyClient supabase ({state})>"
+
+
+def lazy_client() -> LazyClient:
+    return LazyClient()
+
+
+def client_ready() -> bool:
+    return _client is not None
+
+
+def set_client(client) -> None:
+    """Registra um client já criado como o compartilhado."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+# ---------- execução ----------
+def execute_sync(query: Any, *, label: Optional[Tuple[str, str]] = None):
+    """`.execute()` cronometrado, para código que já roda fora do event loop."""
+    table, op = label or describe(query)
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        res = query.execute()
+        ok = True
+        return res
+    finally:
+        _record(table, op, (time.perf_counter() - t0) * 1000, ok)
+
+
+async def execute(query: Any, *, label: Optional[Tuple[str, str]] = None):
+    """Executa o builder no pool de threads e devolve o APIResponse."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, functools.partial(execute_sync, query, label=label)
+    )
+
+
+async def run_sync(func: Callable[..., Any], *args, **kwargs):
+    """Roda uma função síncrona inteira (que faz várias queries) no pool."""
+    loop = asyncio.get_running_loop()
+    name = getattr(func, "__name__", "fn")
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        res = await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+        ok = True
+        return res
+    finally:
+        _record(f"fn:{name}", "call", (time.perf_counter() - t0) * 1000, ok)
+
+
+# ---------- RPC com fallback ----------
+# None = ainda não testada; False = função não existe no banco (quem chama usa o fallback)
+_rpc_available: Dict[str, Optional[bool]] = {}
+
+
+def is_missing_function(e: Exception) -> bool:
+    """True se o erro do PostgREST é "função não existe" (RPC ainda não criada)."""
+    code = str(getattr(e, "code", "") or "")
+    return code in ("PGRST202", "42883") or "Could not find the function" in str(e)
+
+
+async def call_rpc(supabase, name: str, params: Dict[str, Any]) -> Tuple[bool, Any]:
+    """
+    Chama `supabase.rpc(name, params)`. Devolve (True, data) se a função existe,
+    (False, None) se ela não foi criada no banco (BaseSupaFunctions.sql).
+    Depois do primeiro "não existe" não tenta de novo até o processo reiniciar.
+    """
+    if _rpc_available.get(name) is False:
+        return False, None
+    try:
+        res = await execute(supabase.rpc(name, params))
+    except Exception as e:
+        if is_missing_function(e):
+            _rpc_available[name] = False
+            print(f"[DB] RPC {name} não encontrada; usando fallback.", flush=True)
+            return False, None
+        raise
+    _rpc_available[name] = True
+    return True, res.data
@@ -0,0 +1,121 @@
+# utils/encounter_utils.py
+# -*- coding: utf-8 -*-
+"""
+Tabelas de encontro selvagem compiladas por (location-area, versão).
+
+`get_location_area_encounters` percorre pokemon_encounters -> version_details
+-> encounter_details a cada spawn, e o sorteio era uma varredura linear de
+pesos acumulados. Aqui o JSON da área é achatado uma vez em arrays compactos
+e o sorteio usa o método de alias de Walker (Vose): O(1) por spawn, seja
+qual for o tamanho da área.
+
+A tabela é recompilada quando o payload da área muda (o cache da PokeAPI
+devolve outro objeto depois de expirar/recarregar) ou via `invalidate`.
+"""
+from __future__ import annotations
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import os
+import random
+
+import utils.pokeapi_service as pokeapi
+
+ENCOUNTER_TABLES_MAX = int(os.getenv("ENCOUNTER_TABLES_MAX", "512"))
+
+
+class EncounterTable:
+    __slots__ = ("area", "version", "names", "chances", "min_levels", "max_levels", "prob", "alias")
+
+    def __init__(self, area: str, version: Optional[str], encounters: List[dict]):
+        rows = [e for e in encounters if int(e.get("chance") or 0) > 0]
+        self.area = area
+        self.version = version
+        self.names: Tuple[str, ...] = tuple(str(e["pokemon_name"]) for e in rows)
+        self.chances = array("I", (int(e["chance"]) for e in rows))
+        self.min_levels = array("H", (int(e.get("min_level") or 1) for e in rows))
+        self.max_levels = array("H", (int(e.get("max_level") or e.get("min_level") or 1) for e in rows))
+        self.prob, self.alias = _build_alias(self.chances)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def sample(self, rng: random.Random) -> int:
+        """Índice sorteado com peso `chance`: uma coluna uniforme + uma moeda viciada."""
+        i = int(rng.random() * len(self.names))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+    def entry(self, i: int) -> Dict[str, object]:
+        """Linha no formato de `pokeapi.get_location_area_encounters`."""
+        return {
+            "pokemon_name": self.names[i],
+            "chance": self.chances[i],
+            "min_level": self.min_levels[i],
+            "max_level": self.max_levels[i],
+        }
+
+    def __repr__(self) -> str:
+        return f"EncounterTable({self.area!r}, {self.version!r}, {len(self)} espécies)"
+
+
+def _build_alias(weights) -> Tuple[array, array]:
+    """Método de alias de Vose: prob[i] em [0, 1] e alias[i] por coluna."""
+    n = len(weights)
+    prob = array("d", [0.0]) * n
+    alias = array("I", [0]) * n
+    total = float(sum(weights))
+    if n == 0 or total <= 0:
+        return prob, alias
+
+    scaled = [w * n / total for w in weights]
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    # sobras (só erro de arredondamento): coluna cheia
+    for i in large + small:
+        prob[i] = 1.0
+        alias[i] = i
+    return prob, alias
+
+
+# (área, versão) -> (id do payload de origem, tabela); LRU limitado
+_tables: "OrderedDict[Tuple[str, Optional[str]], Tuple[int, EncounterTable]]" = OrderedDict()
+
+
+def invalidate(area: Optional[str] = None) -> None:
+    """Descarta as tabelas de uma área (ou todas)."""
+    if area is None:
+        _tables.clear()
+        return
+    area = area.lower()
+    for key in [k for k in _tables if k[0] == area]:
+        del _tables[key]
+
+
+async def get_table(area: str, version: Optional[str] = None) -> Optional[EncounterTable]:
+    """Tabela compilada da área; None se a área não existe na PokeAPI."""
+    if not area:
+        return None
+    area = str(area).lower()
+    version = version.lower() if version else None
+    data = await pokeapi.get_data_from_url(f"{pokeapi.BASE_URL}/location-area/{area}")
+    if not data:
+        return None
+
+    key = (area, version)
+    hit = _tables.get(key)
+    if hit is not None and hit[0] == id(data):
+        _tables.move_to_end(key)
+        return hit[1]
+
+    table = EncounterTable(area, version, pokeapi.parse_location_area_encounters(data, version))
+    _tables[key] = (id(data), table)
+    _tables.move_to_end(key)
+    while len(_tables) > ENCOUNTER_TABLES_MAX:
+        _tables.popitem(last=False)
+    return table
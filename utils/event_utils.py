@@ -1,8 +1,11 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
+import threading
 import traceback
 
+from utils import db_utils
+
 # ==============================================================
 #  🌍 SPAWNS por região
 # ==============================================================
@@ -33,12 +36,12 @@ def ensure_player_spawn(supabase: Any, discord_id: int, region: Optional[str]) -
         return None
     try:
         spawn = get_region_spawn(region)
-        (
+        db_utils.execute_sync(
             supabase.table("players")
             .update({"current_location_name": spawn})
             .eq("discord_id", discord_id)
-            .execute()
         )
+        remember_player_location(discord_id, spawn, region)
         return spawn
     except Exception as e:
         print(f"[ensure_player_spawn][ERROR] {e}", flush=True)
@@ -224,35 +227,94 @@ def next_gym_info(region: str, current_badges: int) -> Optional[Dict[str, object
 #  🗺️ Consultas de local e rotas
 # ==============================================================
 
+# ---- grafo de rotas em memória ----
+# A tabela `routes` é estática por região: carregamos tudo uma vez e cada clique
+# de viagem vira lookup em dict. Chave: (região, location_from) em minúsculas;
+# arestas já com `gate` parseado e ordenadas por (step NULLS LAST, location_to).
+PAGE_SIZE = 1000  # leituras inteiras de routes/locations, paginadas (PostgREST corta em 1000)
+
+_route_graph: Dict[Tuple[str, str], List[Dict]] = {}
+_route_graph_loaded = False
+_index_lock = threading.Lock()
+
+
+def _edge_key(region: str, location_from: str) -> Tuple[str, str]:
+    return (str(region or "").strip().lower(), str(location_from or "").strip().lower())
+
+
+def _edge_sort_key(e: Dict) -> Tuple:
+    return (e["step"] is None, e["step"] if e["step"] is not None else 0, e["location_to"])
+
+
+def load_route_graph(supabase) -> int:
+    """Lê `routes` inteira (paginada) e troca o grafo em memória. Devolve o nº de arestas."""
+    global _route_graph_loaded
+    rows: List[Dict] = []
+    start = 0
+    while True:
+        res = db_utils.execute_sync(
+            supabase.table("routes")
+            .select("region,location_from,location_to,step,is_mainline,gate")
+            .order("region").order("location_from").order("location_to")
+            .range(start, start + PAGE_SIZE - 1)
+        )
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+
+    graph: Dict[Tuple[str, str], List[Dict]] = {}
+    for r in rows:
+        graph.setdefault(_edge_key(r.get("region"), r.get("location_from")), []).append({
+            "location_from": r.get("location_from"),
+            "location_to": r.get("location_to"),
+            "step": r.get("step"),
+            "is_mainline": bool(r.get("is_mainline")),
+            "gate": _coerce_gate(r.get("gate")),
+        })
+    for edges in graph.values():
+        edges.sort(key=_edge_sort_key)
+
+    with _index_lock:
+        _route_graph.clear()
+        _route_graph.update(graph)
+        _route_graph_loaded = True
+    print(f"[Routes] Grafo com {len(rows)} arestas ({len(graph)} origens).", flush=True)
+    return len(rows)
+
+
+def invalidate_route_graph() -> None:
+    """A próxima consulta de rotas recarrega o grafo do banco."""
+    global _route_graph_loaded
+    with _index_lock:
+        _route_graph_loaded = False
+
+
+def route_graph_loaded() -> bool:
+    return _route_graph_loaded
+
+
+def _edges_from(supabase, region: str, location_from: str) -> List[Dict]:
+    if not _route_graph_loaded:
+        load_route_graph(supabase)
+    return _route_graph.get(_edge_key(region, location_from), [])
+
+
 def get_adjacent_routes(supabase, region: str, location_from: str, *, mainline_only: bool = False) -> List[Dict]:
     try:
-        q = (supabase.table("routes")
-             .select("location_from,location_to,step,is_mainline,gate")
-             .ilike("region", region)
-             .ilike("location_from", location_from))
-        if mainline_only:
-            q = q.eq("is_mainline", True)
-        q = q.order("step").order("location_to")
-        res = q.execute()
-        data = list(res.data or [])
-        return data
+        edges = _edges_from(supabase, region, location_from)
+        return [dict(e) for e in edges if e["is_mainline"] or not mainline_only]
     except Exception as e:
         return []
 
 
 def get_next_mainline_edge(supabase, region: str, location_from: str) -> Optional[Dict]:
     try:
-        q = (supabase.table("routes")
-             .select("location_from,location_to,step,gate")
-             .eq("region", region)
-             .eq("location_from", location_from)
-             .eq("is_mainline", True)
-             .order("step")
-             .limit(1))
-        res = q.execute()
-        rows = res.data or []
-        edge = dict(rows[0]) if rows else None
-        return edge
+        for e in _edges_from(supabase, region, location_from):
+            if e["is_mainline"]:
+                return {k: e[k] for k in ("location_from", "location_to", "step", "gate")}
+        return None
     except Exception as e:
         return None
 
@@ -262,7 +324,7 @@ def get_permitted_destinations(supabase, player: Any, region: str, location_from
     allowed: List[Dict] = []
     try:
         for e in edges:
-            gate = _coerce_gate(e.get("gate"))
+            gate = e["gate"]
             if gate_allows(player, gate):
                 allowed.append({
                     "location_to": e["location_to"],
@@ -270,23 +332,108 @@ def get_permitted_destinations(supabase, player: Any, region: str, location_from
                     "is_mainline": e.get("is_mainline", False),
                     "gate": gate
                 })
-        allowed.sort(key=lambda d: (d["step"] is None, d["step"] or 10**9, d["location_to"]))
-        return allowed          # ✅ FALTAVA ISSO
+        return allowed  # arestas já vêm ordenadas do grafo
     except Exception as e:
         return []
 
 
+# ---- locations em memória ----
+# Metadados de `locations` (default_area, type, has_gym, has_shop, metadata) por
+# location_api_name. Carregado uma vez; local desconhecido ainda consulta o banco
+# (e entra no índice), para não quebrar com locations novas.
+LOCATION_COLUMNS = "location_api_name,name,type,region,has_gym,has_shop,default_area,metadata"
+
+_locations: Dict[str, Dict] = {}
+_locations_loaded = False
+
+# discord_id -> (current_location_name, current_region), atualizado por quem grava
+_player_locations: Dict[int, Tuple[str, Optional[str]]] = {}
+
+
+def load_locations(supabase) -> int:
+    """Lê `locations` inteira (paginada) e troca o índice em memória."""
+    global _locations_loaded
+    rows: List[Dict] = []
+    start = 0
+    while True:
+        res = db_utils.execute_sync(
+            supabase.table("locations")
+            .select(LOCATION_COLUMNS)
+            .order("location_api_name")
+            .range(start, start + PAGE_SIZE - 1)
+        )
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        start += PAGE_SIZE
+
+    index = {r["location_api_name"]: dict(r) for r in rows if r.get("location_api_name")}
+    with _index_lock:
+        _locations.clear()
+        _locations.update(index)
+        _locations_loaded = True
+    print(f"[Locations] Índice com {len(index)} locais.", flush=True)
+    return len(index)
+
+
+def invalidate_locations() -> None:
+    """A próxima consulta de local recarrega o índice do banco."""
+    global _locations_loaded
+    with _index_lock:
+        _locations_loaded = False
+
+
+def locations_loaded() -> bool:
+    return _locations_loaded
+
+
+def peek_location_info(location_api_name: str) -> Optional[Dict]:
+    """Só memória: None se o índice não tem o local (ou ainda não foi carregado)."""
+    info = _locations.get(str(location_api_name or "").strip())
+    return dict(info) if info else None
+
+
+def all_default_areas() -> List[str]:
+    """default_area de todos os locais do índice (sem repetir), p/ o warm-up."""
+    return list(dict.fromkeys(
+        str(r["default_area"]).strip() for r in _locations.values() if r.get("default_area")
+    ))
+
+
+def remember_player_location(discord_id: int, location_api_name: Optional[str], region: Optional[str] = None) -> None:
+    """Chamado por quem grava players.current_location_name (viagem, spawn, !region)."""
+    if not location_api_name:
+        _player_locations.pop(int(discord_id), None)
+        return
+    if region is None:
+        prev = _player_locations.get(int(discord_id))
+        region = prev[1] if prev else None
+    _player_locations[int(discord_id)] = (location_api_name, region)
+
+
+def cached_player_location(discord_id: int) -> Optional[Tuple[str, Optional[str]]]:
+    return _player_locations.get(int(discord_id))
+
+
 def get_location_info(supabase, location_api_name: str) -> Optional[Dict]:
     try:
-        res = (
+        if not _locations_loaded:
+            load_locations(supabase)
+        info = peek_location_info(location_api_name)
+        if info is not None:
+            return info
+
+        res = db_utils.execute_sync(
             supabase.table("locations")
-            .select("location_api_name,name,type,region,has_gym,has_shop,default_area,metadata")
+            .select(LOCATION_COLUMNS)
             .eq("location_api_name", location_api_name)
             .limit(1)
-            .execute()
         )
         rows = res.data or []
         info = dict(rows[0]) if rows else None
+        if info:
+            _locations[info["location_api_name"]] = dict(info)
         return info
     except Exception as e:
         print(f"[event_utils:get_location_info][ERROR] {e}", flush=True)
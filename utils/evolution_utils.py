@@ -1,20 +1,18 @@
 # utils/evolution_utils.py
 
+from __future__ import annotations
 import re
-from supabase import Client
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from supabase import Client
 import utils.pokeapi_service as pokeapi
+from utils import db_utils
 
-# cache simples p/ chain
-_EVO_CHAIN_CACHE: dict[str, dict] = {}
 API_GENDER_MAP = {1: "female", 2: "male", 3: "genderless"}
 
 async def _get_evo_chain_data(url: str) -> dict | None:
-    if url in _EVO_CHAIN_CACHE:
-        return _EVO_CHAIN_CACHE[url]
-    data = await pokeapi.get_data_from_url(url)
-    if data:
-        _EVO_CHAIN_CACHE[url] = data
-    return data
+    # o cache LRU do pokeapi_service já guarda a chain (com TTL/limite)
+    return await pokeapi.get_data_from_url(url)
 
 def _find_evolution_node(chain: dict, pokemon_name: str) -> dict | None:
     if chain["species"]["name"] == pokemon_name:
@@ -137,7 +135,7 @@ async def check_evolution(
     context = context or {}
 
     # lê mon do DB *(snake_case)*
-    res = supabase.table("player_pokemon").select("*").eq("id", pokemon_db_id).single().execute()
+    res = await db_utils.execute(supabase.table("player_pokemon").select("*").eq("id", pokemon_db_id).single())
     if not res.data:
         return None
     pkmn = res.data
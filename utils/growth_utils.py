@@ -0,0 +1,127 @@
+# utils/growth_utils.py
+# -*- coding: utf-8 -*-
+"""
+Tabelas de XP por growth-rate, compiladas uma vez no import.
+
+Cada tabela é uma tupla indexada pelo nível (índice 0 não é usado):
+  table[lv] = XP total necessária para estar no nível `lv`.
+
+  - xp_for_level(table, lv)  -> O(1)
+  - level_for_xp(table, xp)  -> bisect (O(log n))
+
+Os valores batem com o campo `levels` de /growth-rate da PokeAPI
+(nível 1 = 0 XP em todas as curvas).
+"""
+from __future__ import annotations
+from bisect import bisect_right
+from typing import Dict, Optional, Sequence, Tuple
+
+MAX_LEVEL = 100
+
+# id da PokeAPI -> nome
+GROWTH_RATE_IDS: Dict[str, str] = {
+    "1": "slow",
+    "2": "medium",
+    "3": "fast",
+    "4": "medium-slow",
+    "5": "slow-then-very-fast",   # erratic
+    "6": "fast-then-very-slow",   # fluctuating
+}
+
+
+# ---------- fórmulas (inteiras, com floor) ----------
+def _slow(n: int) -> int:
+    return 5 * n ** 3 // 4
+
+
+def _medium(n: int) -> int:
+    return n ** 3
+
+
+def _fast(n: int) -> int:
+    return 4 * n ** 3 // 5
+
+
+def _medium_slow(n: int) -> int:
+    return 6 * n ** 3 // 5 - 15 * n ** 2 + 100 * n - 140
+
+
+def _erratic(n: int) -> int:
+    if n <= 50:
+        return n ** 3 * (100 - n) // 50
+    if n <= 68:
+        return n ** 3 * (150 - n) // 100
+    if n <= 98:
+        return n ** 3 * ((1911 - 10 * n) // 3) // 500
+    return n ** 3 * (160 - n) // 100
+
+
+def _fluctuating(n: int) -> int:
+    if n <= 15:
+        return n ** 3 * ((n + 1) // 3 + 24) // 50
+    if n <= 36:
+        return n ** 3 * (n + 14) // 50
+    return n ** 3 * (n // 2 + 32) // 50
+
+
+def _compile(formula) -> Tuple[int, ...]:
+    return (0, 0) + tuple(formula(lv) for lv in range(2, MAX_LEVEL + 1))
+
+
+GROWTH_TABLES: Dict[str, Tuple[int, ...]] = {
+    "slow": _compile(_slow),
+    "medium": _compile(_medium),
+    "fast": _compile(_fast),
+    "medium-slow": _compile(_medium_slow),
+    "slow-then-very-fast": _compile(_erratic),
+    "fast-then-very-slow": _compile(_fluctuating),
+}
+
+
+def growth_rate_key(ref: str) -> Optional[str]:
+    """
+    Aceita URL da PokeAPI, nome ou id e devolve o nome da curva.
+      'https://pokeapi.co/api/v2/growth-rate/4/' -> 'medium-slow'
+    """
+    if not ref:
+        return None
+    key = str(ref).rstrip("/").rsplit("/", 1)[-1].lower()
+    key = GROWTH_RATE_IDS.get(key, key)
+    return key if key in GROWTH_TABLES else None
+
+
+def get_table(ref: str) -> Optional[Tuple[int, ...]]:
+    """Tabela pronta para uma curva conhecida (ou None)."""
+    key = growth_rate_key(ref)
+    return GROWTH_TABLES.get(key) if key else None
+
+
+def compile_levels(growth_data: dict) -> Optional[Tuple[int, ...]]:
+    """
+    Compila o JSON de /growth-rate em tabela (para curvas fora das 6 conhecidas).
+    """
+    levels = (growth_data or {}).get("levels") or []
+    if not levels:
+        return None
+    table = [0] * (MAX_LEVEL + 1)
+    for info in levels:
+        lv = int(info.get("level") or 0)
+        if 1 <= lv <= MAX_LEVEL:
+            table[lv] = int(info.get("experience") or 0)
+    return tuple(table)
+
+
+def xp_for_level(table: Sequence[int], level: int) -> int | float:
+    """XP total para o nível; inf se o nível estiver fora da tabela."""
+    level = int(level)
+    if not table or level < 1 or level >= len(table):
+        return float("inf")
+    return table[level]
+
+
+def level_for_xp(table: Sequence[int], xp: int, cap: int = MAX_LEVEL) -> int:
+    """Maior nível cuja XP total <= xp (limitado a `cap`)."""
+    if not table:
+        return 1
+    lv = bisect_right(table, int(xp), 1) - 1
+    return max(1, min(lv, cap, len(table) - 1))
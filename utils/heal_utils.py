@@ -0,0 +1,82 @@
+# utils/heal_utils.py
+# -*- coding: utf-8 -*-
+"""
+Cura em lote (Centro Pokémon / admin).
+
+Caminho principal: RPC `heal_party` / `heal_all_pokemon` (BaseSupaFunctions.sql),
+um único UPDATE ... SET current_hp = max_hp no Postgres.
+
+Se a função ainda não foi criada no projeto, cai num upsert único com as
+colunas mínimas (id + NOT NULLs + current_hp): continua sendo uma escrita só,
+precedida de um select.
+
+Antes de curar, o HP ainda não gravado de batalhas (utils.battle_store) é
+descartado: senão um checkpoint posterior regravaria o HP antigo por cima.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+
+from utils import battle_store
+from utils import db_utils
+from utils import roster_utils
+
+TABLE = "player_pokemon"
+
+
+async def _call_rpc(supabase, name: str, params: Dict[str, Any]) -> Optional[int]:
+    """Chama a RPC; devolve None se ela não existir no banco."""
+    found, data = await db_utils.call_rpc(supabase, name, params)
+    if not found:
+        return None
+    if isinstance(data, list):  # algumas versões embrulham o escalar
+        data = data[0] if data else 0
+    return int(data or 0)
+
+
+async def _heal_with_upsert(supabase, player_id: Optional[int], party_only: bool) -> int:
+    q = supabase.table(TABLE).select("id,player_id,pokemon_api_name,current_hp,max_hp")
+    if player_id is not None:
+        q = q.eq("player_id", player_id)
+    if party_only:
+        q = q.not_.is_("party_position", "null")
+    rows = (await db_utils.execute(q)).data or []
+
+    payload: List[dict] = [
+        {
+            "id": r["id"],
+            "player_id": r["player_id"],
+            "pokemon_api_name": r["pokemon_api_name"],
+            "current_hp": int(r["max_hp"]),
+        }
+        for r in rows
+        if r.get("max_hp") is not None and int(r.get("current_hp") or 0) != int(r["max_hp"])
+    ]
+    if payload:
+        await db_utils.execute(
+            supabase.table(TABLE).upsert(payload, on_conflict="id", returning="minimal")
+        )
+    return len(payload)
+
+
+async def heal_party(supabase, player_id: int) -> int:
+    """current_hp = max_hp para a party inteira. Devolve quantos Pokémon mudaram."""
+    await battle_store.discard_pending(int(player_id))
+    healed = await _call_rpc(supabase, "heal_party", {"p_player_id": int(player_id)})
+    if healed is None:
+        healed = await _heal_with_upsert(supabase, int(player_id), party_only=True)
+    roster_utils.invalidate(player_id)
+    return healed
+
+
+async def heal_all(supabase, player_id: Optional[int] = None) -> int:
+    """Cura party + box de um jogador (ou de todos, se player_id for None)."""
+    params = {"p_player_id": int(player_id) if player_id is not None else None}
+    await battle_store.discard_pending(int(player_id) if player_id is not None else None)
+    healed = await _call_rpc(supabase, "heal_all_pokemon", params)
+    if healed is None:
+        healed = await _heal_with_upsert(supabase, player_id, party_only=False)
+    if player_id is None:
+        roster_utils.invalidate_all()
+    else:
+        roster_utils.invalidate(player_id)
+    return healed
@@ -1,58 +1,177 @@
 # utils/inventory_utils.py
 # -*- coding: utf-8 -*-
+"""
+Inventário do jogador (player_inventory).
+
+- Nome → id dos itens vem do catálogo em memória (utils.item_utils);
+  "Poké ball", "poke ball" e "Pokeball" caem no mesmo item.
+- Consumo é atômico e num round-trip só: RPC `consume_item` (decrementa se
+  houver saldo). Sem a RPC, cai num compare-and-set (UPDATE ... WHERE
+  quantity = <lido>), que não perde nem duplica item com cliques simultâneos.
+- `apply_item_changes` concede/consome vários itens de uma vez (tudo ou nada)
+  pela RPC `apply_inventory_changes`.
+"""
 from __future__ import annotations
-from supabase import Client
+from typing import Dict, Mapping, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+from utils import db_utils
+from utils import item_utils
 
 PLAYER_ITEMS_TABLE = "player_inventory"     # player_id, item_id, quantity
-ITEMS_TABLE = "items"                   # id, name
 POKEBALL_NAME = "Pokeball"              # conforme sua tabela items (seed usa "Pokeball")
-POKEBALL_ALIASES = ["Pokeball", "pokeball", "Poke ball", "poke ball", "Poké ball", "poké ball"]
-
-def _get_item_id_by_name(supabase: Client, item_name: str):
-    # 1) tenta name exato (sua seed usa "Pokeball")
-    it = (supabase.table(ITEMS_TABLE).select("id").eq("name", item_name).limit(1).execute()).data or []
-    if it:
-        return it[0]["id"]
-    # 2) tenta por aliases com ILIKE
-    for alias in POKEBALL_ALIASES:
-        it = (supabase.table(ITEMS_TABLE).select("id").ilike("name", alias).limit(1).execute()).data or []
-        if it:
-            return it[0]["id"]
-    return None
 
-async def get_item_qty(supabase: Client, player_id: int, item_name: str) -> int:
-    item_id = _get_item_id_by_name(supabase, item_name)
+# tentativas do compare-and-set quando a RPC não existe
+CAS_RETRIES = 3
+
+ItemRef = Union[str, int]
+
+
+async def get_item_id(supabase: Client, item: ItemRef) -> Optional[int]:
+    """Id do item por nome/apelido (ou o próprio id, se já for int)."""
+    if isinstance(item, int):
+        return item
+    info = await item_utils.find_item(supabase, item)
+    return info.id if info else None
+
+
+async def _read_qty(supabase: Client, player_id: int, item_id: int) -> Optional[int]:
+    row = (await db_utils.execute(
+        supabase.table(PLAYER_ITEMS_TABLE)
+        .select("quantity")
+        .eq("player_id", player_id)
+        .eq("item_id", item_id)
+        .limit(1)
+    )).data or []
+    return int(row[0]["quantity"]) if row else None
+
+
+async def get_item_qty(supabase: Client, player_id: int, item_name: ItemRef) -> int:
+    item_id = await get_item_id(supabase, item_name)
     if item_id is None:
         return 0
-    row = (supabase.table(PLAYER_ITEMS_TABLE)
-           .select("quantity")
-           .eq("player_id", player_id)
-           .eq("item_id", item_id)
-           .limit(1)
-           .execute()).data or []
-    return int(row[0]["quantity"]) if row else 0
-
-async def consume_item(supabase: Client, player_id: int, item_name: str, amount: int = 1) -> bool:
-    item_id = _get_item_id_by_name(supabase, item_name)
+    return await _read_qty(supabase, player_id, item_id) or 0
+
+
+async def _take_with_cas(supabase: Client, player_id: int, item_id: int, amount: int) -> Optional[int]:
+    for _ in range(CAS_RETRIES):
+        qty = await _read_qty(supabase, player_id, item_id)
+        if qty is None or qty < amount:
+            return None
+        left = qty - amount
+        q = supabase.table(PLAYER_ITEMS_TABLE)
+        q = q.delete() if left == 0 else q.update({"quantity": left})
+        res = await db_utils.execute(
+            q.eq("player_id", player_id).eq("item_id", item_id).eq("quantity", qty)
+        )
+        if res.data:
+            return left
+        # outro clique mexeu na linha entre o select e o update: relê
+    return None
+
+
+async def take_item(supabase: Client, player_id: int, item_name: ItemRef, amount: int = 1) -> Optional[int]:
+    """
+    Consome `amount` unidades se houver saldo. Devolve a quantidade restante,
+    ou None se o item não existe / o jogador não tem o suficiente.
+    """
+    if amount <= 0:
+        return await get_item_qty(supabase, player_id, item_name)
+    item_id = await get_item_id(supabase, item_name)
     if item_id is None:
-        return False
-    row = (supabase.table(PLAYER_ITEMS_TABLE)
-           .select("quantity")
-           .eq("player_id", player_id)
-           .eq("item_id", item_id)
-           .limit(1)
-           .execute()).data or []
-    qty = int(row[0]["quantity"]) if row else 0
-    if qty < amount:
-        return False
-    new_qty = max(0, qty - amount)
-    (supabase.table(PLAYER_ITEMS_TABLE)
-     .update({"quantity": new_qty})
-     .eq("player_id", player_id)
-     .eq("item_id", item_id)
-     .execute())
+        return None
+    found, data = await db_utils.call_rpc(
+        supabase,
+        "consume_item",
+        {"p_player_id": int(player_id), "p_item_id": int(item_id), "p_amount": int(amount)},
+    )
+    if not found:
+        return await _take_with_cas(supabase, int(player_id), int(item_id), int(amount))
+    if isinstance(data, list):
+        data = data[0] if data else None
+    return int(data) if data is not None else None
+
+
+async def consume_item(supabase: Client, player_id: int, item_name: ItemRef, amount: int = 1) -> bool:
+    return await take_item(supabase, player_id, item_name, amount) is not None
+
+
+async def _grant(supabase: Client, player_id: int, item_id: int, amount: int) -> None:
+    for _ in range(CAS_RETRIES):
+        qty = await _read_qty(supabase, player_id, item_id)
+        if qty is None:
+            try:
+                await db_utils.execute(
+                    supabase.table(PLAYER_ITEMS_TABLE).insert(
+                        {"player_id": player_id, "item_id": item_id, "quantity": amount}
+                    )
+                )
+                return
+            except Exception:
+                continue  # outra inserção ganhou a corrida: relê e soma
+        res = await db_utils.execute(
+            supabase.table(PLAYER_ITEMS_TABLE)
+            .update({"quantity": qty + amount})
+            .eq("player_id", player_id)
+            .eq("item_id", item_id)
+            .eq("quantity", qty)
+        )
+        if res.data:
+            return
+    raise RuntimeError(f"Não consegui adicionar o item {item_id} ao inventário de {player_id}.")
+
+
+async def _apply_sequential(supabase: Client, player_id: int, deltas: Dict[int, int]) -> bool:
+    """Fallback sem RPC: consome primeiro (CAS), concede depois; desfaz se algo faltar."""
+    taken: Dict[int, int] = {}
+    for item_id, delta in deltas.items():
+        if delta >= 0:
+            continue
+        if await _take_with_cas(supabase, player_id, item_id, -delta) is None:
+            for back_id, back_amount in taken.items():
+                await _grant(supabase, player_id, back_id, back_amount)
+            return False
+        taken[item_id] = -delta
+    for item_id, delta in deltas.items():
+        if delta > 0:
+            await _grant(supabase, player_id, item_id, delta)
     return True
 
+
+async def apply_item_changes(supabase: Client, player_id: int, changes: Mapping[ItemRef, int]) -> bool:
+    """
+    Concede (delta > 0) e consome (delta < 0) vários itens de uma vez.
+    Tudo ou nada: devolve False, sem alterar nada, se algum item não existir
+    ou se faltar saldo para algum consumo.
+    """
+    deltas: Dict[int, int] = {}
+    for item, delta in changes.items():
+        item_id = await get_item_id(supabase, item)
+        if item_id is None:
+            return False
+        deltas[item_id] = deltas.get(item_id, 0) + int(delta)
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return True
+
+    payload = [{"item_id": k, "delta": v} for k, v in deltas.items()]
+    found, data = await db_utils.call_rpc(
+        supabase, "apply_inventory_changes", {"p_player_id": int(player_id), "p_changes": payload}
+    )
+    if not found:
+        return await _apply_sequential(supabase, int(player_id), deltas)
+    if isinstance(data, list):
+        data = data[0] if data else False
+    return bool(data)
+
+
+async def grant_item(supabase: Client, player_id: int, item_name: ItemRef, amount: int = 1) -> bool:
+    if amount <= 0:
+        return True
+    return await apply_item_changes(supabase, player_id, {item_name: amount})
+
 # ---- Helpers específicos de Pokébola (opcionais, mas úteis) ----
 async def get_pokeball_qty(supabase: Client, player_id: int) -> int:
     return await get_item_qty(supabase, player_id, POKEBALL_NAME)
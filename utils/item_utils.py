@@ -0,0 +1,191 @@
+# utils/item_utils.py
+# -*- coding: utf-8 -*-
+"""
+Catálogo em memória da tabela `items` (id/nome/alias -> ItemInfo).
+
+A tabela é pequena e quase não muda: carregamos tudo num select no startup e
+a loja, a mochila, o !buy e o inventário passam a consultar dicts. Busca:
+nome exato -> nome sem maiúsculas -> chave normalizada (sem acento/espaço/
+hífen, api_name e ITEM_ALIASES). `items_by_type` já devolve as listas da loja
+agrupadas e ordenadas.
+
+Nome desconhecido recarrega o catálogo no máximo uma vez por
+ITEMS_REFRESH_S; `refresh`/`invalidate` forçam (ex.: !reloaditems).
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple, Union
+import asyncio
+import os
+import time
+import unicodedata
+
+from utils import db_utils
+
+ITEMS_TABLE = "items"
+ITEMS_REFRESH_S = float(os.getenv("ITEMS_REFRESH_S", "300"))
+
+# apelido (normalizado na carga) -> nome na tabela items
+ITEM_ALIASES: Dict[str, str] = {
+    "pokebola": "Pokeball",
+    "poke bola": "Pokeball",
+    "escama coracao": "Heart Scale",
+}
+
+
+def normalize(name: str) -> str:
+    """Chave de busca: sem acento, minúscula, só letras/dígitos ("Poké Ball" -> "pokeball")."""
+    s = unicodedata.normalize("NFKD", str(name or ""))
+    return "".join(ch for ch in s.lower() if ch.isalnum())
+
+
+class ItemInfo:
+    __slots__ = (
+        "id", "name", "type", "description", "effect_tag",
+        "required_badges", "api_name", "kind", "price",
+    )
+
+    def __init__(self, row: dict):
+        self.id: int = int(row["id"])
+        self.name: str = str(row.get("name") or "")
+        self.type: str = str(row.get("type") or "other")
+        self.description: str = row.get("description") or ""
+        self.effect_tag: Optional[str] = row.get("effect_tag")
+        self.required_badges: int = int(row.get("required_badges") or 0)
+        self.api_name: Optional[str] = row.get("api_name")
+        # effect_tag "TIPO:PREÇO" (ex.: "STORABLE:200"); None quando ausente/mal formado
+        self.kind, self.price = _parse_effect_tag(self.effect_tag)
+
+    def as_row(self) -> dict:
+        """Formato de linha do Supabase (o que os cogs liam de `items`)."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "description": self.description,
+            "effect_tag": self.effect_tag,
+            "required_badges": self.required_badges,
+            "api_name": self.api_name,
+        }
+
+    def __repr__(self) -> str:
+        return f"ItemInfo({self.id}, {self.name!r}, {self.type}, {self.effect_tag})"
+
+
+def _parse_effect_tag(tag: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    if not tag:
+        return None, None
+    parts = str(tag).split(":")
+    # preço = último segmento, como a listagem da loja sempre leu (`split(":")[-1]`);
+    # tipo só existe com "TIPO:PREÇO"
+    kind = (parts[0] or None) if len(parts) > 1 else None
+    try:
+        return kind, int(parts[-1])
+    except ValueError:
+        return kind, None
+
+
+ITEMS_BY_ID: Dict[int, ItemInfo] = {}
+_BY_NAME: Dict[str, ItemInfo] = {}
+_BY_LOWER: Dict[str, ItemInfo] = {}
+_BY_KEY: Dict[str, ItemInfo] = {}
+_BY_TYPE: Dict[str, List[ItemInfo]] = {}
+
+_loaded_at = 0.0
+_load_lock: Optional[asyncio.Lock] = None
+
+
+def index_rows(rows: List[dict]) -> int:
+    """Troca o catálogo inteiro pelas linhas dadas."""
+    global _loaded_at
+    infos = [ItemInfo(r) for r in rows if r.get("id") is not None and r.get("name")]
+
+    by_id = {i.id: i for i in infos}
+    by_name = {i.name: i for i in infos}
+    by_lower = {i.name.lower(): i for i in infos}
+    by_key: Dict[str, ItemInfo] = {}
+    for i in infos:
+        by_key.setdefault(normalize(i.name), i)
+    for i in infos:
+        if i.api_name:
+            by_key.setdefault(normalize(i.api_name), i)
+    for alias, target in ITEM_ALIASES.items():
+        info = by_lower.get(target.lower())
+        if info is not None:
+            by_key.setdefault(normalize(alias), info)
+
+    by_type: Dict[str, List[ItemInfo]] = {}
+    for i in sorted(infos, key=lambda i: i.name):
+        by_type.setdefault(i.type, []).append(i)
+
+    for target, src in (
+        (ITEMS_BY_ID, by_id), (_BY_NAME, by_name), (_BY_LOWER, by_lower),
+        (_BY_KEY, by_key), (_BY_TYPE, by_type),
+    ):
+        target.clear()
+        target.update(src)
+    _loaded_at = time.monotonic()
+    return len(infos)
+
+
+async def refresh(supabase=None) -> int:
+    """Recarrega `items` do banco (um select)."""
+    global _load_lock
+    if _load_lock is None:
+        _load_lock = asyncio.Lock()
+    supabase = supabase or db_utils.get_client()
+    async with _load_lock:
+        res = await db_utils.execute(supabase.table(ITEMS_TABLE).select("*"))
+        return index_rows(res.data or [])
+
+
+def invalidate() -> None:
+    """Marca o catálogo como velho: a próxima busca recarrega do banco."""
+    global _loaded_at
+    _loaded_at = 0.0
+
+
+def is_loaded() -> bool:
+    return _loaded_at > 0.0
+
+
+async def preload(supabase=None) -> int:
+    """Carga do startup. Falha no banco não impede o bot de subir (tenta de novo na 1ª busca)."""
+    try:
+        count = await refresh(supabase)
+    except Exception as e:
+        print(f"[Items] Falha ao carregar o catálogo: {e}", flush=True)
+        return 0
+    print(f"[Items] Catálogo com {count} itens.", flush=True)
+    return count
+
+
+def get_item(name_or_id: Union[str, int]) -> Optional[ItemInfo]:
+    """Lookup síncrono: id, nome exato, nome sem maiúsculas ou apelido."""
+    if isinstance(name_or_id, int):
+        return ITEMS_BY_ID.get(name_or_id)
+    name = str(name_or_id or "").strip()
+    if not name:
+        return None
+    return _BY_NAME.get(name) or _BY_LOWER.get(name.lower()) or _BY_KEY.get(normalize(name))
+
+
+async def find_item(supabase, name_or_id: Union[str, int]) -> Optional[ItemInfo]:
+    """Como `get_item`, mas carrega/recarrega o catálogo se o item não estiver nele."""
+    info = get_item(name_or_id) if is_loaded() else None
+    if info is None and (not is_loaded() or time.monotonic() - _loaded_at >= ITEMS_REFRESH_S):
+        await refresh(supabase)
+        info = get_item(name_or_id)
+    return info
+
+
+async def ensure_loaded(supabase=None) -> None:
+    if not is_loaded():
+        await refresh(supabase)
+
+
+def items_by_type(item_type: str, max_badges: Optional[int] = None) -> List[ItemInfo]:
+    """Itens de uma categoria da loja, já ordenados por nome."""
+    items = _BY_TYPE.get(item_type, [])
+    if max_badges is None:
+        return list(items)
+    return [i for i in items if i.required_badges <= max_badges]
@@ -0,0 +1,128 @@
+# utils/learnset_utils.py
+# -*- coding: utf-8 -*-
+"""
+Learnset pré-computado por Pokémon.
+
+A árvore moves[].version_group_details[] do /pokemon é percorrida uma única
+vez e vira:
+  - pares (nível, golpe) de level-up ordenados -> bisect
+  - níveis de level-up de cada golpe, na ordem dos version groups da API
+                                               -> "últimos 4 no nível L"
+  - demais métodos (machine, egg, tutor...)    -> tuplas ordenadas
+
+Consultas:
+  moves_between(a, b)   golpes aprendidos com a < nível <= b   (O(log n) + saída)
+  moves_at(L)           golpes aprendidos exatamente no nível L
+  initial_moves(L)      os 4 golpes mais recentes até L (payload de criação)
+  level_up_moves()      todos os golpes de level-up (ordem alfabética)
+"""
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import utils.pokeapi_service as pokeapi
+
+
+class Learnset:
+    __slots__ = ("name", "_levels", "_names", "_lu_levels", "_by_method")
+
+    def __init__(self, pokemon_api_data: dict):
+        self.name: str = str(pokemon_api_data.get("name") or "").lower()
+
+        pairs = set()
+        lu_levels: Dict[str, List[int]] = {}  # golpe -> níveis > 0, na ordem da API
+        by_method: Dict[str, set] = {}
+        for move_info in pokemon_api_data.get("moves") or []:
+            move_name = (move_info.get("move") or {}).get("name")
+            if not move_name:
+                continue
+            for vd in move_info.get("version_group_details") or []:
+                method = (vd.get("move_learn_method") or {}).get("name") or "unknown"
+                if method != "level-up":
+                    by_method.setdefault(method, set()).add(move_name)
+                    continue
+                lvl = int(vd.get("level_learned_at") or 0)
+                pairs.add((lvl, move_name))
+                if lvl > 0:
+                    lu_levels.setdefault(move_name, []).append(lvl)
+                by_method.setdefault(method, set()).add(move_name)
+
+        ordered = sorted(pairs)
+        self._levels: Tuple[int, ...] = tuple(lv for lv, _ in ordered)
+        self._names: Tuple[str, ...] = tuple(n for _, n in ordered)
+
+        self._lu_levels: Tuple[Tuple[str, Tuple[int, ...]], ...] = tuple(
+            (n, tuple(lvls)) for n, lvls in lu_levels.items()
+        )
+
+        self._by_method: Dict[str, Tuple[str, ...]] = {m: tuple(sorted(v)) for m, v in by_method.items()}
+
+    # ---------- consultas ----------
+    def moves_between(self, low: int, high: int) -> List[str]:
+        """Golpes de level-up com low < nível <= high (sem repetir, por nível)."""
+        i = bisect_right(self._levels, low)
+        j = bisect_right(self._levels, high)
+        seen = set()
+        out = []
+        for name in self._names[i:j]:
+            if name not in seen:
+                seen.add(name)
+                out.append(name)
+        return out
+
+    def moves_at(self, level: int) -> List[str]:
+        i = bisect_left(self._levels, level)
+        j = bisect_right(self._levels, level)
+        return list(self._names[i:j])
+
+    def initial_moves(self, level: int, count: int = 4) -> List[Optional[str]]:
+        """
+        Os `count` golpes mais recentes até `level`, completando com None. Mesma
+        regra do get_initial_moves original: de cada golpe vale o primeiro version
+        group (na ordem da API) em que ele é aprendido num nível 1..`level`.
+        """
+        candidates = []
+        for name, lvls in self._lu_levels:
+            for lvl in lvls:
+                if lvl <= level:
+                    candidates.append((lvl, name))
+                    break
+        candidates.sort()
+        moves: List[Optional[str]] = [name for _, name in candidates[-count:]]
+        while len(moves) < count:
+            moves.append(None)
+        return moves
+
+    def level_up_moves(self) -> Tuple[str, ...]:
+        return self._by_method.get("level-up", ())
+
+    def moves_by_method(self, method: str) -> Tuple[str, ...]:
+        return self._by_method.get(method, ())
+
+    def methods(self) -> Tuple[str, ...]:
+        return tuple(sorted(self._by_method))
+
+
+# nome -> Learnset
+LEARNSETS: Dict[str, Learnset] = {}
+
+
+def build_learnset(pokemon_api_data: dict) -> Learnset:
+    ls = Learnset(pokemon_api_data)
+    if ls.name:
+        LEARNSETS[ls.name] = ls
+    return ls
+
+
+async def get_learnset(pokemon_api_name: str) -> Optional[Learnset]:
+    """Learnset do índice; na primeira vez monta a partir do /pokemon."""
+    key = str(pokemon_api_name or "").lower()
+    ls = LEARNSETS.get(key)
+    if ls is not None:
+        return ls
+    data = await pokeapi.get_pokemon_data(key)
+    if not data:
+        return None
+    ls = Learnset(data)
+    LEARNSETS[key] = ls
+    return ls
@@ -0,0 +1,133 @@
+# utils/move_utils.py
+# -*- coding: utf-8 -*-
+"""
+Catálogo compacto de golpes (nome -> MoveInfo) para a batalha.
+
+Em vez de abrir o JSON inteiro de /move/<nome> a cada turno, guardamos só o
+que a batalha usa em registros com __slots__. A consulta é um dict lookup
+síncrono; a rede só entra em `ensure_moves`, para golpes ainda desconhecidos.
+
+Fontes do preload (no startup):
+  - snapshot local (POKEAPI_PROVIDER=snapshot), se existir;
+  - respostas /move já salvas no cache em disco.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+import asyncio
+import json
+
+import utils.pokeapi_service as pokeapi
+from utils import text_utils
+
+DEFAULT_POWER = 40
+
+
+class MoveInfo:
+    __slots__ = ("name", "type", "power", "accuracy", "category", "priority")
+
+    def __init__(
+        self,
+        name: str,
+        type: str = "normal",
+        power: int = 0,
+        accuracy: Optional[int] = None,
+        category: str = "physical",
+        priority: int = 0,
+    ):
+        self.name = name
+        self.type = type
+        self.power = power
+        self.accuracy = accuracy
+        self.category = category
+        self.priority = priority
+
+    @classmethod
+    def from_api(cls, data: dict) -> "MoveInfo":
+        return cls(
+            name=str(data.get("name") or "").lower(),
+            type=(data.get("type") or {}).get("name", "normal"),
+            power=int(data.get("power") or 0),
+            accuracy=data.get("accuracy"),
+            category=(data.get("damage_class") or {}).get("name", "physical"),
+            priority=int(data.get("priority") or 0),
+        )
+
+    def as_battle_move(self) -> Dict[str, object]:
+        """Formato de golpe usado pelo BattleCog (status sem poder viram 40, como antes)."""
+        return {
+            "name": self.name,
+            "type": self.type,
+            "power": self.power or DEFAULT_POWER,
+            "category": self.category,
+        }
+
+    def __repr__(self) -> str:
+        return f"MoveInfo({self.name!r}, {self.type}, {self.power}, {self.category})"
+
+
+# nome -> MoveInfo
+MOVES: Dict[str, MoveInfo] = {}
+
+
+def _key(name: str) -> str:
+    return str(name or "").strip().lower()
+
+
+def register_move_data(data: dict) -> Optional[MoveInfo]:
+    if not data or not data.get("name"):
+        return None
+    info = MoveInfo.from_api(data)
+    MOVES[info.name] = info
+    text_utils.index_move(data)
+    return info
+
+
+def get_move(name: str) -> MoveInfo:
+    """Lookup O(1). Golpe desconhecido -> registro genérico (normal/físico/40)."""
+    key = _key(name)
+    info = MOVES.get(key)
+    if info is None:
+        return MoveInfo(key or "tackle", power=DEFAULT_POWER)
+    return info
+
+
+def battle_moves(names: Iterable[str], limit: int = 4) -> List[Dict[str, object]]:
+    """Converte a lista de golpes do DB no formato da batalha, sem awaits."""
+    return [get_move(n).as_battle_move() for n in list(names or [])[:limit] if n]
+
+
+async def ensure_moves(names: Iterable[str]) -> int:
+    """Busca (em paralelo) os golpes que ainda não estão no catálogo."""
+    missing = {_key(n) for n in (names or []) if n and _key(n) not in MOVES}
+    if not missing:
+        return 0
+    results = await asyncio.gather(
+        *(pokeapi.get_move_data(n) for n in missing), return_exceptions=True
+    )
+    loaded = 0
+    for data in results:
+        if isinstance(data, dict) and register_move_data(data):
+            loaded += 1
+    return loaded
+
+
+async def preload(extra: Iterable[str] = ()) -> int:
+    """Monta o catálogo a partir do snapshot/cache em disco e garante os `extra`."""
+    snap = pokeapi.get_snapshot()
+    if snap is not None:
+        for data in (snap.endpoints.get("move") or {}).values():
+            register_move_data(data)
+
+    if pokeapi.disk_store:
+        def _load():
+            return list(pokeapi.disk_store.iter_endpoints(["move"]))
+
+        try:
+            for _url, raw in await asyncio.to_thread(_load):
+                register_move_data(json.loads(raw))
+        except Exception as e:
+            print(f"[Moves] Falha lendo golpes do disco: {e}", flush=True)
+
+    await ensure_moves(extra)
+    print(f"[Moves] Catálogo com {len(MOVES)} golpes.", flush=True)
+    return len(MOVES)
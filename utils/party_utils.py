@@ -0,0 +1,238 @@
+# utils/party_utils.py
+# -*- coding: utf-8 -*-
+"""
+Layout da party (slots 1..6) de um jogador.
+
+`PartyLayout` é o retrato em memória da party (e dos Pokémon da Box que a
+tela mostrou, via `remember`); as
+operações (swap, move, Box -> Party) são calculadas nele e viram uma lista
+de mudanças {id, from, to} aplicada de uma vez pela RPC `set_party_layout`
+(BaseSupaFunctions.sql), numa transação só. Se alguém mexeu na party no meio
+(o "from" não bate), nada é alterado e o layout é recarregado.
+
+Dados sujos (dois Pokémon no mesmo slot) são resolvidos no próprio plano: os
+excedentes do slot tocado vão para a Box junto com a troca.
+
+Sem a RPC, cai em UPDATEs sequenciais (Box temporária e depois destino),
+cada um condicionado ao slot esperado.
+
+As linhas vêm do cache de roster (utils.roster_utils), invalidado a cada gravação.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+from utils import db_utils
+from utils import roster_utils
+
+TABLE = "player_pokemon"
+PARTY_SIZE = 6
+
+# id -> (slot atual, slot novo); None = Box
+Moves = Dict[str, Tuple[Optional[int], Optional[int]]]
+
+
+class PartyLayoutError(ValueError):
+    """Operação inválida no layout (mensagem pronta para o jogador)."""
+
+
+def display_name(row: dict) -> str:
+    return (row.get("nickname") or row.get("pokemon_api_name") or "").capitalize()
+
+
+class PartyLayout:
+    def __init__(self, player_id: int, rows: List[dict]):
+        self.player_id = int(player_id)
+        self.reset(rows)
+
+    def reset(self, rows: List[dict]) -> None:
+        """Reindexa a partir das linhas (após gravar ou recarregar)."""
+        self.by_id: Dict[str, dict] = {}
+        self.slots: Dict[int, dict] = {}
+        self.strays: List[dict] = []  # duplicatas de slot (dados sujos)
+        for r in rows:
+            self.by_id[str(r["id"])] = r
+            pos = r.get("party_position")
+            if pos is None:
+                continue
+            if int(pos) in self.slots:
+                self.strays.append(r)
+            else:
+                self.slots[int(pos)] = r
+
+    def party(self) -> List[dict]:
+        """Party ordenada por slot."""
+        return [self.slots[s] for s in sorted(self.slots)]
+
+    def remember(self, rows: List[dict]) -> None:
+        """Registra Pokémon da Box vistos numa página (candidatos a Box -> Party)."""
+        for r in rows:
+            if r.get("party_position") is None:
+                self.by_id.setdefault(str(r["id"]), {**r, "party_position": None})
+
+    def get(self, mon_id: str) -> Optional[dict]:
+        return self.by_id.get(str(mon_id))
+
+    def find_in_party(self, name: str) -> Optional[dict]:
+        """Pokémon da party pelo apelido ou nome da espécie (sem maiúsculas)."""
+        name = name.strip().lower()
+        for r in self.party():
+            if (r.get("nickname") or r.get("pokemon_api_name") or "").lower() == name:
+                return r
+        return None
+
+    # ---------- planejamento ----------
+    def _clear_strays(self, moves: Moves, *slots: Optional[int]) -> None:
+        for r in self.strays:
+            if r.get("party_position") in slots:
+                moves[str(r["id"])] = (r["party_position"], None)
+
+    def plan_move(self, mon_id: str, dest_slot: int) -> Tuple[Moves, str]:
+        """
+        Pokémon da PARTY para `dest_slot`: SWAP se o destino está ocupado,
+        MOVE se está vazio. Devolve (mudanças, mensagem).
+        """
+        if not 1 <= dest_slot <= PARTY_SIZE:
+            raise PartyLayoutError(f"Slot inválido (use 1–{PARTY_SIZE}).")
+        src = self.get(mon_id)
+        if src is None:
+            raise PartyLayoutError("Pokémon selecionado não encontrado.")
+        src_slot = src.get("party_position")
+        if src_slot is None:
+            raise PartyLayoutError("O Pokémon selecionado não está na party.")
+        src_slot = int(src_slot)
+        if src_slot == dest_slot:
+            raise PartyLayoutError("Esse Pokémon já está nesse slot.")
+
+        moves: Moves = {str(src["id"]): (src_slot, dest_slot)}
+        dst = self.slots.get(dest_slot)
+        self._clear_strays(moves, src_slot, dest_slot)
+        if dst is not None:
+            moves[str(dst["id"])] = (dest_slot, src_slot)
+            return moves, f"✅ Slots trocados: #{src_slot} ↔ #{dest_slot}."
+        return moves, f"✅ Pokémon movido para o slot #{dest_slot}."
+
+    def plan_from_box(self, mon_id: str, dest_slot: int) -> Tuple[Moves, str]:
+        """Pokémon da BOX para `dest_slot`; o ocupante (se houver) vai para a Box."""
+        if not 1 <= dest_slot <= PARTY_SIZE:
+            raise PartyLayoutError(f"Slot inválido (use 1–{PARTY_SIZE}).")
+        mon = self.get(mon_id)
+        if mon is None:
+            raise PartyLayoutError("Pokémon não encontrado.")
+        if mon.get("party_position") is not None:
+            raise PartyLayoutError("Esse Pokémon já está na party.")
+
+        moves: Moves = {str(mon["id"]): (None, dest_slot)}
+        dst = self.slots.get(dest_slot)
+        if dst is not None:
+            moves[str(dst["id"])] = (dest_slot, None)
+        self._clear_strays(moves, dest_slot)
+        return moves, f"✅ Pokémon movido da Box para o slot #{dest_slot}."
+
+    def apply(self, moves: Moves) -> None:
+        """Reflete no retrato as mudanças já gravadas no banco."""
+        for mon_id, (_, to) in moves.items():
+            row = self.by_id.get(mon_id)
+            if row is not None:
+                row["party_position"] = to
+        self.reset(list(self.by_id.values()))
+
+
+# ---------- BD ----------
+async def load_layout(supabase: Client, player_id: int) -> PartyLayout:
+    """Party do jogador (do cache de roster; cópias, o layout pode alterá-las)."""
+    return PartyLayout(player_id, await roster_utils.get_party(supabase, player_id))
+
+
+async def _set_slots(supabase: Client, player_id: int, slots: Dict[str, Optional[int]]) -> bool:
+    """Box temporária e depois o slot final (funciona com UNIQUE (player_id, party_position))."""
+    ok = True
+    for mon_id in slots:
+        res = await db_utils.execute(
+            supabase.table(TABLE).update({"party_position": None}).eq("id", mon_id).eq("player_id", player_id)
+        )
+        ok = ok and bool(res.data)
+    for mon_id, to in slots.items():
+        if to is not None:
+            res = await db_utils.execute(
+                supabase.table(TABLE).update({"party_position": to}).eq("id", mon_id).eq("player_id", player_id)
+            )
+            ok = ok and bool(res.data)
+    return ok
+
+
+async def _apply_sequential(supabase: Client, player_id: int, moves: Moves) -> bool:
+    """
+    Fallback sem a RPC: tudo que sai de um slot vai para a Box, depois para o
+    destino. Se algum passo falha, quem já foi mexido volta ao slot de origem.
+    """
+    moved: Dict[str, Optional[int]] = {}
+    for mon_id, (frm, _) in moves.items():
+        q = supabase.table(TABLE).update({"party_position": None}).eq("id", mon_id).eq("player_id", player_id)
+        q = q.is_("party_position", "null") if frm is None else q.eq("party_position", frm)
+        res = await db_utils.execute(q)
+        if not res.data:
+            await _set_slots(supabase, player_id, moved)
+            return False
+        moved[mon_id] = frm
+    for mon_id, (_, to) in moves.items():
+        if to is None:
+            continue
+        res = await db_utils.execute(
+            supabase.table(TABLE).update({"party_position": to}).eq("id", mon_id).eq("player_id", player_id)
+        )
+        if not res.data:
+            await _set_slots(supabase, player_id, moved)
+            return False
+    return True
+
+
+async def apply_moves(supabase: Client, player_id: int, moves: Moves) -> bool:
+    """Grava as mudanças de slot. False se o estado no banco não era o esperado."""
+    if not moves:
+        return True
+    try:
+        return await _apply_moves(supabase, player_id, moves)
+    finally:
+        roster_utils.invalidate(player_id)
+
+
+async def _apply_moves(supabase: Client, player_id: int, moves: Moves) -> bool:
+    payload = [{"id": mon_id, "from": frm, "to": to} for mon_id, (frm, to) in moves.items()]
+    found, data = await db_utils.call_rpc(
+        supabase, "set_party_layout", {"p_player_id": int(player_id), "p_moves": payload}
+    )
+    if not found:
+        return await _apply_sequential(supabase, int(player_id), moves)
+    if isinstance(data, list):
+        data = data[0] if data else False
+    return bool(data)
+
+
+async def _commit(supabase: Client, layout: PartyLayout, moves: Moves, msg: str) -> str:
+    if await apply_moves(supabase, layout.player_id, moves):
+        layout.apply(moves)
+        return msg
+    fresh = await load_layout(supabase, layout.player_id)
+    layout.reset(list(fresh.by_id.values()))
+    return "⚠️ Sua party mudou enquanto você escolhia. Confira e tente de novo."
+
+
+async def move_in_party(supabase: Client, layout: PartyLayout, mon_id: str, dest_slot: int) -> str:
+    """Swap/move dentro da party. Atualiza `layout` e devolve a mensagem para o jogador."""
+    try:
+        moves, msg = layout.plan_move(mon_id, dest_slot)
+    except PartyLayoutError as e:
+        return str(e)
+    return await _commit(supabase, layout, moves, msg)
+
+
+async def move_from_box(supabase: Client, layout: PartyLayout, mon_id: str, dest_slot: int) -> str:
+    """Box -> Party. Atualiza `layout` e devolve a mensagem para o jogador."""
+    try:
+        moves, msg = layout.plan_from_box(mon_id, dest_slot)
+    except PartyLayoutError as e:
+        return str(e)
+    return await _commit(supabase, layout, moves, msg)
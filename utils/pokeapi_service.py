@@ -1,13 +1,82 @@
 # utils/pokeapi_service.py
 import aiohttp
 import asyncio
+import json
 import math
-import re
+import os
+
+from utils import growth_utils
+from utils.api_cache import ApiCache
+from utils.pokeapi_store import PokeApiDiskStore
+from utils.pokeapi_snapshot import load_snapshot
 
-# Cache manual p/ resultados JSON
-api_cache = {}
 BASE_URL = "https://pokeapi.co/api/v2"
 
+# ---------- cache LRU p/ resultados JSON ----------
+# Orçamento configurável por env (0 = sem limite)
+CACHE_MAX_ENTRIES = int(os.getenv("POKEAPI_CACHE_MAX_ENTRIES", "1500"))
+CACHE_MAX_BYTES = int(os.getenv("POKEAPI_CACHE_MAX_BYTES", str(96 * 1024 * 1024)))
+
+# TTL (segundos) por endpoint; None = nunca expira (dados que não mudam)
+CACHE_TTL_BY_ENDPOINT = {
+    "pokemon": 12 * 3600,
+    "pokemon-species": 12 * 3600,
+    "move": 24 * 3600,
+    "growth-rate": None,
+    "evolution-chain": 24 * 3600,
+    "location-area": 6 * 3600,
+}
+CACHE_DEFAULT_TTL = 3600
+
+api_cache = ApiCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    ttl_by_endpoint=CACHE_TTL_BY_ENDPOINT,
+    default_ttl=CACHE_DEFAULT_TTL,
+)
+
+# ---------- cache persistente em disco (sobrevive a restart) ----------
+# POKEAPI_DISK_CACHE="" desliga. Em container, aponte para um volume.
+DISK_CACHE_PATH = os.getenv("POKEAPI_DISK_CACHE", os.path.join(".cache", "pokeapi.sqlite3"))
+DISK_CACHE_MAX_AGE_DAYS = float(os.getenv("POKEAPI_DISK_CACHE_MAX_AGE_DAYS", "30"))
+
+# Endpoints carregados na memória ao subir o bot (dados "estáticos")
+WARM_START_ENDPOINTS = ("pokemon-species", "pokemon", "move", "growth-rate")
+WARM_START_LIMIT = int(os.getenv("POKEAPI_WARM_START_LIMIT", "1000"))
+
+disk_store = (
+    PokeApiDiskStore(DISK_CACHE_PATH, max_age_seconds=DISK_CACHE_MAX_AGE_DAYS * 86400 or None)
+    if DISK_CACHE_PATH else None
+)
+
+# ---------- provider: "live" (pokeapi.co) ou "snapshot" (arquivo local) ----------
+# POKEAPI_PROVIDER=snapshot serve tudo do snapshot gerado por
+# dumps/5-build_pokeapi_snapshot.py. Com POKEAPI_SNAPSHOT_STRICT=1 nada vai
+# para a rede (o que não estiver no snapshot retorna None) -> modo offline.
+PROVIDER = os.getenv("POKEAPI_PROVIDER", "live").strip().lower()
+SNAPSHOT_PATH = os.getenv("POKEAPI_SNAPSHOT_PATH", os.path.join("data", "pokeapi_snapshot.json.gz"))
+SNAPSHOT_STRICT = os.getenv("POKEAPI_SNAPSHOT_STRICT", "0") == "1"
+
+_snapshot = None
+_snapshot_loaded = False
+
+
+def get_snapshot():
+    """Snapshot local (carregado sob demanda) ou None se o provider for 'live'."""
+    global _snapshot, _snapshot_loaded
+    if PROVIDER != "snapshot":
+        return None
+    if not _snapshot_loaded:
+        _snapshot = load_snapshot(SNAPSHOT_PATH)
+        _snapshot_loaded = True
+    return _snapshot
+
+
+async def init_provider():
+    """Carrega o snapshot fora do event loop (chamado no startup)."""
+    if PROVIDER == "snapshot":
+        await asyncio.to_thread(get_snapshot)
+
 # Headers atualizados: 
 # Removemos o "identity" para permitir compressão automática
 # utils/pokeapi_service.py
@@ -22,6 +91,11 @@ API_HEADERS = {
 # Variável global para a sessão
 _session = None
 
+# ---------- single-flight ----------
+# url -> Task em andamento; chamadas simultâneas p/ a mesma URL esperam a mesma Task
+_inflight: dict = {}
+_coalesced_count = 0
+
 async def get_session():
     """Retorna uma sessão única para o bot inteiro (Singleton)."""
     global _session
@@ -31,10 +105,87 @@ async def get_session():
         _session = aiohttp.ClientSession(headers=API_HEADERS, timeout=timeout)
     return _session
 
+
+def get_cache_stats() -> dict:
+    """Contadores do cache (entradas, bytes, hits/misses, evictions)."""
+    st = api_cache.stats()
+    st["coalesced"] = _coalesced_count
+    st["inflight"] = len(_inflight)
+    st["disk"] = disk_store.stats() if disk_store else None
+    snap = _snapshot if _snapshot_loaded else None
+    st["snapshot"] = snap.stats() if snap else None
+    return st
+
+
+async def warm_start_from_disk(endpoints=WARM_START_ENDPOINTS, limit: int = WARM_START_LIMIT) -> int:
+    """
+    Carrega no cache em memória as respostas já salvas em disco.
+    Chamado uma vez no startup; retorna quantas entradas foram carregadas.
+    """
+    if not disk_store:
+        return 0
+
+    def _load():
+        return list(disk_store.iter_endpoints(endpoints, limit=limit))
+
+    try:
+        rows = await asyncio.to_thread(_load)
+    except Exception as e:
+        print(f"[PokeAPI] Falha no warm-start do disco: {e}", flush=True)
+        return 0
+
+    loaded = 0
+    # rows vem do mais recente p/ o mais antigo; inserimos ao contrário
+    # para os mais recentes ficarem no topo do LRU
+    for url, raw in reversed(rows):
+        try:
+            api_cache.set(url, json.loads(raw), size=len(raw))
+            loaded += 1
+        except Exception:
+            continue
+    print(f"[PokeAPI] Warm-start: {loaded} respostas carregadas do disco.", flush=True)
+    return loaded
+
+
 async def get_data_from_url(url: str):
-    if url in api_cache:
-        return api_cache[url]
-    
+    global _coalesced_count
+    snap = get_snapshot()
+    if snap is not None:
+        data = snap.get(url)
+        if data is not None or SNAPSHOT_STRICT:
+            return data
+    elif PROVIDER == "snapshot" and SNAPSHOT_STRICT:
+        return None
+
+    cached = api_cache.get(url)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(url)
+    if task is not None:
+        _coalesced_count += 1
+    else:
+        task = asyncio.ensure_future(_fetch_uncached(url))
+        _inflight[url] = task
+        task.add_done_callback(lambda _t, _u=url: _inflight.pop(_u, None))
+
+    # shield: se um chamador for cancelado, os outros continuam esperando a mesma Task
+    return await asyncio.shield(task)
+
+
+async def _fetch_uncached(url: str):
+    """Busca fora da memória: disco e, se não houver, rede."""
+    # 2º nível: store em disco
+    if disk_store:
+        try:
+            raw = await asyncio.to_thread(disk_store.get_raw, url)
+            if raw is not None:
+                data = json.loads(raw)
+                api_cache.set(url, data, size=len(raw))
+                return data
+        except Exception as e:
+            print(f"[PokeAPI] Erro lendo cache em disco: {e}")
+
     try:
         session = await get_session()
         async with session.get(url) as resp:
@@ -43,8 +194,11 @@ async def get_data_from_url(url: str):
                 print(f"[PokeAPI] Erro {resp.status} ao acessar: {url}")
                 return None
             
-            data = await resp.json()
-            api_cache[url] = data
+            raw = await resp.read()
+            data = json.loads(raw)
+            api_cache.set(url, data, size=len(raw))
+            if disk_store:
+                await asyncio.to_thread(disk_store.put_raw, url, raw)
             return data
             
     except Exception as e:
@@ -62,18 +216,35 @@ async def get_pokemon_species_data(pokemon_name_or_id: str):
     return await get_data_from_url(url)
 
 
+async def get_move_data(move_name_or_id: str):
+    url = f"{BASE_URL}/move/{str(move_name_or_id).lower()}"
+    return await get_data_from_url(url)
+
+
 async def get_evolution_chain_data(chain_url: str):
     return await get_data_from_url(chain_url)
 
 
+# curvas fora das 6 conhecidas (compiladas do JSON da API na 1ª vez)
+_extra_growth_tables: dict = {}
+
+
+async def get_growth_table(growth_rate_url: str):
+    """Tabela de XP (tupla indexada por nível) da growth-rate, ou None."""
+    table = growth_utils.get_table(growth_rate_url)
+    if table is not None:
+        return table
+    table = _extra_growth_tables.get(growth_rate_url)
+    if table is None:
+        table = growth_utils.compile_levels(await get_data_from_url(growth_rate_url))
+        if table is not None:
+            _extra_growth_tables[growth_rate_url] = table
+    return table
+
+
 async def get_total_xp_for_level(growth_rate_url: str, level: int) -> int | float:
-    growth_data = await get_data_from_url(growth_rate_url)
-    if not growth_data:
-        return float("inf")
-    for level_info in growth_data.get("levels", []):
-        if level_info.get("level") == level:
-            return level_info["experience"]
-    return float("inf")
+    table = await get_growth_table(growth_rate_url)
+    return growth_utils.xp_for_level(table, level)
 
 
 def find_evolution_details(chain: dict, current_pokemon_name: str) -> list | None:
@@ -87,6 +258,23 @@ def find_evolution_details(chain: dict, current_pokemon_name: str) -> list | Non
 
 
 # ---------- cálculo de stats (alinhado ao schema snake_case) ----------
+# nome do stat na PokeAPI -> coluna em player_pokemon
+STAT_COLUMNS = {
+    "hp": "max_hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special-attack": "special_attack",
+    "special-defense": "special_defense",
+    "speed": "speed",
+}
+
+
+def calculate_stat(api_name: str, base_val: int, level: int) -> int:
+    if api_name == "hp":
+        return math.floor(((2 * base_val * level) / 100) + level + 10)
+    return math.floor(((2 * base_val * level) / 100) + 5)
+
+
 def calculate_stats_for_level(base_stats: list, level: int) -> dict:
     """
     hp -> max_hp
@@ -96,27 +284,13 @@ def calculate_stats_for_level(base_stats: list, level: int) -> dict:
     special-defense -> special_defense
     speed -> speed
     """
-    stat_name_map = {
-        "hp": "max_hp",
-        "attack": "attack",
-        "defense": "defense",
-        "special-attack": "special_attack",
-        "special-defense": "special_defense",
-        "speed": "speed",
-    }
-
     stats = {}
     for stat in base_stats:
         api_name = stat["stat"]["name"]
-        base_val = stat["base_stat"]
-        db_col = stat_name_map.get(api_name)
+        db_col = STAT_COLUMNS.get(api_name)
         if not db_col:
             continue
-        if api_name == "hp":
-            val = math.floor(((2 * base_val * level) / 100) + level + 10)
-        else:
-            val = math.floor(((2 * base_val * level) / 100) + 5)
-        stats[db_col] = val
+        stats[db_col] = calculate_stat(api_name, stat["base_stat"], level)
     return stats
 
 
@@ -124,49 +298,34 @@ def get_initial_moves(pokemon_api_data: dict, starting_level: int) -> list:
     """
     4 moves mais recentes por nível aprendido (level-up) até starting_level.
     """
-    candidates = []
-    for move_info in pokemon_api_data.get("moves", []):
-        move_name = move_info.get("move", {}).get("name")
-        if not move_name:
-            continue
-        for vd in move_info.get("version_group_details", []):
-            method = (vd.get("move_learn_method") or {}).get("name")
-            if method == "level-up":
-                lvl = vd.get("level_learned_at", 0) or 0
-                if 0 < lvl <= starting_level:
-                    candidates.append((lvl, move_name))
-                    break
-    candidates.sort(key=lambda x: (x[0], x[1]))  # por nível, depois nome
-    initial_moves = [name for _, name in candidates[-4:]]
-    while len(initial_moves) < 4:
-        initial_moves.append(None)
-    return initial_moves
+    from utils.learnset_utils import build_learnset  # import tardio (learnset_utils importa este módulo)
+    return build_learnset(pokemon_api_data).initial_moves(starting_level)
 
 
 # ---------- helpers de flavor text / sprites ----------
 def _clean_flavor_text(text: str) -> str:
     """Limpa o texto da Pokédex removendo quebras de linha e caracteres de controle."""
-    if not text:
-        return "Nenhuma descrição encontrada."
-    text = text.replace("\n", " ").replace("\f", " ")
-    text = re.sub(r"[\x00-\x1f\x7f-\x9f]", "", text)
-    return re.sub(r"\s+", " ", text).strip()
+    from utils.text_utils import clean_flavor_text  # import tardio (text_utils importa este módulo)
+    return clean_flavor_text(text)
+
+
+def _species_text(species_data: dict, lang: str) -> str:
+    from utils import text_utils  # import tardio (text_utils importa este módulo)
+    if not species_data or "flavor_text_entries" not in species_data:
+        return text_utils.NO_FLAVOR_TEXT
+    name = species_data.get("name")
+    if not text_utils.has_species(name):
+        text_utils.index_species(species_data)
+    return text_utils.species_flavor(name, lang) or text_utils.NO_FLAVOR_TEXT
 
 
 def get_portuguese_flavor_text(species_data: dict) -> str:
     """
     ***Função esperada pelo TeamCog***:
-    recebe o dict de `pokemon-species` e devolve um flavor text em pt-BR (fallback: en).
+    recebe o dict de `pokemon-species` e devolve um flavor text em pt-BR (fallback: en),
+    pelo índice de textos (utils.text_utils).
     """
-    if not species_data or "flavor_text_entries" not in species_data:
-        return "Descrição não disponível."
-    for entry in species_data["flavor_text_entries"]:
-        if entry.get("language", {}).get("name") == "pt":
-            return _clean_flavor_text(entry.get("flavor_text", ""))
-    for entry in species_data["flavor_text_entries"]:  # fallback inglês
-        if entry.get("language", {}).get("name") == "en":
-            return _clean_flavor_text(entry.get("flavor_text", ""))
-    return "Descrição não disponível."
+    return _species_text(species_data, "pt")
 
 
 async def get_species_flavor_text_pt(pokemon_name_or_id: str) -> str:
@@ -203,7 +362,11 @@ async def get_location_area_encounters(
     data = await get_data_from_url(url)
     if not data:
         return []
+    return parse_location_area_encounters(data, version)
+
 
+def parse_location_area_encounters(data: dict, version: str | None = None) -> list[dict]:
+    """Achata o JSON de /location-area no formato de `get_location_area_encounters`."""
     version = version.lower() if version else None
     results: list[dict] = []
 
@@ -261,7 +424,4 @@ async def get_species_flavor_text_en(pokemon_name_or_id: str) -> str:
     data = await get_pokemon_species_data(pokemon_name_or_id)
     if not data:
         return "Description unavailable."
-    for entry in data.get("flavor_text_entries", []):
-        if entry.get("language", {}).get("name") == "en":
-            return _clean_flavor_text(entry.get("flavor_text", ""))
-    return "Descrição não disponível."
+    return _species_text(data, "en")
@@ -0,0 +1,185 @@
+# utils/pokeapi_snapshot.py
+# -*- coding: utf-8 -*-
+"""
+Snapshot offline da PokeAPI (gerado por dumps/5-build_pokeapi_snapshot.py).
+
+Formato (JSON gzip):
+{
+  "format": 1,
+  "version": "2026-10-17T12:00:00Z",
+  "source": "https://pokeapi.co/api/v2",
+  "endpoints": { "pokemon": { "pidgey": {...}, ... }, "move": {...}, ... },
+  "aliases":   { "pokemon": { "16": "pidgey", ... }, ... }
+}
+
+Os payloads são "enxugados" (só os campos que o bot lê) pelo mesmo
+`trim_payload` usado no builder, então o formato não diverge.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import gzip
+import json
+import os
+
+SNAPSHOT_FORMAT = 1
+
+# Endpoints que o bot consome (e que o builder baixa)
+SNAPSHOT_ENDPOINTS = (
+    "pokemon",
+    "pokemon-species",
+    "move",
+    "growth-rate",
+    "evolution-chain",
+    "location-area",
+)
+
+# Campos de topo mantidos por endpoint (None = payload inteiro)
+_KEEP_FIELDS: Dict[str, Optional[Tuple[str, ...]]] = {
+    "pokemon": (
+        "id", "name", "base_experience", "height", "weight", "order",
+        "species", "stats", "types", "moves", "sprites",
+    ),
+    "pokemon-species": (
+        "id", "name", "order", "capture_rate", "base_happiness", "gender_rate",
+        "hatch_counter", "is_baby", "is_legendary", "is_mythical",
+        "growth_rate", "evolution_chain", "evolves_from_species",
+        "flavor_text_entries", "names", "varieties",
+    ),
+    "move": (
+        "id", "name", "power", "accuracy", "pp", "priority", "type",
+        "damage_class", "effect_chance", "meta", "stat_changes", "target", "names",
+    ),
+    "growth-rate": ("id", "name", "formula", "levels"),
+    "evolution-chain": None,
+    "location-area": ("id", "name", "location", "pokemon_encounters"),
+}
+
+# Idiomas mantidos em flavor_text_entries / names
+_KEEP_LANGS = {"en", "pt", "pt-br", "pt-BR"}
+
+
+def parse_api_url(url: str) -> Tuple[str, str]:
+    """
+    Normaliza uma URL da PokeAPI em (endpoint, chave).
+      'https://pokeapi.co/api/v2/pokemon/Pidgey'   -> ('pokemon', 'pidgey')
+      'https://pokeapi.co/api/v2/growth-rate/4/'   -> ('growth-rate', '4')
+    """
+    path = (url or "").split("://", 1)[-1].split("?", 1)[0]
+    marker = "/api/v2/"
+    if marker in path:
+        path = path.split(marker, 1)[1]
+    parts = [p for p in path.strip("/").split("/") if p]
+    if len(parts) < 2:
+        return (parts[0] if parts else ""), ""
+    return parts[0], parts[1].lower()
+
+
+def _trim_sprites(sprites: Dict[str, Any]) -> Dict[str, Any]:
+    sprites = sprites or {}
+    art = ((sprites.get("other") or {}).get("official-artwork") or {})
+    return {
+        "front_default": sprites.get("front_default"),
+        "front_shiny": sprites.get("front_shiny"),
+        "back_default": sprites.get("back_default"),
+        "back_shiny": sprites.get("back_shiny"),
+        "other": {
+            "official-artwork": {
+                "front_default": art.get("front_default"),
+                "front_shiny": art.get("front_shiny"),
+            }
+        },
+    }
+
+
+def _keep_lang(entries: list) -> list:
+    return [e for e in (entries or []) if ((e.get("language") or {}).get("name") in _KEEP_LANGS)]
+
+
+def trim_payload(endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove do payload tudo que o bot não usa (sprites extras, idiomas etc.)."""
+    keep = _KEEP_FIELDS.get(endpoint)
+    if keep is None or not isinstance(data, dict):
+        return data
+    out = {k: data[k] for k in keep if k in data}
+
+    if "sprites" in out:
+        out["sprites"] = _trim_sprites(out["sprites"])
+    if "flavor_text_entries" in out:
+        out["flavor_text_entries"] = _keep_lang(out["flavor_text_entries"])
+    if "names" in out:
+        out["names"] = _keep_lang(out["names"])
+    if endpoint == "pokemon" and "moves" in out:
+        out["moves"] = [
+            {
+                "move": m.get("move"),
+                "version_group_details": [
+                    {
+                        "level_learned_at": vd.get("level_learned_at"),
+                        "move_learn_method": vd.get("move_learn_method"),
+                        "version_group": vd.get("version_group"),
+                    }
+                    for vd in (m.get("version_group_details") or [])
+                ],
+            }
+            for m in out["moves"]
+        ]
+    return out
+
+
+class PokeApiSnapshot:
+    """Snapshot carregado em memória, consultado por URL."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        fmt = int(payload.get("format") or 0)
+        if fmt != SNAPSHOT_FORMAT:
+            raise ValueError(f"formato de snapshot {fmt} não suportado (esperado {SNAPSHOT_FORMAT})")
+        self.version: str = str(payload.get("version") or "?")
+        self.source: str = str(payload.get("source") or "")
+        self.endpoints: Dict[str, Dict[str, Any]] = payload.get("endpoints") or {}
+        self.aliases: Dict[str, Dict[str, str]] = payload.get("aliases") or {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path: str) -> "PokeApiSnapshot":
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        endpoint, key = parse_api_url(url)
+        table = self.endpoints.get(endpoint)
+        if not table or not key:
+            self.misses += 1
+            return None
+        if key not in table:
+            key = (self.aliases.get(endpoint) or {}).get(key, key)
+        data = table.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "entries": {ep: len(rows) for ep, rows in self.endpoints.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def load_snapshot(path: str) -> Optional[PokeApiSnapshot]:
+    """Carrega o snapshot; retorna None (com log) se o arquivo não existir/for inválido."""
+    if not path or not os.path.exists(path):
+        print(f"[PokeAPI:snapshot] Arquivo não encontrado: {path}", flush=True)
+        return None
+    try:
+        snap = PokeApiSnapshot.load(path)
+    except Exception as e:
+        print(f"[PokeAPI:snapshot] Falha ao carregar {path}: {e}", flush=True)
+        return None
+    total = sum(len(rows) for rows in snap.endpoints.values())
+    print(f"[PokeAPI:snapshot] {path} v{snap.version} carregado ({total} registros).", flush=True)
+    return snap
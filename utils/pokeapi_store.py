@@ -0,0 +1,163 @@
+# utils/pokeapi_store.py
+# -*- coding: utf-8 -*-
+"""
+Store persistente (SQLite) para respostas da PokeAPI.
+
+Cada linha guarda o JSON bruto comprimido (zlib) indexado pela URL.
+Como os dados da PokeAPI praticamente não mudam, um processo recém-iniciado
+consegue servir espécies, golpes e growth-rates já vistos sem tocar na rede.
+
+As funções aqui são síncronas (sqlite3); o `pokeapi_service` chama tudo
+via `asyncio.to_thread` para não travar o event loop.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from utils.api_cache import endpoint_of
+
+
+class PokeApiDiskStore:
+    def __init__(self, path: str, max_age_seconds: Optional[float] = None):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        # contadores
+        self.reads = 0
+        self.hits = 0
+        self.writes = 0
+        self.errors = 0
+
+    # ---------- conexão ----------
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    url        TEXT PRIMARY KEY,
+                    endpoint   TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    body       BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS api_cache_endpoint ON api_cache(endpoint)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        if not self.max_age_seconds:
+            return True
+        return (time.time() - fetched_at) <= self.max_age_seconds
+
+    # ---------- leitura / escrita ----------
+    def get_raw(self, url: str) -> Optional[bytes]:
+        """Retorna o JSON bruto (bytes) salvo para a URL, ou None."""
+        with self._lock:
+            self.reads += 1
+            try:
+                row = self._connect().execute(
+                    "SELECT fetched_at, body FROM api_cache WHERE url = ?", (url,)
+                ).fetchone()
+            except Exception as e:
+                self.errors += 1
+                print(f"[PokeAPI:disk] erro lendo {url}: {e}")
+                return None
+        if not row or not self._is_fresh(row[0]):
+            return None
+        try:
+            raw = zlib.decompress(row[1])
+        except Exception as e:
+            self.errors += 1
+            print(f"[PokeAPI:disk] payload corrompido para {url}: {e}")
+            return None
+        self.hits += 1
+        return raw
+
+    def put_raw(self, url: str, raw: bytes) -> None:
+        body = zlib.compress(raw, 6)
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO api_cache (url, endpoint, fetched_at, body) VALUES (?, ?, ?, ?)",
+                    (url, endpoint_of(url), time.time(), body),
+                )
+                conn.commit()
+                self.writes += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[PokeAPI:disk] erro gravando {url}: {e}")
+
+    def iter_endpoints(
+        self,
+        endpoints: Iterable[str],
+        limit: Optional[int] = None,
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Percorre (url, json_bruto) dos endpoints pedidos, mais recentes primeiro.
+        Usado no warm-start.
+        """
+        endpoints = list(endpoints)
+        if not endpoints:
+            return
+        marks = ",".join("?" for _ in endpoints)
+        sql = f"SELECT url, fetched_at, body FROM api_cache WHERE endpoint IN ({marks}) ORDER BY fetched_at DESC"
+        params: list = list(endpoints)
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            try:
+                rows = self._connect().execute(sql, params).fetchall()
+            except Exception as e:
+                self.errors += 1
+                print(f"[PokeAPI:disk] erro no warm-start: {e}")
+                return
+        for url, fetched_at, body in rows:
+            if not self._is_fresh(fetched_at):
+                continue
+            try:
+                yield url, zlib.decompress(body)
+            except Exception:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, object]:
+        rows = 0
+        with self._lock:
+            try:
+                rows = self._connect().execute("SELECT COUNT(*) FROM api_cache").fetchone()[0]
+            except Exception:
+                self.errors += 1
+        try:
+            file_bytes = os.path.getsize(self.path)
+        except OSError:
+            file_bytes = 0
+        return {
+            "path": self.path,
+            "rows": rows,
+            "file_bytes": file_bytes,
+            "reads": self.reads,
+            "hits": self.hits,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
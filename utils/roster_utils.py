@@ -0,0 +1,207 @@
+# utils/roster_utils.py
+# -*- coding: utf-8 -*-
+"""
+Cache por jogador da party (tabela player_pokemon).
+
+!team, !box, !SelectTeam, a batalha e o !relearn liam as mesmas linhas várias
+vezes na mesma interação. Agora o primeiro acesso carrega o "roster" do
+jogador (party com todas as colunas) e os seguintes saem da memória. A Box
+é paginada (utils.box_utils) e as páginas usam a mesma versão abaixo.
+
+Cada jogador tem um número de versão que sobe a cada escrita. Quem grava em
+player_pokemon avisa aqui:
+  - `invalidate(player_id)`   — captura/inserção, venda, cura, troca de slot;
+  - `invalidate_mon(mon_id)`  — escritas só por id (level-up, evolução, golpes);
+  - `patch(player_id, ...)`   — write-through de colunas já conhecidas (HP/XP
+                                gravados pelo battle_store).
+Uma carga que começou antes de uma invalidação não entra no cache. Views podem
+comparar `version(player_id)` com a versão que renderizaram.
+
+ROSTER_TTL_S cobre escritas feitas fora do bot (scripts em dumps/, SQL editor).
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Tuple, TYPE_CHECKING
+import asyncio
+import os
+import time
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+from utils import db_utils
+
+TABLE = "player_pokemon"
+ROSTER_TTL_S = float(os.getenv("ROSTER_TTL_S", "300"))
+ROSTER_MAX_PLAYERS = int(os.getenv("ROSTER_MAX_PLAYERS", "2000"))
+
+
+def _copy(row: dict) -> dict:
+    """Cópia que o chamador pode alterar sem mexer no cache (inclusive `moves`)."""
+    out = dict(row)
+    if isinstance(out.get("moves"), list):
+        out["moves"] = list(out["moves"])
+    return out
+
+
+class Roster:
+    __slots__ = ("player_id", "version", "loaded_at", "_party")
+
+    def __init__(self, player_id: int, version: int, party: List[dict]):
+        self.player_id = player_id
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._party = sorted(party, key=lambda r: int(r["party_position"]))
+
+    def party(self) -> List[dict]:
+        """Party (todas as colunas), ordenada por slot."""
+        return [_copy(r) for r in self._party]
+
+    def active(self) -> Optional[dict]:
+        return _copy(self._party[0]) if self._party else None
+
+    def get(self, mon_id: Any) -> Optional[dict]:
+        mon_id = str(mon_id)
+        for r in self._party:
+            if str(r["id"]) == mon_id:
+                return _copy(r)
+        return None
+
+    def in_party(self, mon_id: Any) -> bool:
+        mon_id = str(mon_id)
+        return any(str(r["id"]) == mon_id for r in self._party)
+
+    def _ids(self):
+        for r in self._party:
+            yield str(r["id"])
+
+
+_rosters: "OrderedDict[int, Roster]" = OrderedDict()
+_versions: Dict[int, int] = {}
+_owners: Dict[str, int] = {}  # mon_id -> player_id (só dos rosters em cache)
+_loading: Dict[int, Tuple[int, "asyncio.Task[Roster]"]] = {}  # player_id -> (versão, carga)
+
+hits = 0
+misses = 0
+
+
+def version(player_id: int) -> int:
+    return _versions.get(int(player_id), 0)
+
+
+def _drop(player_id: int) -> None:
+    roster = _rosters.pop(player_id, None)
+    if roster is not None:
+        for mon_id in roster._ids():
+            if _owners.get(mon_id) == player_id:
+                del _owners[mon_id]
+
+
+def invalidate(player_id: int) -> None:
+    """Descarta o roster do jogador (chamar depois de gravar em player_pokemon)."""
+    player_id = int(player_id)
+    _versions[player_id] = _versions.get(player_id, 0) + 1
+    _drop(player_id)
+
+
+def invalidate_mon(mon_id: Any) -> None:
+    """Como `invalidate`, para escritas que só conhecem o id do Pokémon."""
+    owner = _owners.get(str(mon_id))
+    if owner is not None:
+        invalidate(owner)
+
+
+def invalidate_all() -> None:
+    for player_id in set(_versions) | set(_rosters):
+        _versions[player_id] = _versions.get(player_id, 0) + 1
+    _rosters.clear()
+    _owners.clear()
+
+
+def patch(player_id: int, changes: Mapping[Any, Mapping[str, Any]]) -> None:
+    """
+    Write-through: aplica no cache colunas que acabaram de ser gravadas
+    ({mon_id: {coluna: valor}}). Mudança de slot descarta o roster (a linha
+    entra ou sai da party).
+    """
+    player_id = int(player_id)
+    if any("party_position" in f for f in changes.values()):
+        invalidate(player_id)
+        return
+    _versions[player_id] = _versions.get(player_id, 0) + 1
+    roster = _rosters.get(player_id)
+    if roster is None:
+        return
+    by_id = {str(r["id"]): r for r in roster._party}
+    for mon_id, fields in changes.items():
+        row = by_id.get(str(mon_id))
+        if row is not None:
+            row.update(fields)
+    roster.version = _versions[player_id]
+
+
+async def _load(supabase: Client, player_id: int) -> Roster:
+    global misses
+    misses += 1
+    stamp = version(player_id)
+    res = await db_utils.execute(
+        supabase.table(TABLE)
+        .select("*")
+        .eq("player_id", player_id)
+        .filter("party_position", "not.is", "null")
+    )
+    roster = Roster(player_id, stamp, res.data or [])
+    if version(player_id) == stamp:  # ninguém gravou durante a leitura
+        _drop(player_id)
+        _rosters[player_id] = roster
+        for mon_id in roster._ids():
+            _owners[mon_id] = player_id
+        while len(_rosters) > ROSTER_MAX_PLAYERS:
+            _drop(next(iter(_rosters)))
+    return roster
+
+
+async def get_roster(supabase: Client, player_id: int) -> Roster:
+    """Roster do jogador: da memória se ainda vale, senão do banco (uma carga por vez)."""
+    global hits
+    player_id = int(player_id)
+    roster = _rosters.get(player_id)
+    if (
+        roster is not None
+        and roster.version == version(player_id)
+        and time.monotonic() - roster.loaded_at < ROSTER_TTL_S
+    ):
+        hits += 1
+        _rosters.move_to_end(player_id)
+        return roster
+
+    # cargas simultâneas do mesmo jogador viram uma; depois de uma escrita, carga nova
+    stamp = version(player_id)
+    inflight = _loading.get(player_id)
+    if inflight is None or inflight[0] != stamp:
+        task = asyncio.ensure_future(_load(supabase, player_id))
+        _loading[player_id] = (stamp, task)
+        task.add_done_callback(
+            lambda t, pid=player_id: _loading.pop(pid, None) if _loading.get(pid, (0, None))[1] is t else None
+        )
+        inflight = (stamp, task)
+    return await asyncio.shield(inflight[1])
+
+
+async def get_party(supabase: Client, player_id: int) -> List[dict]:
+    return (await get_roster(supabase, player_id)).party()
+
+
+async def get_mon(supabase: Client, player_id: int, mon_id: Any) -> Optional[dict]:
+    """Linha completa de um Pokémon do jogador (party do cache; Box busca a linha)."""
+    roster = await get_roster(supabase, player_id)
+    if roster.in_party(mon_id):
+        return roster.get(mon_id)
+    res = await db_utils.execute(
+        supabase.table(TABLE).select("*").eq("id", str(mon_id)).eq("player_id", int(player_id)).limit(1)
+    )
+    return res.data[0] if res.data else None
+
+
+def stats() -> Dict[str, Any]:
+    return {"players": len(_rosters), "hits": hits, "misses": misses}
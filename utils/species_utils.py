@@ -0,0 +1,176 @@
+# utils/species_utils.py
+# -*- coding: utf-8 -*-
+"""
+Índice compacto de espécies (nome/dex id -> SpeciesInfo).
+
+Junta o que o bot lê de /pokemon e /pokemon-species (stats base, tipos,
+base_experience, capture_rate, growth-rate, evolution-chain, sprites) num
+registro pequeno com __slots__. Consultas são síncronas; só `ensure_species`
+vai à PokeAPI para espécies que ainda não estão no índice.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple, Union
+import asyncio
+import json
+
+import utils.pokeapi_service as pokeapi
+from utils import growth_utils
+from utils import text_utils
+
+# ordem dos stats em `base_stats`
+STAT_ORDER = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+
+
+def _id_from_url(url: Optional[str]) -> Optional[int]:
+    try:
+        return int(str(url).rstrip("/").rsplit("/", 1)[-1])
+    except (TypeError, ValueError):
+        return None
+
+
+class SpeciesInfo:
+    __slots__ = (
+        "name", "id", "species_name", "base_stats", "types", "base_experience",
+        "capture_rate", "gender_rate", "growth_rate", "evolution_chain_id",
+        "sprite_default", "sprite_shiny", "artwork_default", "artwork_shiny",
+    )
+
+    def __init__(self, pokemon: dict, species: Optional[dict] = None):
+        species = species or {}
+        self.name: str = str(pokemon.get("name") or "").lower()
+        self.id: int = int(pokemon.get("id") or 0)
+        self.species_name: str = (pokemon.get("species") or {}).get("name") or self.name
+
+        by_stat = {s["stat"]["name"]: int(s["base_stat"]) for s in pokemon.get("stats") or []}
+        self.base_stats: Tuple[int, ...] = tuple(by_stat.get(k, 0) for k in STAT_ORDER)
+        self.types: Tuple[str, ...] = tuple(t["type"]["name"] for t in pokemon.get("types") or [])
+        self.base_experience: int = int(pokemon.get("base_experience") or 50)
+
+        self.capture_rate: int = int(species.get("capture_rate") or 255)
+        self.gender_rate: int = int(species.get("gender_rate", -1))
+        self.growth_rate: Optional[str] = growth_utils.growth_rate_key(
+            (species.get("growth_rate") or {}).get("url", "")
+        ) or (species.get("growth_rate") or {}).get("name")
+        self.evolution_chain_id: Optional[int] = _id_from_url(
+            (species.get("evolution_chain") or {}).get("url")
+        )
+
+        sprites = pokemon.get("sprites") or {}
+        art = (sprites.get("other") or {}).get("official-artwork") or {}
+        self.sprite_default: Optional[str] = sprites.get("front_default")
+        self.sprite_shiny: Optional[str] = sprites.get("front_shiny")
+        self.artwork_default: Optional[str] = art.get("front_default")
+        self.artwork_shiny: Optional[str] = art.get("front_shiny")
+
+    # ---------- helpers ----------
+    def stats_for_level(self, level: int) -> dict:
+        """Mesmo resultado de pokeapi.calculate_stats_for_level (colunas do DB)."""
+        return {
+            pokeapi.STAT_COLUMNS[k]: pokeapi.calculate_stat(k, base, level)
+            for k, base in zip(STAT_ORDER, self.base_stats)
+        }
+
+    def growth_table(self):
+        return growth_utils.get_table(self.growth_rate) if self.growth_rate else None
+
+    def sprite(self, shiny: bool = False) -> Optional[str]:
+        """Sprite pequeno (fallback: artwork)."""
+        if shiny:
+            return self.sprite_shiny or self.artwork_shiny
+        return self.sprite_default or self.artwork_default
+
+    def artwork(self, shiny: bool = False) -> Optional[str]:
+        """Artwork oficial (fallback: sprite)."""
+        if shiny:
+            return self.artwork_shiny or self.sprite_shiny
+        return self.artwork_default or self.sprite_default
+
+    def __repr__(self) -> str:
+        return f"SpeciesInfo({self.name!r}, #{self.id}, {'/'.join(self.types)})"
+
+
+SPECIES_BY_NAME: Dict[str, SpeciesInfo] = {}
+SPECIES_BY_ID: Dict[int, SpeciesInfo] = {}
+
+
+def register(pokemon: dict, species: Optional[dict] = None) -> Optional[SpeciesInfo]:
+    """
+    Indexa /pokemon + /pokemon-species. Sem o payload da espécie não indexa
+    (capture_rate/growth-rate sairiam com defaults e ficariam no índice).
+    """
+    if not pokemon or not pokemon.get("name") or not species:
+        return None
+    info = SpeciesInfo(pokemon, species)
+    if not text_utils.has_species(species.get("name")):
+        text_utils.index_species(species)  # flavor text / nomes, uma vez por espécie
+    SPECIES_BY_NAME[info.name] = info
+    if info.id:
+        SPECIES_BY_ID[info.id] = info
+    return info
+
+
+def get_species(name_or_id: Union[str, int]) -> Optional[SpeciesInfo]:
+    """Lookup síncrono por nome ('pidgey') ou dex id (16 / '16')."""
+    key = str(name_or_id or "").strip().lower()
+    if key.isdigit():
+        return SPECIES_BY_ID.get(int(key))
+    return SPECIES_BY_NAME.get(key)
+
+
+async def ensure_species(name_or_id: Union[str, int]) -> Optional[SpeciesInfo]:
+    """Retorna do índice ou busca /pokemon + /pokemon-species e indexa."""
+    info = get_species(name_or_id)
+    if info is not None and info.growth_rate is not None:
+        return info
+    pokemon = await pokeapi.get_pokemon_data(str(name_or_id))
+    if not pokemon:
+        return None
+    species = await pokeapi.get_pokemon_species_data(
+        (pokemon.get("species") or {}).get("name") or pokemon["name"]
+    )
+    return register(pokemon, species)
+
+
+async def ensure_many(names: Iterable[Union[str, int]]) -> Dict[str, Optional[SpeciesInfo]]:
+    names = [str(n).lower() for n in names if n]
+    infos = await asyncio.gather(*(ensure_species(n) for n in names))
+    return dict(zip(names, infos))
+
+
+def _index_rows(pokemon_rows: Iterable[dict], species_rows: Iterable[dict]) -> int:
+    species_by_name = {s.get("name"): s for s in species_rows if s}
+    count = 0
+    for p in pokemon_rows:
+        sp_name = (p.get("species") or {}).get("name") or p.get("name")
+        species = species_by_name.get(sp_name)
+        if species is None:
+            continue  # sem /pokemon-species: fica para o ensure_species
+        if register(p, species):
+            count += 1
+    return count
+
+
+async def preload() -> int:
+    """Monta o índice a partir do snapshot local e/ou do cache em disco."""
+    snap = pokeapi.get_snapshot()
+    if snap is not None:
+        _index_rows(
+            (snap.endpoints.get("pokemon") or {}).values(),
+            (snap.endpoints.get("pokemon-species") or {}).values(),
+        )
+
+    if pokeapi.disk_store:
+        def _load():
+            return list(pokeapi.disk_store.iter_endpoints(["pokemon", "pokemon-species"]))
+
+        try:
+            rows = [json.loads(raw) for _url, raw in await asyncio.to_thread(_load)]
+            _index_rows(
+                (r for r in rows if "stats" in r and r.get("name") not in SPECIES_BY_NAME),
+                (r for r in rows if "capture_rate" in r),
+            )
+        except Exception as e:
+            print(f"[Species] Falha lendo espécies do disco: {e}", flush=True)
+
+    print(f"[Species] Índice com {len(SPECIES_BY_NAME)} espécies.", flush=True)
+    return len(SPECIES_BY_NAME)
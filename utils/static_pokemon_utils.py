@@ -5,6 +5,7 @@
 Módulo de dados estáticos de Pokémon.
 
 Aqui ficam:
+  - Iniciais por região
   - Pools para o Black Shop (cassino & compra aleatória)
   - Pools para eventos futuros (Halloween, Natal, etc.)
 
@@ -45,6 +46,24 @@ def get_sprite_url(pokedex_id: int) -> str:
     )
 
 
+# -------------------------------------------------------------------
+# INICIAIS
+# -------------------------------------------------------------------
+
+#: api_names dos iniciais oferecidos no !start, por região
+STARTERS_BY_REGION: Dict[str, List[str]] = {
+    "Kanto": ["bulbasaur", "charmander", "squirtle"],
+    "Johto": ["chikorita", "cyndaquil", "totodile"],
+    "Hoenn": ["treecko", "torchic", "mudkip"],
+    "Sinnoh": ["turtwig", "chimchar", "piplup"],
+    "Unova": ["snivy", "tepig", "oshawott"],
+    "Kalos": ["chespin", "fennekin", "froakie"],
+    "Alola": ["rowlet", "litten", "popplio"],
+    "Galar": ["grookey", "scorbunny", "sobble"],
+    "Paldea": ["sprigatito", "fuecoco", "quaxly"],
+}
+
+
 # -------------------------------------------------------------------
 # BLACK SHOP – caça-níquel (slots)
 # -------------------------------------------------------------------
@@ -170,3 +189,20 @@ EVENT_POOLS: Dict[str, List[StaticPokemon]] = {
 def get_event_pool(event_key: str) -> List[StaticPokemon]:
     """Retorna a lista estática associada à chave de evento, se existir."""
     return EVENT_POOLS.get(event_key, [])
+
+
+def api_name_of(p: StaticPokemon) -> str:
+    return (p.get("api_name") or p.get("name") or "").lower()
+
+
+def all_static_api_names() -> List[str]:
+    """api_names de todos os iniciais e pools daqui (sem repetir), p/ o warm-up."""
+    names: List[str] = []
+    for starters in STARTERS_BY_REGION.values():
+        names.extend(starters)
+    for pool in BLACK_SLOTS_POOLS.values():
+        names.extend(api_name_of(p) for p in pool)
+    names.extend(api_name_of(p) for p in BLACK_SHOP_BASIC_POOL)
+    for pool in EVENT_POOLS.values():
+        names.extend(api_name_of(p) for p in pool)
+    return list(dict.fromkeys(n for n in names if n))
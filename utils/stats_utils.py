@@ -0,0 +1,78 @@
+# utils/stats_utils.py
+# -*- coding: utf-8 -*-
+"""
+Cálculo de stats em lote (N Pokémon de uma vez).
+
+Entrada: matriz N x 6 de stats base (ordem de species_utils.STAT_ORDER) e
+um vetor de N níveis. Saída: lista de dicts com as colunas de player_pokemon,
+idêntica a pokeapi.calculate_stats_for_level para cada linha.
+
+Usa NumPy quando disponível (e o lote é grande o bastante para compensar);
+senão cai num loop Python puro com a mesma aritmética inteira.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional
+    np = None
+
+from utils.pokeapi_service import STAT_COLUMNS
+from utils.species_utils import STAT_ORDER, SpeciesInfo
+
+HAS_NUMPY = np is not None
+
+# abaixo disso o overhead de montar arrays não compensa
+NUMPY_MIN_BATCH = 32
+
+_COLUMNS = tuple(STAT_COLUMNS[k] for k in STAT_ORDER)
+
+
+def _batch_python(base_stats: Sequence[Sequence[int]], levels: Sequence[int]) -> List[Dict[str, int]]:
+    out = []
+    for base, lv in zip(base_stats, levels):
+        lv = int(lv)
+        row = {_COLUMNS[0]: (2 * int(base[0]) * lv) // 100 + lv + 10}
+        for col, b in zip(_COLUMNS[1:], base[1:]):
+            row[col] = (2 * int(b) * lv) // 100 + 5
+        out.append(row)
+    return out
+
+
+def _batch_numpy(base_stats: Sequence[Sequence[int]], levels: Sequence[int]) -> List[Dict[str, int]]:
+    base = np.asarray(base_stats, dtype=np.int64).reshape(-1, len(STAT_ORDER))
+    lv = np.asarray(levels, dtype=np.int64).reshape(-1, 1)
+    stats = (2 * base * lv) // 100 + 5
+    stats[:, 0] += lv[:, 0] + 5  # hp: + level + 10 (em vez de + 5)
+    return [dict(zip(_COLUMNS, map(int, row))) for row in stats.tolist()]
+
+
+def calculate_stats_batch(
+    base_stats: Sequence[Sequence[int]],
+    levels: Sequence[int],
+) -> List[Dict[str, int]]:
+    """Stats de N Pokémon: base_stats[i] (6 valores) no nível levels[i]."""
+    if len(base_stats) != len(levels):
+        raise ValueError("base_stats e levels precisam ter o mesmo tamanho")
+    if not base_stats:
+        return []
+    if HAS_NUMPY and len(base_stats) >= NUMPY_MIN_BATCH:
+        return _batch_numpy(base_stats, levels)
+    return _batch_python(base_stats, levels)
+
+
+def stats_for_species(
+    infos: Sequence[Optional[SpeciesInfo]],
+    levels: Sequence[int],
+) -> List[Dict[str, int]]:
+    """Igual a calculate_stats_batch, a partir do índice de espécies (None -> {})."""
+    idx = [i for i, info in enumerate(infos) if info is not None]
+    computed = calculate_stats_batch(
+        [infos[i].base_stats for i in idx],
+        [levels[i] for i in idx],
+    )
+    out: List[Dict[str, int]] = [{} for _ in infos]
+    for i, stats in zip(idx, computed):
+        out[i] = stats
+    return out
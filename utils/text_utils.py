@@ -0,0 +1,122 @@
+# utils/text_utils.py
+# -*- coding: utf-8 -*-
+"""
+Índice de textos localizados: flavor text da Pokédex e nomes de espécie e
+golpe, por idioma. (Itens usam o nome da tabela `items`, via item_utils.)
+
+`get_portuguese_flavor_text` varria `flavor_text_entries` (centenas de
+entradas em vários idiomas) e limpava o texto com três regex a cada !team.
+Aqui cada payload é lido uma vez, quando species_utils/move_utils o
+registram (snapshot, cache em disco ou fetch), e o texto já limpo fica em
+dicts (nome, idioma) -> texto. O fallback pt -> en é resolvido na montagem:
+a consulta é um lookup só.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Tuple
+import re
+
+import utils.pokeapi_service as pokeapi
+
+# idioma pedido -> idiomas da PokeAPI aceitos, em ordem de preferência
+LANG_FALLBACK: Dict[str, Tuple[str, ...]] = {
+    "pt": ("pt-br", "pt", "en"),
+    "en": ("en",),
+}
+LANGS = tuple(LANG_FALLBACK)
+
+NO_FLAVOR_TEXT = "Descrição não disponível."
+
+# controles (menos \n e \f, que viram espaço no colapso abaixo) somem
+_CONTROL_RE = re.compile(r"[\x00-\x09\x0b\x0d-\x1f\x7f-\x9f]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def clean_flavor_text(text: str) -> str:
+    """Texto da Pokédex numa linha só, sem caracteres de controle."""
+    if not text:
+        return "Nenhuma descrição encontrada."
+    return _SPACE_RE.sub(" ", _CONTROL_RE.sub("", text)).strip()
+
+
+def _first_by_lang(entries: Iterable[dict], field: str) -> Dict[str, str]:
+    """Primeira entrada de cada idioma (a ordem da PokeAPI é a dos jogos)."""
+    out: Dict[str, str] = {}
+    for e in entries or []:
+        lang = str((e.get("language") or {}).get("name") or "").lower()
+        if lang and lang not in out and e.get(field):
+            out[lang] = e[field]
+    return out
+
+
+def _resolve(by_lang: Dict[str, str]) -> Dict[str, str]:
+    """{idioma da API: texto} -> {idioma do bot: texto} já com fallback."""
+    out: Dict[str, str] = {}
+    for lang, prefs in LANG_FALLBACK.items():
+        for p in prefs:
+            if p in by_lang:
+                out[lang] = by_lang[p]
+                break
+    return out
+
+
+_flavor: Dict[str, Dict[str, str]] = {}        # espécie -> {idioma: flavor limpo}
+_species_names: Dict[str, Dict[str, str]] = {}  # espécie -> {idioma: nome}
+_move_names: Dict[str, Dict[str, str]] = {}
+
+
+def _key(name) -> str:
+    return str(name or "").strip().lower()
+
+
+def index_species(species_data: dict) -> bool:
+    """Indexa o payload de /pokemon-species (flavor text + nomes)."""
+    name = _key((species_data or {}).get("name"))
+    if not name:
+        return False
+    raw = _first_by_lang(species_data.get("flavor_text_entries"), "flavor_text")
+    _flavor[name] = {lang: clean_flavor_text(t) for lang, t in _resolve(raw).items()}
+    _species_names[name] = _resolve(_first_by_lang(species_data.get("names"), "name"))
+    return True
+
+
+def index_move(move_data: dict) -> bool:
+    name = _key((move_data or {}).get("name"))
+    if not name:
+        return False
+    _move_names[name] = _resolve(_first_by_lang(move_data.get("names"), "name"))
+    return True
+
+
+# ---------- consultas (síncronas) ----------
+def has_species(species: str) -> bool:
+    return _key(species) in _flavor
+
+
+def species_flavor(species: str, lang: str = "pt") -> Optional[str]:
+    """Flavor text limpo; None se a espécie não foi indexada ou não tem texto."""
+    return (_flavor.get(_key(species)) or {}).get(lang)
+
+
+def species_name(species: str, lang: str = "pt") -> Optional[str]:
+    return (_species_names.get(_key(species)) or {}).get(lang)
+
+
+def move_name(move: str, lang: str = "pt") -> Optional[str]:
+    return (_move_names.get(_key(move)) or {}).get(lang)
+
+
+# ---------- com fetch ----------
+async def get_species_flavor(species: str, lang: str = "pt") -> str:
+    """Como `species_flavor`, buscando /pokemon-species se a espécie não está no índice."""
+    if not has_species(species):
+        data = await pokeapi.get_pokemon_species_data(_key(species))
+        if data:
+            index_species(data)
+    return species_flavor(species, lang) or NO_FLAVOR_TEXT
+
+
+def stats() -> Dict[str, int]:
+    return {
+        "species": len(_flavor),
+        "moves": len(_move_names),
+    }
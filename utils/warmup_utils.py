@@ -0,0 +1,173 @@
+# utils/warmup_utils.py
+# -*- coding: utf-8 -*-
+"""
+Aquecimento no startup: deixa em memória o que a primeira batalha de cada
+região buscaria em série.
+
+Etapas (concorrência limitada por WARMUP_CONCURRENCY):
+  1. encounters — tabela de encontro de cada locations.default_area
+  2. species    — iniciais, pools de static_pokemon_utils e espécies selvagens
+                  das tabelas acima (stats/tipos/growth-rate no species_utils)
+  3. learnsets  — learnset das espécies aquecidas (do /pokemon já em cache)
+  4. moves      — golpes de level-up desses learnsets (catálogo do move_utils)
+
+Ao fim da etapa 2 o bot está "pronto" para batalhas (`wait_ready`); learnsets
+e golpes continuam aquecendo em segundo plano (golpe ainda desconhecido só
+custa um fetch na hora, como antes).
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+import asyncio
+import os
+import time
+
+from utils import db_utils
+from utils import encounter_utils
+from utils import event_utils
+from utils import learnset_utils
+from utils import move_utils
+from utils import species_utils
+from utils import static_pokemon_utils
+
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "8"))
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") != "0"
+WARMUP_ENCOUNTER_VERSION = os.getenv("WARMUP_ENCOUNTER_VERSION") or None
+
+
+class _Stage:
+    __slots__ = ("name", "total", "done", "errors", "started_at", "elapsed_ms")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.total = 0
+        self.done = 0
+        self.errors = 0
+        self.started_at: Optional[float] = None
+        self.elapsed_ms: Optional[float] = None
+
+
+STAGES = ("encounters", "species", "learnsets", "moves")
+_stages: Dict[str, _Stage] = {name: _Stage(name) for name in STAGES}
+_ready = asyncio.Event()
+_finished = False
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def is_finished() -> bool:
+    return _finished
+
+
+async def wait_ready(timeout: Optional[float] = None) -> bool:
+    """Espera as etapas críticas (encounters + species). False se estourar o timeout."""
+    if _ready.is_set():
+        return True
+    try:
+        await asyncio.wait_for(_ready.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+def get_status() -> List[Dict[str, Any]]:
+    """Progresso por etapa (p/ !warmup e logs)."""
+    out = []
+    for st in _stages.values():
+        elapsed = st.elapsed_ms
+        if elapsed is None and st.started_at is not None:
+            elapsed = (time.perf_counter() - st.started_at) * 1000
+        out.append({
+            "stage": st.name,
+            "done": st.done,
+            "total": st.total,
+            "errors": st.errors,
+            "elapsed_ms": elapsed,
+            "finished": st.elapsed_ms is not None,
+        })
+    return out
+
+
+def progress_text() -> str:
+    parts = []
+    for r in get_status():
+        if r["total"] or r["finished"]:
+            parts.append(f"{r['stage']} {r['done']}/{r['total']}")
+        else:
+            parts.append(f"{r['stage']} —")
+    return " • ".join(parts)
+
+
+async def _run_stage(name: str, keys: Iterable[Any], fn: Callable[[Any], Awaitable[Any]]) -> List[Any]:
+    st = _stages[name]
+    keys = list(keys)
+    st.total, st.done, st.errors = len(keys), 0, 0
+    st.started_at, st.elapsed_ms = time.perf_counter(), None
+    sem = asyncio.Semaphore(max(1, WARMUP_CONCURRENCY))
+
+    async def one(key):
+        async with sem:
+            try:
+                return await fn(key)
+            except Exception as e:
+                st.errors += 1
+                if st.errors <= 3:
+                    print(f"[Warmup] {name}: falha em {key!r}: {e}", flush=True)
+                return None
+            finally:
+                st.done += 1
+
+    results = await asyncio.gather(*(one(k) for k in keys))
+    st.elapsed_ms = (time.perf_counter() - st.started_at) * 1000
+    print(
+        f"[Warmup] {name}: {st.done - st.errors}/{st.total} em {st.elapsed_ms:.0f} ms"
+        + (f" ({st.errors} erro(s))" if st.errors else ""),
+        flush=True,
+    )
+    return results
+
+
+async def run(supabase=None) -> None:
+    """Pipeline completo. Nunca levanta: falhas viram contadores/log."""
+    global _finished
+    t0 = time.perf_counter()
+    try:
+        if not WARMUP_ENABLED:
+            print("[Warmup] Desligado (WARMUP_ENABLED=0).", flush=True)
+            return
+
+        supabase = supabase or db_utils.get_client()
+        if not event_utils.locations_loaded():
+            try:
+                await db_utils.run_sync(event_utils.load_locations, supabase)
+            except Exception as e:
+                print(f"[Warmup] Sem índice de locais: {e}", flush=True)
+
+        # 1) tabelas de encontro
+        tables = await _run_stage(
+            "encounters",
+            event_utils.all_default_areas(),
+            lambda area: encounter_utils.get_table(area, version=WARMUP_ENCOUNTER_VERSION),
+        )
+
+        # 2) espécies: estáticas + tudo que pode aparecer no mato
+        names = static_pokemon_utils.all_static_api_names()
+        for table in tables:
+            if table:
+                names.extend(table.names)
+        names = list(dict.fromkeys(names))
+        await _run_stage("species", names, species_utils.ensure_species)
+        _ready.set()
+        print(f"[Warmup] Pronto para batalhas em {(time.perf_counter() - t0) * 1000:.0f} ms.", flush=True)
+
+        # 3) learnsets (do /pokemon já em cache) e golpes de level-up
+        learnsets = await _run_stage("learnsets", names, learnset_utils.get_learnset)
+        move_names = sorted({m for ls in learnsets if ls for m in ls.level_up_moves()})
+        await _run_stage("moves", move_names, lambda m: move_utils.ensure_moves([m]))
+    except Exception as e:
+        print(f"[Warmup] Abortado: {e}", flush=True)
+    finally:
+        _ready.set()  # não trava batalhas para sempre se o aquecimento falhar
+        _finished = True
+        print(f"[Warmup] Concluído em {(time.perf_counter() - t0) * 1000:.0f} ms.", flush=True)
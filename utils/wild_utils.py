@@ -1,13 +1,15 @@
 # utils/wild_utils.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, TYPE_CHECKING
 import random
 import traceback
-from supabase import Client
+if TYPE_CHECKING:
+    from supabase import Client
 
-import utils.pokeapi_service as pokeapi
+from utils import db_utils
 from utils import event_utils
+from utils import encounter_utils
 
 
 # ----------------------------------------------------------------------
@@ -21,27 +23,31 @@ async def _get_player_location_area(
     """
     Retorna o slug de `location_area` a partir da localização atual do jogador.
 
-    players.current_location_name (ex.: 'viridian-city')
-      -> event_utils.get_location_info(...)
+    players.current_location_name (ex.: 'viridian-city', cacheado em event_utils)
+      -> event_utils.get_location_info(...) (índice de locations em memória)
          -> locations.default_area (ex.: 'viridian-city-area')
     """
     try:
-        # Lê player do banco
-        res = (
-            supabase.table("players")
-            .select("current_location_name,current_region")
-            .eq("discord_id", discord_id)
-            .limit(1)
-            .execute()
-        )
-        rows: List[Dict[str, Any]] = res.data or []
-        if not rows:
-            print(f"[wild_utils:_get_player_location_area] no player row for {discord_id}", flush=True)
-            return None
-
-        player_row = rows[0]
-        location_name = (player_row.get("current_location_name") or "").strip()
-        region = (player_row.get("current_region") or "").strip()
+        # Local do jogador: cache mantido por viagem/spawn; só lê `players` na falta
+        cached = event_utils.cached_player_location(discord_id)
+        if cached:
+            location_name, region = cached[0].strip(), (cached[1] or "").strip()
+        else:
+            res = await db_utils.execute(
+                supabase.table("players")
+                .select("current_location_name,current_region")
+                .eq("discord_id", discord_id)
+                .limit(1)
+            )
+            rows: List[Dict[str, Any]] = res.data or []
+            if not rows:
+                print(f"[wild_utils:_get_player_location_area] no player row for {discord_id}", flush=True)
+                return None
+
+            player_row = rows[0]
+            location_name = (player_row.get("current_location_name") or "").strip()
+            region = (player_row.get("current_region") or "").strip()
+            event_utils.remember_player_location(discord_id, location_name or None, region or None)
 
         print(
             f"[wild_utils:_get_player_location_area] discord_id={discord_id} "
@@ -51,15 +57,17 @@ async def _get_player_location_area(
 
         if not location_name:
             # Se não tiver spawn setado, força o spawn padrão da região
-            spawn = event_utils.ensure_player_spawn(supabase, discord_id, region)
+            spawn = await db_utils.run_sync(event_utils.ensure_player_spawn, supabase, discord_id, region)
             print(f"[wild_utils:_get_player_location_area] ensured spawn={spawn!r}", flush=True)
             location_name = (spawn or "").strip()
 
         if not location_name:
             return None
 
-        # Busca info da location na tabela "locations"
-        info = event_utils.get_location_info(supabase, location_name)
+        # Info da location: índice em memória; só vai ao banco se o local for novo
+        info = event_utils.peek_location_info(location_name)
+        if info is None:
+            info = await db_utils.run_sync(event_utils.get_location_info, supabase, location_name)
         if not info:
             print(f"[wild_utils:_get_player_location_area] no location info for {location_name!r}", flush=True)
             return None
@@ -128,34 +136,15 @@ async def pick_wild_for_player(
             f"version={version!r}",
             flush=True,
         )
-        encounters = await pokeapi.get_location_area_encounters(location_area, version=version)
-        if not encounters:
+        table = await encounter_utils.get_table(location_area, version=version)
+        if not table:
             print("[wild_utils:pick_wild_for_player] no encounters → fallback", flush=True)
             return fallback
 
         # ---------------------------------------
-        # Sorteio ponderado pela chance
+        # Sorteio ponderado pela chance (alias, O(1))
         # ---------------------------------------
-        total_chance = sum(int(e.get("chance") or 0) for e in encounters)
-        if total_chance <= 0:
-            print("[wild_utils:pick_wild_for_player] total_chance<=0 → fallback", flush=True)
-            return fallback
-
-        roll = rng.randint(1, total_chance)
-        acc = 0
-        chosen: Optional[Dict[str, Any]] = None
-
-        for e in encounters:
-            c = int(e.get("chance") or 0)
-            if c <= 0:
-                continue
-            acc += c
-            if roll <= acc:
-                chosen = e
-                break
-
-        if not chosen:
-            chosen = rng.choice(encounters)
+        chosen: Dict[str, Any] = table.entry(table.sample(rng))
 
         # ---------------------------------------
         # Nível (respeita min/max da área)